@@ -0,0 +1,59 @@
+"""add precomputed recommendations
+
+Revision ID: 0b4d7e9c2a15
+Revises: f3b8d2a61c47
+Create Date: 2026-10-19 18:20:37.114902
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0b4d7e9c2a15"
+down_revision: Union[str, Sequence[str], None] = "f3b8d2a61c47"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "film_similar",
+        sa.Column("film_id", sa.Integer(), nullable=False),
+        sa.Column("source", sa.String(length=16), nullable=False),
+        sa.Column("neighbor_ids", postgresql.ARRAY(sa.Integer()), nullable=False),
+        sa.Column("scores", postgresql.ARRAY(sa.REAL()), nullable=False),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.ForeignKeyConstraint(["film_id"], ["films.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("film_id", "source"),
+    )
+    op.create_table(
+        "user_recommendations",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("film_ids", postgresql.ARRAY(sa.Integer()), nullable=False),
+        sa.Column("scores", postgresql.ARRAY(sa.REAL()), nullable=False),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("user_id"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("user_recommendations")
+    op.drop_table("film_similar")
@@ -0,0 +1,51 @@
+"""add updated_at to users and films
+
+Revision ID: 3b7e1f0c9a21
+Revises: 92c6acec6e7d
+Create Date: 2026-10-19 10:12:41.318402
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "3b7e1f0c9a21"
+down_revision: Union[str, Sequence[str], None] = "92c6acec6e7d"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "users",
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+    )
+    op.add_column(
+        "films",
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+    )
+    op.create_index(
+        op.f("ix_films_updated_at"), "films", ["updated_at"], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_films_updated_at"), table_name="films")
+    op.drop_column("films", "updated_at")
+    op.drop_column("users", "updated_at")
@@ -0,0 +1,66 @@
+"""create film_cards materialized view
+
+Revision ID: 5e0a9d3b7c14
+Revises: c41d8a7e2f56
+Create Date: 2026-10-19 12:20:05.117830
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "5e0a9d3b7c14"
+down_revision: Union[str, Sequence[str], None] = "c41d8a7e2f56"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(
+        """
+        CREATE MATERIALIZED VIEW film_cards AS
+        SELECT
+            f.id,
+            f.title,
+            f.year,
+            f.duration,
+            f.rating,
+            f.updated_at,
+            COALESCE(
+                (
+                    SELECT array_agg(g.name ORDER BY g.name)
+                    FROM film_genre fg
+                    JOIN genres g ON g.id = fg.genre_id
+                    WHERE fg.film_id = f.id
+                ),
+                '{}'
+            ) AS genres,
+            COALESCE(
+                (
+                    SELECT array_agg(top.full_name ORDER BY top.id)
+                    FROM (
+                        SELECT a.id, a.name || ' ' || a.surname AS full_name
+                        FROM film_actor fa
+                        JOIN actors a ON a.id = fa.actor_id
+                        WHERE fa.film_id = f.id
+                        ORDER BY a.id
+                        LIMIT 5
+                    ) top
+                ),
+                '{}'
+            ) AS top_actors
+        FROM films f
+        """
+    )
+    op.execute("CREATE UNIQUE INDEX ix_film_cards_id ON film_cards (id)")
+    op.execute("CREATE INDEX ix_film_cards_updated_at ON film_cards (updated_at)")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS film_cards")
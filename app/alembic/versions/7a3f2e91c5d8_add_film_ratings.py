@@ -0,0 +1,79 @@
+"""add film ratings
+
+Revision ID: 7a3f2e91c5d8
+Revises: 0b4d7e9c2a15
+Create Date: 2026-10-19 19:42:10.318275
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "7a3f2e91c5d8"
+down_revision: Union[str, Sequence[str], None] = "0b4d7e9c2a15"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "film_ratings",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("film_id", sa.Integer(), nullable=False),
+        sa.Column("score", sa.SmallInteger(), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.CheckConstraint("score BETWEEN 1 AND 10", name="ck_film_ratings_score"),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["film_id"], ["films.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("user_id", "film_id"),
+    )
+    op.create_index(
+        op.f("ix_film_ratings_film_id"), "film_ratings", ["film_id"], unique=False
+    )
+
+    # Таблица новая, оценок еще нет: нули и NULL и есть точные начальные значения
+    op.add_column(
+        "films",
+        sa.Column(
+            "ratings_count", sa.Integer(), server_default=sa.text("0"), nullable=False
+        ),
+    )
+    op.add_column(
+        "films",
+        sa.Column(
+            "ratings_sum", sa.BigInteger(), server_default=sa.text("0"), nullable=False
+        ),
+    )
+    op.add_column("films", sa.Column("bayesian_rating", sa.Float(), nullable=True))
+    op.create_index(
+        "ix_films_bayesian_rating",
+        "films",
+        [sa.text("bayesian_rating DESC NULLS LAST"), "id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_films_bayesian_rating", table_name="films")
+    op.drop_column("films", "bayesian_rating")
+    op.drop_column("films", "ratings_sum")
+    op.drop_column("films", "ratings_count")
+    op.drop_index(op.f("ix_film_ratings_film_id"), table_name="film_ratings")
+    op.drop_table("film_ratings")
@@ -0,0 +1,57 @@
+"""add popularity counters to films
+
+Revision ID: 8f2c6b1d4e90
+Revises: 5e0a9d3b7c14
+Create Date: 2026-10-19 13:05:48.552190
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "8f2c6b1d4e90"
+down_revision: Union[str, Sequence[str], None] = "5e0a9d3b7c14"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "films",
+        sa.Column(
+            "favorites_count", sa.Integer(), server_default=sa.text("0"), nullable=False
+        ),
+    )
+    op.add_column(
+        "films",
+        sa.Column(
+            "views_count", sa.Integer(), server_default=sa.text("0"), nullable=False
+        ),
+    )
+    op.create_index(
+        op.f("ix_films_favorites_count"), "films", ["favorites_count"], unique=False
+    )
+    op.create_index(
+        op.f("ix_films_views_count"), "films", ["views_count"], unique=False
+    )
+    # Начальные значения считаем один раз, дальше их ведет PopularityService
+    op.execute(
+        """
+        UPDATE films SET
+            favorites_count = (SELECT count(*) FROM favorites WHERE favorites.film_id = films.id),
+            views_count = (SELECT count(*) FROM watch_history WHERE watch_history.film_id = films.id)
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_films_views_count"), table_name="films")
+    op.drop_index(op.f("ix_films_favorites_count"), table_name="films")
+    op.drop_column("films", "views_count")
+    op.drop_column("films", "favorites_count")
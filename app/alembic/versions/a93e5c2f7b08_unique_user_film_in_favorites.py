@@ -0,0 +1,56 @@
+"""unique user film in favorites
+
+Revision ID: a93e5c2f7b08
+Revises: 8f2c6b1d4e90
+Create Date: 2026-10-19 13:47:12.630874
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a93e5c2f7b08"
+down_revision: Union[str, Sequence[str], None] = "8f2c6b1d4e90"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Оставляем самую раннюю запись для каждой пары пользователь/фильм
+    op.execute(
+        """
+        DELETE FROM favorites a
+        USING favorites b
+        WHERE a.user_id = b.user_id AND a.film_id = b.film_id AND a.id > b.id
+        """
+    )
+    op.create_unique_constraint(
+        "uq_favorites_user_film", "favorites", ["user_id", "film_id"]
+    )
+    op.create_index(
+        op.f("ix_favorites_film_id"), "favorites", ["film_id"], unique=False
+    )
+    # created_at пишется с таймзоной, колонка была без нее
+    op.alter_column(
+        "favorites",
+        "created_at",
+        type_=sa.DateTime(timezone=True),
+        postgresql_using="created_at AT TIME ZONE 'UTC'",
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.alter_column(
+        "favorites",
+        "created_at",
+        type_=sa.DateTime(),
+        postgresql_using="created_at AT TIME ZONE 'UTC'",
+    )
+    op.drop_index(op.f("ix_favorites_film_id"), table_name="favorites")
+    op.drop_constraint("uq_favorites_user_film", "favorites", type_="unique")
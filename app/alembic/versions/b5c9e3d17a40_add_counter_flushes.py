@@ -0,0 +1,39 @@
+"""add counter flushes
+
+Revision ID: b5c9e3d17a40
+Revises: 7a3f2e91c5d8
+Create Date: 2026-10-20 10:05:37.214903
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b5c9e3d17a40"
+down_revision: Union[str, Sequence[str], None] = "7a3f2e91c5d8"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "counter_flushes",
+        sa.Column("flush_id", sa.String(length=32), nullable=False),
+        sa.Column(
+            "applied_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("flush_id"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("counter_flushes")
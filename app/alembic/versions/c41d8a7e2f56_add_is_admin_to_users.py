@@ -0,0 +1,34 @@
+"""add is_admin to users
+
+Revision ID: c41d8a7e2f56
+Revises: 3b7e1f0c9a21
+Create Date: 2026-10-19 11:02:17.904551
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c41d8a7e2f56"
+down_revision: Union[str, Sequence[str], None] = "3b7e1f0c9a21"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "users",
+        sa.Column(
+            "is_admin", sa.Boolean(), server_default=sa.false(), nullable=False
+        ),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("users", "is_admin")
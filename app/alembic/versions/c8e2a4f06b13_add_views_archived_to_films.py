@@ -0,0 +1,44 @@
+"""add views archived to films
+
+Revision ID: c8e2a4f06b13
+Revises: b5c9e3d17a40
+Create Date: 2026-10-20 11:24:03.671528
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c8e2a4f06b13"
+down_revision: Union[str, Sequence[str], None] = "b5c9e3d17a40"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "films",
+        sa.Column(
+            "views_archived", sa.Integer(), server_default=sa.text("0"), nullable=False
+        ),
+    )
+    # Если партиции уже удалялись, их просмотры остались только в views_count:
+    # разница с watch_history и есть архив
+    op.execute(
+        """
+        UPDATE films SET views_archived = GREATEST(
+            views_count - (SELECT count(*) FROM watch_history WHERE watch_history.film_id = films.id),
+            0
+        )
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("films", "views_archived")
@@ -0,0 +1,34 @@
+"""index watch_history by user, film and watched_at
+
+Revision ID: d27b4f81a6c3
+Revises: a93e5c2f7b08
+Create Date: 2026-10-19 14:31:56.209417
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "d27b4f81a6c3"
+down_revision: Union[str, Sequence[str], None] = "a93e5c2f7b08"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_watch_history_user_film_watched_at",
+        "watch_history",
+        ["user_id", "film_id", "watched_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_watch_history_user_film_watched_at", table_name="watch_history")
@@ -0,0 +1,148 @@
+"""partition watch_history by month
+
+Revision ID: e6a1c0b59d72
+Revises: d27b4f81a6c3
+Create Date: 2026-10-19 15:18:33.482019
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e6a1c0b59d72"
+down_revision: Union[str, Sequence[str], None] = "d27b4f81a6c3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Партиции создаются от месяца самой старой записи до текущего + 3 месяца,
+# дальше их ведет WatchHistoryPartitionService
+CREATE_PARTITIONS_SQL = """
+DO $$
+DECLARE
+    month_start date;
+    last_month date := (date_trunc('month', now() AT TIME ZONE 'UTC') + interval '3 months')::date;
+BEGIN
+    SELECT COALESCE(
+        date_trunc('month', min(watched_at))::date,
+        date_trunc('month', now() AT TIME ZONE 'UTC')::date
+    )
+    INTO month_start
+    FROM watch_history_old;
+
+    WHILE month_start <= last_month LOOP
+        EXECUTE format(
+            'CREATE TABLE IF NOT EXISTS %I PARTITION OF watch_history '
+            'FOR VALUES FROM (%L) TO (%L)',
+            'watch_history_y' || to_char(month_start, 'YYYY') || 'm' || to_char(month_start, 'MM'),
+            month_start::text || ' 00:00:00+00',
+            (month_start + interval '1 month')::date::text || ' 00:00:00+00'
+        );
+        month_start := (month_start + interval '1 month')::date;
+    END LOOP;
+END $$;
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("ALTER TABLE watch_history RENAME TO watch_history_old")
+    op.execute(
+        "ALTER INDEX ix_watch_history_user_film_watched_at "
+        "RENAME TO ix_watch_history_old_user_film_watched_at"
+    )
+    op.execute(
+        "ALTER TABLE watch_history_old RENAME CONSTRAINT watch_history_pkey "
+        "TO watch_history_old_pkey"
+    )
+    # Иначе sequence удалится вместе со старой таблицей
+    op.execute("ALTER SEQUENCE watch_history_id_seq OWNED BY NONE")
+
+    op.execute(
+        """
+        CREATE TABLE watch_history (
+            id integer NOT NULL DEFAULT nextval('watch_history_id_seq'),
+            user_id integer NOT NULL REFERENCES users (id),
+            film_id integer NOT NULL REFERENCES films (id),
+            watched_at timestamp with time zone NOT NULL,
+            watch_duration integer NOT NULL,
+            CONSTRAINT watch_history_pkey PRIMARY KEY (id, watched_at)
+        ) PARTITION BY RANGE (watched_at)
+        """
+    )
+    op.execute(CREATE_PARTITIONS_SQL)
+
+    # Старые значения писались без таймзоны, считаем их UTC
+    op.execute(
+        """
+        INSERT INTO watch_history (id, user_id, film_id, watched_at, watch_duration)
+        SELECT id, user_id, film_id, watched_at AT TIME ZONE 'UTC', watch_duration
+        FROM watch_history_old
+        """
+    )
+    op.execute("DROP TABLE watch_history_old")
+    op.execute("ALTER SEQUENCE watch_history_id_seq OWNED BY watch_history.id")
+
+    op.create_index(
+        "ix_watch_history_user_film_watched_at",
+        "watch_history",
+        ["user_id", "film_id", "watched_at"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_watch_history_watched_at", "watch_history", ["watched_at"], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_watch_history_watched_at", table_name="watch_history")
+    op.drop_index("ix_watch_history_user_film_watched_at", table_name="watch_history")
+    op.execute("ALTER TABLE watch_history RENAME TO watch_history_partitioned")
+    op.execute("ALTER SEQUENCE watch_history_id_seq OWNED BY NONE")
+
+    op.create_table(
+        "watch_history",
+        sa.Column(
+            "id",
+            sa.Integer(),
+            server_default=sa.text("nextval('watch_history_id_seq')"),
+            nullable=False,
+        ),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("film_id", sa.Integer(), nullable=False),
+        sa.Column("watched_at", sa.DateTime(), nullable=False),
+        sa.Column("watch_duration", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["film_id"],
+            ["films.id"],
+        ),
+        sa.ForeignKeyConstraint(
+            ["user_id"],
+            ["users.id"],
+        ),
+        sa.PrimaryKeyConstraint("id", name="watch_history_plain_pkey"),
+    )
+    op.execute(
+        """
+        INSERT INTO watch_history (id, user_id, film_id, watched_at, watch_duration)
+        SELECT id, user_id, film_id, watched_at AT TIME ZONE 'UTC', watch_duration
+        FROM watch_history_partitioned
+        """
+    )
+    op.execute("DROP TABLE watch_history_partitioned CASCADE")
+    op.execute(
+        "ALTER TABLE watch_history RENAME CONSTRAINT watch_history_plain_pkey "
+        "TO watch_history_pkey"
+    )
+    op.execute("ALTER SEQUENCE watch_history_id_seq OWNED BY watch_history.id")
+    op.create_index(
+        "ix_watch_history_user_film_watched_at",
+        "watch_history",
+        ["user_id", "film_id", "watched_at"],
+        unique=False,
+    )
@@ -0,0 +1,68 @@
+"""add daily analytics rollups
+
+Revision ID: f3b8d2a61c47
+Revises: e6a1c0b59d72
+Create Date: 2026-10-19 16:42:11.308415
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "f3b8d2a61c47"
+down_revision: Union[str, Sequence[str], None] = "e6a1c0b59d72"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "film_daily_stats",
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("film_id", sa.Integer(), nullable=False),
+        sa.Column("views", sa.Integer(), nullable=False),
+        sa.Column("unique_viewers", sa.Integer(), nullable=False),
+        sa.Column("watch_seconds", sa.BigInteger(), nullable=False),
+        sa.ForeignKeyConstraint(["film_id"], ["films.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("day", "film_id"),
+    )
+    op.create_index(
+        op.f("ix_film_daily_stats_film_id"), "film_daily_stats", ["film_id"], unique=False
+    )
+    op.create_table(
+        "genre_daily_stats",
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("genre_id", sa.Integer(), nullable=False),
+        sa.Column("views", sa.Integer(), nullable=False),
+        sa.Column("unique_viewers", sa.Integer(), nullable=False),
+        sa.Column("watch_seconds", sa.BigInteger(), nullable=False),
+        sa.ForeignKeyConstraint(["genre_id"], ["genres.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("day", "genre_id"),
+    )
+    op.create_index(
+        op.f("ix_genre_daily_stats_genre_id"),
+        "genre_daily_stats",
+        ["genre_id"],
+        unique=False,
+    )
+    op.create_table(
+        "analytics_watermarks",
+        sa.Column("name", sa.String(length=64), nullable=False),
+        sa.Column("processed_until", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("name"),
+    )
+    # Агрегаты за прошлое заполнит первый проход AnalyticsService
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("analytics_watermarks")
+    op.drop_index(op.f("ix_genre_daily_stats_genre_id"), table_name="genre_daily_stats")
+    op.drop_table("genre_daily_stats")
+    op.drop_index(op.f("ix_film_daily_stats_film_id"), table_name="film_daily_stats")
+    op.drop_table("film_daily_stats")
@@ -1,4 +1,24 @@
 from .auth import router as auth_router
+from .films import router as films_router
+from .admin import router as admin_router
+from .favorites import router as favorites_router
+from .watch import router as watch_router
+from .me import router as me_router
+from .analytics import router as analytics_router
+from .ratings import router as ratings_router
+from .actors import router as actors_router
+from .metrics import router as metrics_router
 
 
-__all__ = ["auth_router"]
+__all__ = [
+    "auth_router",
+    "films_router",
+    "admin_router",
+    "favorites_router",
+    "watch_router",
+    "me_router",
+    "analytics_router",
+    "ratings_router",
+    "actors_router",
+    "metrics_router",
+]
@@ -0,0 +1,51 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.schemas.actor import (
+    ActorListResponse,
+    ActorResponse,
+    ActorWithFilmsResponse,
+    actor_list_adapter,
+)
+from app.crud.actor import ActorCRUD
+from app.core.dependencies import get_db_session, get_sparse_fields
+from app.core.responses import typed_json_response
+from app.core.sparse_fields import sparse_adapter, sparse_list_adapter
+
+router = APIRouter(prefix="/actors", tags=["actors"])
+
+
+@router.get("", response_model=ActorListResponse, status_code=status.HTTP_200_OK)
+async def get_actors(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=100),
+    fields: Optional[tuple[str, ...]] = Depends(get_sparse_fields(ActorResponse)),
+    db: AsyncSession = Depends(get_db_session),
+):
+
+    actors, total = await ActorCRUD.get_list(db, skip=skip, limit=limit, fields=fields)
+    adapter = (
+        actor_list_adapter if fields is None else sparse_list_adapter(ActorResponse, fields)
+    )
+    return typed_json_response(adapter, {"items": actors, "total": total})
+
+
+@router.get(
+    "/{actor_id}", response_model=ActorWithFilmsResponse, status_code=status.HTTP_200_OK
+)
+async def get_actor(
+    actor_id: int,
+    fields: Optional[tuple[str, ...]] = Depends(get_sparse_fields(ActorWithFilmsResponse)),
+    db: AsyncSession = Depends(get_db_session),
+):
+
+    actor = await ActorCRUD.get_by_id(db, actor_id, fields=fields)
+    if not actor:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Актер не найден"
+        )
+
+    if fields is not None:
+        return typed_json_response(sparse_adapter(ActorWithFilmsResponse, fields), actor)
+    return actor
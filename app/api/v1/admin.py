@@ -0,0 +1,112 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Query, Header
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from sqlalchemy.engine import Row
+from app.core.database import db_manager
+from app.core.dependencies import get_current_admin, get_db_session
+from app.crud.rating import RatingCRUD
+from app.schemas.catalog_import import (
+    CatalogEntity,
+    ImportFormat,
+    CatalogImportResponse,
+)
+from app.services.catalog_import_service import CatalogImportService
+from app.services.catalog_export_service import CatalogExportService
+from app.services.watch_ingest_service import watch_ingest_service
+from app.schemas.watch_history import WatchIngestStatsResponse
+from app.schemas.rating import RatingRecalculateResponse
+from app.schemas.compression import CompressionRouteStats
+from app.core.compression import choose_encoding, compression_stats
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+import_service = CatalogImportService()
+export_service = CatalogExportService()
+
+
+@router.post(
+    "/catalog/import/{entity}",
+    response_model=CatalogImportResponse,
+    status_code=status.HTTP_200_OK,
+)
+async def import_catalog(
+    entity: CatalogEntity,
+    request: Request,
+    format: ImportFormat = Query(ImportFormat.jsonl),
+    admin: Row = Depends(get_current_admin),
+):
+
+    try:
+        # Тело запроса читается потоком, в память целиком не попадает
+        async with db_manager.engine.connect() as conn:
+            return await import_service.import_stream(
+                conn, entity, request.stream(), format
+            )
+
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Ошибка формата импорта: {str(e)}",
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Ошибка импорта каталога",
+        )
+
+
+@router.get("/catalog/export", status_code=status.HTTP_200_OK)
+async def export_catalog(
+    after_id: int = Query(0, ge=0, description="Продолжить выгрузку после этого ID"),
+    accept_encoding: Optional[str] = Header(None),
+    admin: Row = Depends(get_current_admin),
+):
+
+    headers = {"Vary": "Accept-Encoding"}
+
+    # Выгрузка сжимается сама, только gzip: q=0 - отказ клиента
+    if choose_encoding(accept_encoding, supported=("gzip",)) == "gzip":
+        headers["Content-Encoding"] = "gzip"
+        body = export_service.iter_ndjson_gzip(after_id=after_id)
+    else:
+        body = export_service.iter_ndjson(after_id=after_id)
+
+    return StreamingResponse(
+        body, media_type="application/x-ndjson", headers=headers
+    )
+
+
+@router.get(
+    "/watch-ingest/stats",
+    response_model=WatchIngestStatsResponse,
+    status_code=status.HTTP_200_OK,
+)
+async def get_watch_ingest_stats(admin: Row = Depends(get_current_admin)):
+
+    return await watch_ingest_service.stats()
+
+
+@router.get(
+    "/compression/stats",
+    response_model=list[CompressionRouteStats],
+    status_code=status.HTTP_200_OK,
+)
+async def get_compression_stats(admin: Row = Depends(get_current_admin)):
+
+    # Счетчики текущего процесса воркера с его запуска
+    return compression_stats.snapshot()
+
+
+@router.post(
+    "/ratings/recalculate",
+    response_model=RatingRecalculateResponse,
+    status_code=status.HTTP_200_OK,
+)
+async def recalculate_ratings(
+    admin: Row = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_db_session),
+):
+
+    # Только после смены RATING_PRIOR_*: обычные оценки агрегаты ведут сами
+    return {"films": await RatingCRUD.recalculate(db)}
@@ -0,0 +1,213 @@
+from datetime import date, timedelta, UTC, datetime
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from sqlalchemy.engine import Row
+from app.schemas.analytics import (
+    FilmDailyStatsResponse,
+    GenreDailyStatsResponse,
+    TopFilmResponse,
+    RollupReprocessResponse,
+    WatchReportResponse,
+    UniqueViewersResponse,
+    UniqueViewersCheck,
+)
+from app.crud.analytics import AnalyticsCRUD
+from app.core.dependencies import get_db_session, get_current_admin
+from app.services.analytics_service import analytics_service
+from app.services.unique_viewers_service import (
+    unique_viewers_service,
+    STANDARD_ERROR,
+)
+
+router = APIRouter(prefix="/analytics", tags=["analytics"])
+
+DEFAULT_PERIOD_DAYS = 30
+MAX_PERIOD_DAYS = 366
+
+
+def resolve_period(date_from: Optional[date], date_to: Optional[date]) -> tuple[date, date]:
+    date_to = date_to or datetime.now(UTC).date()
+    date_from = date_from or date_to - timedelta(days=DEFAULT_PERIOD_DAYS - 1)
+
+    if date_from > date_to:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Начало периода позже конца",
+        )
+    if (date_to - date_from).days >= MAX_PERIOD_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Период не может быть длиннее {MAX_PERIOD_DAYS} дней",
+        )
+    return date_from, date_to
+
+
+@router.get(
+    "/films/top", response_model=list[TopFilmResponse], status_code=status.HTTP_200_OK
+)
+async def get_top_films(
+    date_from: Optional[date] = Query(None),
+    date_to: Optional[date] = Query(None),
+    limit: int = Query(20, ge=1, le=100),
+    admin: Row = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_db_session),
+):
+
+    date_from, date_to = resolve_period(date_from, date_to)
+    return await AnalyticsCRUD.get_top_films(db, date_from, date_to, limit=limit)
+
+
+@router.get(
+    "/films/{film_id}/daily",
+    response_model=list[FilmDailyStatsResponse],
+    status_code=status.HTTP_200_OK,
+)
+async def get_film_daily_stats(
+    film_id: int,
+    date_from: Optional[date] = Query(None),
+    date_to: Optional[date] = Query(None),
+    admin: Row = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_db_session),
+):
+
+    date_from, date_to = resolve_period(date_from, date_to)
+    return await AnalyticsCRUD.get_film_daily(db, film_id, date_from, date_to)
+
+
+@router.get(
+    "/genres/{genre_id}/daily",
+    response_model=list[GenreDailyStatsResponse],
+    status_code=status.HTTP_200_OK,
+)
+async def get_genre_daily_stats(
+    genre_id: int,
+    date_from: Optional[date] = Query(None),
+    date_to: Optional[date] = Query(None),
+    admin: Row = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_db_session),
+):
+
+    date_from, date_to = resolve_period(date_from, date_to)
+    return await AnalyticsCRUD.get_genre_daily(db, genre_id, date_from, date_to)
+
+
+async def get_unique_viewers(
+    kind: str, entity_id: int, date_from: Optional[date], date_to: Optional[date]
+) -> dict:
+    date_from, date_to = resolve_period(date_from, date_to)
+
+    try:
+        return {
+            "date_from": date_from,
+            "date_to": date_to,
+            "unique_viewers": await unique_viewers_service.count(
+                kind, entity_id, date_from, date_to
+            ),
+            "standard_error": STANDARD_ERROR,
+            "daily": await unique_viewers_service.daily(
+                kind, entity_id, date_from, date_to
+            ),
+        }
+
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Счетчики уникальных зрителей временно недоступны",
+        )
+
+
+@router.get(
+    "/films/{film_id}/unique-viewers",
+    response_model=UniqueViewersResponse,
+    status_code=status.HTTP_200_OK,
+)
+async def get_film_unique_viewers(
+    film_id: int,
+    date_from: Optional[date] = Query(None),
+    date_to: Optional[date] = Query(None),
+    admin: Row = Depends(get_current_admin),
+):
+
+    return await get_unique_viewers("film", film_id, date_from, date_to)
+
+
+@router.get(
+    "/films/{film_id}/unique-viewers/check",
+    response_model=list[UniqueViewersCheck],
+    status_code=status.HTTP_200_OK,
+)
+async def check_film_unique_viewers(
+    film_id: int,
+    date_from: Optional[date] = Query(None),
+    date_to: Optional[date] = Query(None),
+    admin: Row = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_db_session),
+):
+
+    date_from, date_to = resolve_period(date_from, date_to)
+    return await unique_viewers_service.check_film(db, film_id, date_from, date_to)
+
+
+@router.get(
+    "/genres/{genre_id}/unique-viewers",
+    response_model=UniqueViewersResponse,
+    status_code=status.HTTP_200_OK,
+)
+async def get_genre_unique_viewers(
+    genre_id: int,
+    date_from: Optional[date] = Query(None),
+    date_to: Optional[date] = Query(None),
+    admin: Row = Depends(get_current_admin),
+):
+
+    return await get_unique_viewers("genre", genre_id, date_from, date_to)
+
+
+@router.get(
+    "/reports/watch",
+    response_model=WatchReportResponse,
+    status_code=status.HTTP_200_OK,
+)
+async def get_watch_report(
+    date_from: Optional[date] = Query(None),
+    date_to: Optional[date] = Query(None),
+    top_n: int = Query(20, ge=1, le=100),
+    admin: Row = Depends(get_current_admin),
+):
+
+    date_from, date_to = resolve_period(date_from, date_to)
+
+    try:
+        return await analytics_service.build_report(date_from, date_to, top_n=top_n)
+
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Ошибка построения отчета",
+        )
+
+
+@router.post(
+    "/rollups/reprocess",
+    response_model=RollupReprocessResponse,
+    status_code=status.HTTP_200_OK,
+)
+async def reprocess_rollups(
+    date_from: date = Query(...),
+    date_to: date = Query(...),
+    admin: Row = Depends(get_current_admin),
+):
+
+    date_from, date_to = resolve_period(date_from, date_to)
+
+    try:
+        days = await analytics_service.reprocess(date_from, date_to)
+        return {"date_from": date_from, "date_to": date_to, "days": days}
+
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Ошибка пересчета агрегатов",
+        )
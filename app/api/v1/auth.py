@@ -1,4 +1,5 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Response, Cookie
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, status, Response, Cookie, Header
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.schemas.user import (
@@ -9,10 +10,17 @@ from app.schemas.user import (
     UserChangePassword,
     UserLogin,
 )
-from app.models.user import User
+from sqlalchemy.engine import Row
 from app.services.auth_service import AuthService
-from app.core.dependencies import get_current_user, get_db_session
+from app.core.dependencies import get_current_user_profile, get_db_session
 from app.crud.user import UserCRUD
+from app.core.http_cache import (
+    PROFILE_CACHE_CONTROL,
+    make_weak_etag,
+    etag_matches,
+    set_cache_headers,
+    not_modified,
+)
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 auth_service = AuthService()
@@ -138,7 +146,7 @@ async def logout_user(
 @router.post("/logout-all", status_code=status.HTTP_200_OK)
 async def logout_all_devices(
     response: Response,
-    current_user: User = Depends(get_current_user),
+    current_user: Row = Depends(get_current_user_profile),
     db: AsyncSession = Depends(get_db_session),
 ):
 
@@ -206,7 +214,7 @@ async def refresh_tokens(
 @router.post("/change-password", status_code=status.HTTP_200_OK)
 async def user_change_password(
     user_data: UserChangePassword,
-    current_user: User = Depends(get_current_user),
+    current_user: Row = Depends(get_current_user_profile),
     db: AsyncSession = Depends(get_db_session),
 ):
 
@@ -232,8 +240,17 @@ async def user_change_password(
 
 
 @router.get("/me", response_model=UserResponse, status_code=status.HTTP_200_OK)
-async def get_current_user_info(current_user: User = Depends(get_current_user)):
+async def get_current_user_info(
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    current_user: Row = Depends(get_current_user_profile),
+):
+
+    etag = make_weak_etag("user", current_user.id, current_user.updated_at)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag, PROFILE_CACHE_CONTROL)
 
+    set_cache_headers(response, etag, PROFILE_CACHE_CONTROL)
     return current_user
 
 
@@ -241,7 +258,7 @@ async def get_current_user_info(current_user: User = Depends(get_current_user)):
 async def update_user(
     user_data: UserUpdate,
     db: AsyncSession = Depends(get_db_session),
-    current_user: User = Depends(get_current_user),
+    current_user: Row = Depends(get_current_user_profile),
 ):
 
     try:
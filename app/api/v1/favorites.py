@@ -0,0 +1,82 @@
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from sqlalchemy.engine import Row
+from app.schemas.favorites import (
+    FavoriteResponse,
+    FavoriteLookupRequest,
+    FavoriteLookupResponse,
+    FavoriteStatusResponse,
+)
+from app.crud.favorite import FavoriteCRUD
+from app.core.dependencies import get_current_user_profile, get_db_session
+from app.services.popularity_service import popularity_service
+from app.services.trending_service import trending_service
+
+router = APIRouter(prefix="/me/favorites", tags=["favorites"])
+
+
+@router.get("", response_model=list[FavoriteResponse], status_code=status.HTTP_200_OK)
+async def get_favorites(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=100),
+    current_user: Row = Depends(get_current_user_profile),
+    db: AsyncSession = Depends(get_db_session),
+):
+
+    return await FavoriteCRUD.get_user_favorites(
+        db, user_id=current_user.id, skip=skip, limit=limit
+    )
+
+
+@router.post(
+    "/lookup", response_model=FavoriteLookupResponse, status_code=status.HTTP_200_OK
+)
+async def lookup_favorites(
+    lookup: FavoriteLookupRequest,
+    current_user: Row = Depends(get_current_user_profile),
+    db: AsyncSession = Depends(get_db_session),
+):
+
+    favorited = await FavoriteCRUD.get_favorited_ids(
+        db, user_id=current_user.id, film_ids=lookup.film_ids
+    )
+    return {"film_ids": [film_id for film_id in lookup.film_ids if film_id in favorited]}
+
+
+@router.put(
+    "/{film_id}", response_model=FavoriteStatusResponse, status_code=status.HTTP_200_OK
+)
+async def add_favorite(
+    film_id: int,
+    current_user: Row = Depends(get_current_user_profile),
+    db: AsyncSession = Depends(get_db_session),
+):
+
+    try:
+        created = await FavoriteCRUD.add(db, user_id=current_user.id, film_id=film_id)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+
+    if created:
+        await popularity_service.record_favorite(film_id)
+        await trending_service.record_favorite(film_id)
+
+    return {"film_id": film_id, "favorited": True, "changed": created}
+
+
+@router.delete(
+    "/{film_id}", response_model=FavoriteStatusResponse, status_code=status.HTTP_200_OK
+)
+async def remove_favorite(
+    film_id: int,
+    current_user: Row = Depends(get_current_user_profile),
+    db: AsyncSession = Depends(get_db_session),
+):
+
+    removed = await FavoriteCRUD.remove(db, user_id=current_user.id, film_id=film_id)
+
+    if removed:
+        await popularity_service.record_favorite(film_id, delta=-1)
+
+    return {"film_id": film_id, "favorited": False, "changed": removed}
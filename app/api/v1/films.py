@@ -0,0 +1,217 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, status, Response, Header, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.schemas.film import (
+    FilmCardListResponse,
+    FilmDetailResponse,
+    FilmPopularityResponse,
+    FilmScoredCardResponse,
+    FilmBatchResponse,
+    FilmCardResponse,
+    PopularitySort,
+    film_card_list_adapter,
+    film_scored_cards_adapter,
+    film_batch_adapter,
+)
+from app.crud.film import FilmCRUD
+from app.crud.recommendation import RecommendationCRUD
+from app.models.recommendation import SOURCE_CF, SOURCE_CONTENT
+from app.core.dependencies import get_db_session, get_sparse_fields
+from app.core.config import settings
+from app.services.trending_service import trending_service
+from app.services.response_cache import response_cache
+from app.core.responses import typed_json_response, rows_as_dicts
+from app.core.sparse_fields import sparse_adapter, sparse_list_adapter
+from app.core.http_cache import (
+    CATALOG_CACHE_CONTROL,
+    make_weak_etag,
+    etag_matches,
+    set_cache_headers,
+    not_modified,
+)
+
+router = APIRouter(prefix="/films", tags=["films"])
+
+
+@router.get("", response_model=FilmCardListResponse, status_code=status.HTTP_200_OK)
+async def get_films(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=100),
+    if_none_match: Optional[str] = Header(None),
+    accept_encoding: Optional[str] = Header(None),
+    fields: Optional[tuple[str, ...]] = Depends(get_sparse_fields(FilmCardResponse)),
+    db: AsyncSession = Depends(get_db_session),
+):
+
+    total, last_updated = await FilmCRUD.get_cards_version(db)
+    etag = make_weak_etag("films", skip, limit, total, last_updated, fields)
+
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag, CATALOG_CACHE_CONTROL)
+
+    adapter = (
+        film_card_list_adapter
+        if fields is None
+        else sparse_list_adapter(FilmCardResponse, fields)
+    )
+
+    async def build() -> bytes:
+        films = await FilmCRUD.get_cards(db, skip=skip, limit=limit, fields=fields)
+        return typed_json_response(
+            adapter, {"items": rows_as_dicts(films), "total": total}
+        ).body
+
+    # Страница хранится уже сжатой, ключ по ETag меняется вместе с каталогом
+    response = await response_cache.get_or_build(
+        f"films:{etag}", accept_encoding, build
+    )
+    set_cache_headers(response, etag, CATALOG_CACHE_CONTROL)
+
+    return response
+
+
+@router.get(
+    "/popular",
+    response_model=list[FilmPopularityResponse],
+    status_code=status.HTTP_200_OK,
+)
+async def get_popular_films(
+    by: PopularitySort = Query(PopularitySort.views),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_db_session),
+):
+
+    return await FilmCRUD.get_popular(db, by=by, limit=limit)
+
+
+@router.get(
+    "/trending",
+    response_model=list[FilmScoredCardResponse],
+    status_code=status.HTTP_200_OK,
+)
+async def get_trending_films(
+    genre_id: Optional[int] = Query(None, gt=0),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_db_session),
+):
+
+    try:
+        top = await trending_service.get_top(limit, genre_id=genre_id)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Тренды временно недоступны",
+        )
+
+    cards = await FilmCRUD.get_scored_cards(db, top)
+    return typed_json_response(film_scored_cards_adapter, cards)
+
+
+@router.get("/batch", response_model=FilmBatchResponse, status_code=status.HTTP_200_OK)
+async def get_films_batch(
+    ids: str = Query(..., description="ID фильмов через запятую"),
+    db: AsyncSession = Depends(get_db_session),
+):
+
+    try:
+        # Повторы убираются, порядок первого появления сохраняется
+        film_ids = list(dict.fromkeys(int(part) for part in ids.split(",") if part.strip()))
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="ids должен быть списком целых чисел через запятую",
+        )
+
+    if not film_ids:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Не передан ни один ID"
+        )
+    if len(film_ids) > settings.FILMS_BATCH_MAX_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Не больше {settings.FILMS_BATCH_MAX_IDS} ID за запрос",
+        )
+
+    # Одно чтение film_cards по id = ANY(...), жанры и актеры уже в строке
+    cards = await FilmCRUD.get_cards_by_ids(db, film_ids)
+    response = typed_json_response(
+        film_batch_adapter,
+        {
+            "items": [cards[film_id] for film_id in film_ids if film_id in cards],
+            "missing": [film_id for film_id in film_ids if film_id not in cards],
+        },
+    )
+    response.headers["Cache-Control"] = CATALOG_CACHE_CONTROL
+
+    return response
+
+
+@router.get(
+    "/{film_id}/similar-users-liked",
+    response_model=list[FilmScoredCardResponse],
+    status_code=status.HTTP_200_OK,
+)
+async def get_similar_users_liked(
+    film_id: int,
+    limit: int = Query(20, ge=1, le=50),
+    db: AsyncSession = Depends(get_db_session),
+):
+
+    similar = await RecommendationCRUD.get_similar(db, film_id, SOURCE_CF, limit)
+    cards = await FilmCRUD.get_scored_cards(db, similar)
+    return typed_json_response(film_scored_cards_adapter, cards)
+
+
+@router.get(
+    "/{film_id}/similar",
+    response_model=list[FilmScoredCardResponse],
+    status_code=status.HTTP_200_OK,
+)
+async def get_similar_films(
+    film_id: int,
+    limit: int = Query(20, ge=1, le=50),
+    db: AsyncSession = Depends(get_db_session),
+):
+
+    # Готовый top-k по жанрам и актерам, работает и для фильмов без просмотров
+    similar = await RecommendationCRUD.get_similar(db, film_id, SOURCE_CONTENT, limit)
+    cards = await FilmCRUD.get_scored_cards(db, similar)
+    return typed_json_response(film_scored_cards_adapter, cards)
+
+
+@router.get(
+    "/{film_id}", response_model=FilmDetailResponse, status_code=status.HTTP_200_OK
+)
+async def get_film(
+    film_id: int,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    fields: Optional[tuple[str, ...]] = Depends(get_sparse_fields(FilmDetailResponse)),
+    db: AsyncSession = Depends(get_db_session),
+):
+
+    version = await FilmCRUD.get_version(db, film_id)
+    if version is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Фильм не найден"
+        )
+
+    etag = make_weak_etag("film", film_id, version, fields)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag, CATALOG_CACHE_CONTROL)
+
+    film = await FilmCRUD.get_detail(db, film_id, fields=fields)
+    if not film:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Фильм не найден"
+        )
+
+    if fields is not None:
+        # Урезанный ответ не проходит response_model, у него своя схема
+        sparse = typed_json_response(sparse_adapter(FilmDetailResponse, fields), film)
+        set_cache_headers(sparse, etag, CATALOG_CACHE_CONTROL)
+        return sparse
+
+    set_cache_headers(response, etag, CATALOG_CACHE_CONTROL)
+    return film
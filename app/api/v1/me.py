@@ -0,0 +1,90 @@
+import numpy as np
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.schemas.watch_history import ContinueWatchingItem
+from app.schemas.film import FilmScoredCardResponse, film_scored_cards_adapter
+from app.crud.film import FilmCRUD
+from app.crud.recommendation import RecommendationCRUD
+from app.core.config import settings
+from app.core.dependencies import get_current_user_id, get_db_session
+from app.core.responses import typed_json_response, trusted_json_response
+from app.services.affinity_service import affinity_store
+from app.services.continue_watching_service import continue_watching_service
+from app.services.trending_service import trending_service
+
+router = APIRouter(prefix="/me", tags=["me"])
+
+
+@router.get(
+    "/continue-watching",
+    response_model=list[ContinueWatchingItem],
+    status_code=status.HTTP_200_OK,
+)
+async def get_continue_watching(user_id: int = Depends(get_current_user_id)):
+
+    try:
+        # Элементы собирает сервис ровно по схеме ContinueWatchingItem
+        items = await continue_watching_service.get_feed(user_id)
+
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Лента просмотра временно недоступна",
+        )
+
+    return trusted_json_response(items)
+
+
+@router.get(
+    "/recommendations",
+    response_model=list[FilmScoredCardResponse],
+    status_code=status.HTTP_200_OK,
+)
+async def get_recommendations(
+    limit: int = Query(20, ge=1, le=50),
+    user_id: int = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db_session),
+):
+
+    recommendations = await RecommendationCRUD.get_user_recommendations(
+        db, user_id, limit
+    )
+
+    # Новым пользователям без истории отдаем общие тренды
+    if not recommendations:
+        try:
+            recommendations = await trending_service.get_top(limit)
+        except Exception as e:
+            recommendations = []
+
+    cards = await FilmCRUD.get_scored_cards(db, recommendations)
+    return typed_json_response(film_scored_cards_adapter, cards)
+
+
+@router.get(
+    "/films",
+    response_model=list[FilmScoredCardResponse],
+    status_code=status.HTTP_200_OK,
+)
+async def get_personal_films(
+    limit: int = Query(20, ge=1, le=100),
+    user_id: int = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db_session),
+):
+
+    candidates = await FilmCRUD.get_popular(db, limit=settings.AFFINITY_CANDIDATES)
+    film_ids = np.array([film.id for film in candidates], dtype=np.int64)
+    # Базовая оценка - позиция в популярных, от 1 до 0
+    base_scores = 1 - np.arange(len(film_ids), dtype=np.float32) / max(len(film_ids), 1)
+
+    # Без вектора (новый пользователь, нет снимка) - порядок популярности
+    reranked = affinity_store.rerank(user_id, film_ids, base_scores)
+    if reranked is not None:
+        order, scores = reranked
+        film_ids, base_scores = film_ids[order], scores
+
+    cards = await FilmCRUD.get_scored_cards(
+        db, list(zip(film_ids[:limit].tolist(), base_scores[:limit].tolist()))
+    )
+    return typed_json_response(film_scored_cards_adapter, cards)
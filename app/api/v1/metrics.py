@@ -0,0 +1,12 @@
+from fastapi import APIRouter
+
+from app.core.metrics import metrics_response
+
+router = APIRouter(prefix="/metrics", tags=["metrics"])
+
+
+@router.get("", include_in_schema=False)
+async def get_metrics():
+
+    # Собирается по всем воркерам, см. app/core/metrics.py
+    return metrics_response()
@@ -0,0 +1,71 @@
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from sqlalchemy.engine import Row
+from app.schemas.rating import RatingRequest, RatingResponse, RatingStatusResponse
+from app.crud.rating import RatingCRUD
+from app.core.dependencies import get_current_user_profile, get_db_session
+
+router = APIRouter(prefix="/me/ratings", tags=["ratings"])
+
+
+@router.get("", response_model=list[RatingResponse], status_code=status.HTTP_200_OK)
+async def get_ratings(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=100),
+    current_user: Row = Depends(get_current_user_profile),
+    db: AsyncSession = Depends(get_db_session),
+):
+
+    return await RatingCRUD.get_user_ratings(
+        db, user_id=current_user.id, skip=skip, limit=limit
+    )
+
+
+@router.put(
+    "/{film_id}", response_model=RatingStatusResponse, status_code=status.HTTP_200_OK
+)
+async def rate_film(
+    film_id: int,
+    rating: RatingRequest,
+    current_user: Row = Depends(get_current_user_profile),
+    db: AsyncSession = Depends(get_db_session),
+):
+
+    try:
+        ratings_count, bayesian_rating = await RatingCRUD.rate(
+            db, user_id=current_user.id, film_id=film_id, score=rating.score
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+
+    return {
+        "film_id": film_id,
+        "score": rating.score,
+        "changed": True,
+        "ratings_count": ratings_count,
+        "bayesian_rating": bayesian_rating,
+    }
+
+
+@router.delete(
+    "/{film_id}", response_model=RatingStatusResponse, status_code=status.HTTP_200_OK
+)
+async def remove_rating(
+    film_id: int,
+    current_user: Row = Depends(get_current_user_profile),
+    db: AsyncSession = Depends(get_db_session),
+):
+
+    aggregate = await RatingCRUD.remove(db, user_id=current_user.id, film_id=film_id)
+    if aggregate is None:
+        return {"film_id": film_id, "score": None, "changed": False}
+
+    ratings_count, bayesian_rating = aggregate
+    return {
+        "film_id": film_id,
+        "score": None,
+        "changed": True,
+        "ratings_count": ratings_count,
+        "bayesian_rating": bayesian_rating,
+    }
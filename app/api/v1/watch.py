@@ -0,0 +1,28 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+
+from app.schemas.watch_history import WatchProgressHeartbeat
+from app.core.dependencies import get_current_user_id
+from app.services.watch_ingest_service import watch_ingest_service
+
+router = APIRouter(prefix="/watch", tags=["watch"])
+
+
+@router.post("/progress", status_code=status.HTTP_202_ACCEPTED)
+async def report_watch_progress(
+    heartbeat: WatchProgressHeartbeat,
+    user_id: int = Depends(get_current_user_id),
+):
+
+    try:
+        await watch_ingest_service.record(
+            user_id=user_id,
+            film_id=heartbeat.film_id,
+            watch_duration=heartbeat.watch_duration,
+        )
+        return {"accepted": True}
+
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Прогресс просмотра временно не принимается",
+        )
@@ -0,0 +1,308 @@
+"""Сжатие ответов: gzip и brotli, если установлен пакет brotli
+
+Чистый ASGI middleware. Сжимаются только текстовые типы (json, ndjson,
+text/*) от COMPRESSION_MIN_SIZE байт: на мелких ответах заголовки и CPU
+съедают выигрыш. Потоковые ответы (StreamingResponse, выгрузка каталога)
+сжимаются по мере отдачи, каждый кусок сбрасывается в сеть сразу.
+Ответы, у которых Content-Encoding уже есть (готовые сжатые записи кеша,
+gzip выгрузки), отдаются как есть и второй раз не сжимаются.
+
+По каждому маршруту копится статистика: байты до и после, процессорное
+время сжатия и число ответов, отданных уже сжатыми. Статистика своя в
+каждом процессе воркера, см. GET /admin/compression/stats.
+"""
+
+import gzip
+import time
+import zlib
+from dataclasses import dataclass
+from typing import Optional, Sequence
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "text/",
+)
+ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+UNMATCHED_ROUTE = "unmatched"
+# Внутренний заголовок готовых сжатых ответов: исходный размер для статистики,
+# клиенту не уходит
+UNCOMPRESSED_LENGTH_HEADER = "x-uncompressed-length"
+
+
+def choose_encoding(
+    accept_encoding: Optional[str], supported: Sequence[str] = ENCODINGS
+) -> Optional[str]:
+    """
+    Лучшее из supported (в порядке предпочтения) по Accept-Encoding, q=0 - запрет
+    """
+    if not accept_encoding:
+        return None
+
+    accepted = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip()] = quality
+
+    wildcard = accepted.get("*", 0.0)
+    for encoding in supported:
+        if accepted.get(encoding, wildcard) > 0:
+            return encoding
+    return None
+
+
+def compress(body: bytes, encoding: str, gzip_level: int, brotli_quality: int) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=brotli_quality)
+    return gzip.compress(body, compresslevel=gzip_level, mtime=0)
+
+
+def decompress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.decompress(body)
+    return gzip.decompress(body)
+
+
+@dataclass
+class RouteCompressionStats:
+    responses: int = 0
+    compressed: int = 0
+    precompressed: int = 0
+    bytes_in: int = 0
+    bytes_out: int = 0
+    cpu_seconds: float = 0.0
+
+
+class CompressionStats:
+
+    def __init__(self):
+        self._routes: dict[str, RouteCompressionStats] = {}
+
+    def record(
+        self,
+        route: str,
+        bytes_in: int,
+        bytes_out: int,
+        cpu_seconds: float = 0.0,
+        compressed: bool = False,
+        precompressed: bool = False,
+    ) -> None:
+        stats = self._routes.setdefault(route, RouteCompressionStats())
+        stats.responses += 1
+        stats.compressed += compressed
+        stats.precompressed += precompressed
+        stats.bytes_in += bytes_in
+        stats.bytes_out += bytes_out
+        stats.cpu_seconds += cpu_seconds
+
+    def snapshot(self) -> list[dict]:
+        result = []
+        for route, stats in sorted(self._routes.items()):
+            saved = stats.bytes_in - stats.bytes_out
+            result.append(
+                {
+                    "route": route,
+                    "responses": stats.responses,
+                    "compressed": stats.compressed,
+                    "precompressed": stats.precompressed,
+                    "bytes_in": stats.bytes_in,
+                    "bytes_out": stats.bytes_out,
+                    "bytes_saved": saved,
+                    "ratio": stats.bytes_out / stats.bytes_in if stats.bytes_in else 1.0,
+                    "cpu_ms": stats.cpu_seconds * 1000,
+                    "cpu_us_per_kb_saved": (
+                        stats.cpu_seconds * 1e6 / (saved / 1024) if saved > 0 else 0.0
+                    ),
+                }
+            )
+        return result
+
+
+compression_stats = CompressionStats()
+
+
+class _StreamCompressor:
+
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=brotli_quality)
+            self._zlib = None
+        else:
+            self._brotli = None
+            # wbits=31 дает gzip-заголовок
+            self._zlib = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)
+
+    def compress(self, chunk: bytes, final: bool) -> bytes:
+        # Кусок потока сразу уходит клиенту, поэтому сброс после каждого
+        if self._zlib is not None:
+            data = self._zlib.compress(chunk)
+            return data + self._zlib.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+        data = self._brotli.process(chunk)
+        return data + (self._brotli.finish() if final else self._brotli.flush())
+
+
+class CompressionMiddleware:
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding"))
+        responder = _CompressionResponder(self, scope, send, encoding)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressionResponder:
+
+    def __init__(
+        self,
+        middleware: CompressionMiddleware,
+        scope: Scope,
+        send: Send,
+        encoding: Optional[str],
+    ):
+        self.middleware = middleware
+        self.scope = scope
+        self._send = send
+        self.encoding = encoding
+        self.start: Optional[Message] = None
+        self.mode: Optional[str] = None
+        self.compressor: Optional[_StreamCompressor] = None
+        self.uncompressed_length = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.cpu_seconds = 0.0
+
+    @property
+    def route(self) -> str:
+        # scope["route"] кладет роутер FastAPI, шаблон пути вместо конкретных id.
+        # У маршрутов Starlette (openapi, docs) его нет, берется имя обработчика
+        route = self.scope.get("route")
+        if route is not None:
+            return route.path
+        endpoint = self.scope.get("endpoint")
+        return getattr(endpoint, "__name__", UNMATCHED_ROUTE)
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            # Заголовки уходят вместе с первым куском тела, когда ясно, сжимаем ли
+            self.start = message
+            return
+
+        if message["type"] != "http.response.body":
+            if self.mode is None:
+                self.mode = "identity"
+                await self._send(self.start)
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.mode is None:
+            self.mode = self._choose_mode(body, more_body)
+            if self.mode == "identity":
+                await self._send(self.start)
+            elif self.mode == "buffered":
+                message["body"] = self._compress_whole(body)
+                await self._send(self.start)
+                await self._send(message)
+                self._record(compressed=True)
+                return
+            else:
+                headers = MutableHeaders(raw=self.start["headers"])
+                headers["Content-Encoding"] = self.encoding
+                del headers["Content-Length"]
+                self.compressor = _StreamCompressor(
+                    self.encoding, self.middleware.gzip_level, self.middleware.brotli_quality
+                )
+                await self._send(self.start)
+
+        self.bytes_in += len(body)
+        if self.mode == "streaming":
+            started = time.thread_time()
+            message["body"] = self.compressor.compress(body, final=not more_body)
+            self.cpu_seconds += time.thread_time() - started
+        self.bytes_out += len(message["body"])
+
+        await self._send(message)
+        if not more_body:
+            self._record(
+                compressed=self.mode == "streaming",
+                precompressed=self.mode == "precompressed",
+            )
+
+    def _choose_mode(self, body: bytes, more_body: bool) -> str:
+        headers = MutableHeaders(raw=self.start["headers"])
+        if "content-encoding" in headers:
+            if UNCOMPRESSED_LENGTH_HEADER in headers:
+                self.uncompressed_length = int(headers[UNCOMPRESSED_LENGTH_HEADER])
+                del headers[UNCOMPRESSED_LENGTH_HEADER]
+            return "precompressed"
+
+        content_type = headers.get("content-type", "")
+        if not content_type.startswith(COMPRESSIBLE_TYPES):
+            return "identity"
+        headers.add_vary_header("Accept-Encoding")
+
+        if self.encoding is None or self.start["status"] in (204, 304):
+            return "identity"
+        if not more_body:
+            return "buffered" if len(body) >= self.middleware.minimum_size else "identity"
+        return "streaming"
+
+    def _compress_whole(self, body: bytes) -> bytes:
+        started = time.thread_time()
+        compressed = compress(
+            body, self.encoding, self.middleware.gzip_level, self.middleware.brotli_quality
+        )
+        self.cpu_seconds += time.thread_time() - started
+
+        headers = MutableHeaders(raw=self.start["headers"])
+        headers["Content-Encoding"] = self.encoding
+        headers["Content-Length"] = str(len(compressed))
+
+        self.bytes_in += len(body)
+        self.bytes_out += len(compressed)
+        return compressed
+
+    def _record(self, compressed: bool = False, precompressed: bool = False) -> None:
+        compression_stats.record(
+            self.route,
+            self.uncompressed_length or self.bytes_in,
+            self.bytes_out,
+            cpu_seconds=self.cpu_seconds,
+            compressed=compressed,
+            precompressed=precompressed,
+        )
@@ -26,6 +26,8 @@ class Settings(BaseSettings):
     REFRESH_TOKEN_EXPIRE_MIN: int
 
     BCRYPT_ROUNDS: int
+    # Потоки под bcrypt: хеширование не держит event loop, bcrypt отпускает GIL
+    PASSWORD_HASH_WORKERS: int = 4
 
     DB_NAME: str
     DB_HOST: str
@@ -39,6 +41,96 @@ class Settings(BaseSettings):
 
     URL: str
 
+    LOG_LEVEL: str = "INFO"
+    # color - цветной текст для разработки, plain - текст, json - строка JSON на запись
+    LOG_FORMAT: str = "color"
+    # Доля DEBUG-записей, которые пишутся, по префиксу имени логгера:
+    # LOG_SAMPLING='{"app.crud": 0.01, "app.services.watch_ingest_service": 0.1}'
+    LOG_SAMPLING: dict[str, float] = {}
+    # SQL каждого запроса в лог (логгер sqlalchemy.engine)
+    DB_ECHO: bool = False
+
+    IMPORT_BATCH_SIZE: int = 10_000
+    EXPORT_BATCH_SIZE: int = 1_000
+
+    FILM_CARDS_REFRESH_SECONDS: int = 60
+
+    POPULARITY_FLUSH_SECONDS: int = 30
+    POPULARITY_RECONCILE_SECONDS: int = 6 * 60 * 60
+
+    WATCH_FLUSH_SECONDS: int = 5
+    WATCH_FLUSH_MAX_EVENTS: int = 5_000
+    WATCH_SESSION_GAP_MIN: int = 6 * 60
+
+    WATCH_HISTORY_PARTITIONS_AHEAD: int = 3
+    WATCH_HISTORY_RETENTION_MONTHS: int = 24
+    WATCH_HISTORY_MAINTENANCE_SECONDS: int = 6 * 60 * 60
+
+    CONTINUE_WATCHING_SIZE: int = 20
+    CONTINUE_WATCHING_TTL_DAYS: int = 30
+    CONTINUE_WATCHING_REBUILD_DAYS: int = 90
+    CONTINUE_WATCHING_DONE_RATIO: float = 0.95
+
+    ANALYTICS_ROLLUP_SECONDS: int = 5 * 60
+    ANALYTICS_LATENESS_MIN: int = 30
+    ANALYTICS_CHUNK_SIZE: int = 100_000
+    ANALYTICS_COMPLETION_RATIO: float = 0.9
+    ANALYTICS_MIN_VIEWS: int = 10
+    ANALYTICS_HLL_RETENTION_DAYS: int = 400
+
+    TRENDING_HALF_LIFE_HOURS: float = 24
+    TRENDING_FAVORITE_WEIGHT: float = 3.0
+    TRENDING_VIEW_WEIGHT: float = 1.0
+    TRENDING_MAX_SIZE: int = 10_000
+    TRENDING_MIN_SCORE: float = 0.001
+    TRENDING_RENORMALIZE_SECONDS: int = 60 * 60
+
+    CF_HISTORY_DAYS: int = 180
+    CF_USER_CHUNK: int = 50_000
+    CF_FAVORITE_WEIGHT: float = 2.0
+    CF_WATCH_WEIGHT: float = 1.0
+    CF_MAX_ITEMS_PER_USER: int = 500
+    CF_SHRINKAGE: float = 10.0
+    RECOMMENDATIONS_NEIGHBORS: int = 50
+    RECOMMENDATIONS_PER_USER: int = 50
+    # 0 - только запуск вручную или по cron через python -m
+    RECOMMENDATIONS_REFRESH_SECONDS: int = 0
+
+    CONTENT_GENRE_WEIGHT: float = 1.0
+    CONTENT_ACTOR_WEIGHT: float = 2.0
+    CONTENT_BLOCK_SIZE: int = 2_000
+    CONTENT_BLOCK_MAX_NNZ: int = 10_000_000
+    CONTENT_FULL_REBUILD_RATIO: float = 0.2
+    CONTENT_FULL_REBUILD_HOURS: int = 24
+    CONTENT_LATENESS_MIN: int = 30
+    CONTENT_SIMILAR_REFRESH_SECONDS: int = 5 * 60
+
+    FILMS_BATCH_MAX_IDS: int = 100
+
+    COMPRESSION_MIN_SIZE: int = 1024
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+    RESPONSE_CACHE_TTL_SECONDS: int = 60
+
+    # Заголовок Server-Timing и строка лога с разбивкой времени каждого запроса
+    SERVER_TIMING_ENABLED: bool = True
+
+    # Байесовское среднее: RATING_PRIOR_WEIGHT виртуальных оценок RATING_PRIOR_MEAN.
+    # После смены значений - POST /admin/ratings/recalculate
+    RATING_PRIOR_MEAN: float = 6.5
+    RATING_PRIOR_WEIGHT: int = 20
+
+    # Относительный путь считается от корня проекта
+    AFFINITY_DIR: str = "data/affinity"
+    AFFINITY_HISTORY_DAYS: int = 365
+    AFFINITY_FAVORITE_WEIGHT: float = 2.0
+    AFFINITY_USER_CHUNK: int = 100_000
+    AFFINITY_RERANK_WEIGHT: float = 0.5
+    AFFINITY_CANDIDATES: int = 500
+    AFFINITY_RELOAD_SECONDS: int = 10
+    # 0 - только запуск вручную или по cron через python -m
+    AFFINITY_REFRESH_SECONDS: int = 0
+
     # @computed_field
     @property
     def DATABASE_URL(self) -> str:
@@ -3,8 +3,19 @@ from app.core.logger_config import get_logger
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from contextlib import asynccontextmanager
 from typing import AsyncGenerator, Optional, Union
+import time
+
 import redis.asyncio as redis
+from redis.asyncio.client import Pipeline
+from sqlalchemy import text
 from app.models.base import Base
+from app.core.server_timing import install_db_timing
+from app.core.metrics import REDIS_COMMAND_DURATION, install_pool_metrics
+from app.models.film_card import (
+    FILM_CARDS_CREATE_SQL,
+    FILM_CARDS_INDEXES_SQL,
+    FILM_CARDS_DROP_SQL,
+)
 
 
 logger = get_logger(__name__)
@@ -15,8 +26,10 @@ class DBManager:
     def init_db(self, db_url: str):
         self.engine = create_async_engine(
             url=db_url,
-            echo=True,
+            echo=False,
         )
+        install_db_timing(self.engine.sync_engine)
+        install_pool_metrics(self.engine.sync_engine)
         self.session_factory = async_sessionmaker(
             bind=self.engine, expire_on_commit=False
         )
@@ -32,6 +45,9 @@ class DBManager:
 
         async with self.engine.begin() as conn:
             await conn.run_sync(Base.metadata.create_all)
+            await conn.execute(text(FILM_CARDS_CREATE_SQL))
+            for index_sql in FILM_CARDS_INDEXES_SQL:
+                await conn.execute(text(index_sql))
             logger.info("Все таблицы успешно созданы")
 
     async def drop_tables(self):
@@ -39,6 +55,7 @@ class DBManager:
             raise RuntimeError("Сначала вызови init_db")
 
         async with self.engine.begin() as conn:
+            await conn.execute(text(FILM_CARDS_DROP_SQL))
             await conn.run_sync(Base.metadata.drop_all)
             logger.info("Все таблицы успешно удалены")
 
@@ -67,7 +84,7 @@ class DBManager:
             await session.commit()
 
         except Exception as e:
-            logger.error(f"Произошла ошибка получения сессии: {e}")
+            logger.error("Произошла ошибка получения сессии: %s", e)
             session.rollback()
             raise
 
@@ -75,10 +92,45 @@ class DBManager:
             await session.close()
 
 
+class InstrumentedPipeline(Pipeline):
+
+    async def execute(self, raise_on_error: bool = True):
+        started = time.perf_counter()
+        try:
+            return await super().execute(raise_on_error)
+        finally:
+            REDIS_COMMAND_DURATION.labels("PIPELINE").observe(time.perf_counter() - started)
+
+
+class InstrumentedRedis(redis.Redis):
+    """
+    Клиент Redis с гистограммой времени команд. Скрипты (evalsha) идут через
+    execute_command и тоже попадают, pipeline - одним наблюдением на execute
+    """
+
+    async def execute_command(self, *args, **options):
+        started = time.perf_counter()
+        try:
+            return await super().execute_command(*args, **options)
+        finally:
+            command = args[0] if isinstance(args[0], str) else args[0].decode()
+            REDIS_COMMAND_DURATION.labels(command.upper()).observe(
+                time.perf_counter() - started
+            )
+
+    def pipeline(self, transaction: bool = True, shard_hint: Optional[str] = None):
+        return InstrumentedPipeline(
+            self.connection_pool, self.response_callbacks, transaction, shard_hint
+        )
+
+
 class RedisManager:
+    def __init__(self):
+        self.redis: Optional[redis.Redis] = None
+
     async def init_redis(self, db_url: str):
         try:
-            self.redis = redis.from_url(
+            self.redis = InstrumentedRedis.from_url(
                 db_url, decode_responses=False, encoding="utf-8"
             )
 
@@ -87,7 +139,7 @@ class RedisManager:
             logger.info("Redis успешно запущен")
 
         except Exception as e:
-            logger.error(f"Произошла ошибка инициализации Redis:{e}")
+            logger.error("Произошла ошибка инициализации Redis:%s", e)
 
     async def set(
         self, key: str, value: Union[str, bytes], expire: Optional[int] = None
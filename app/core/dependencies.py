@@ -1,17 +1,20 @@
-from fastapi import Depends, HTTPException, status, Cookie
+from fastapi import Depends, HTTPException, status, Cookie, Query
+from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.models.user import User
-from app.services.auth_service import AuthService
+from app.security.jwt import jwt_manager
+from app.crud.user import UserCRUD
 
 
 from typing import AsyncGenerator
-from app.models.user import User
-import redis
+from sqlalchemy.engine import Row
+import redis.asyncio as redis
 from typing import Optional
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import db_manager  # redis_manager
+from app.core.database import db_manager, redis_manager
+from app.core.sparse_fields import parse_fields
+from app.core.server_timing import timed
 
 
 async def get_db_session() -> AsyncGenerator[AsyncSession, None]:
@@ -19,28 +22,89 @@ async def get_db_session() -> AsyncGenerator[AsyncSession, None]:
         yield session
 
 
-# async def get_redis() -> AsyncGenerator[redis.Redis, None]:
-#     async with redis_manager.get_client() as redis_client:
-#         yield redis_client
+async def get_redis() -> AsyncGenerator[redis.Redis, None]:
+    async with redis_manager.get_client() as redis_client:
+        yield redis_client
 
 
-async def get_current_user(
+def _token_user_id(access_token: Optional[str]) -> Optional[int]:
+    """
+    id пользователя из подписанного access token. None, если токена нет,
+    подпись неверна или в нем нет целого sub
+    """
+    payload = jwt_manager.verify_access_token(access_token) if access_token else None
+    if not payload:
+        return None
+
+    try:
+        return int(payload["sub"])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+async def get_current_user_profile(
     access_token: str = Cookie(None, alias="access_token"),
     db: AsyncSession = Depends(get_db_session),
-) -> User:
+) -> Row:
+    """
+    Пользователь строкой Core (UserCRUD.get_profile)
+    """
+    with timed("auth"):
+        user_id = _token_user_id(access_token)
+        profile = await UserCRUD.get_profile(db, user_id) if user_id is not None else None
+
+    if not profile:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Требуется аутентификация",
+        )
+
+    return profile
+
+
+async def get_current_user_id(
+    access_token: str = Cookie(None, alias="access_token"),
+) -> int:
+    """
+    Только проверка подписи access token без похода в БД.
+    Для горячих эндпоинтов вроде heartbeat-ов плеера
+    """
+    with timed("auth"):
+        user_id = _token_user_id(access_token)
+
+    if user_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Требуется аутентификация",
+        )
+
+    return user_id
+
+
+async def get_current_admin(current_user: Row = Depends(get_current_user_profile)) -> Row:
+
+    if not current_user.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Недостаточно прав",
+        )
 
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Требуется аутентификация",
-    )
+    return current_user
 
-    if not access_token:
-        raise credentials_exception
 
-    auth_service = AuthService()
-    user = await auth_service.valid_access_token(db, access_token)
+def get_sparse_fields(schema: type[BaseModel]):
+    """
+    Зависимость для ?fields=: кортеж полей схемы или None, 400 на неизвестные
+    """
 
-    if not user:
-        raise credentials_exception
+    def dependency(
+        fields: Optional[str] = Query(
+            None, description="Поля ответа через запятую, id возвращается всегда"
+        ),
+    ) -> Optional[tuple[str, ...]]:
+        try:
+            return parse_fields(fields, schema)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
-    return user
+    return dependency
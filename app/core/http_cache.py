@@ -0,0 +1,45 @@
+import hashlib
+from typing import Any, Optional
+
+from fastapi import Response, status
+
+
+# Политики Cache-Control для разных групп маршрутов
+PROFILE_CACHE_CONTROL = "private, no-cache"
+CATALOG_CACHE_CONTROL = "public, max-age=60, stale-while-revalidate=30"
+
+
+def make_weak_etag(*parts: Any) -> str:
+    """
+    Слабый ETag из версии ресурса (id, updated_at и т.п.), тело ответа не нужно
+    """
+    raw = ":".join(str(part) for part in parts)
+    digest = hashlib.blake2b(raw.encode("utf-8"), digest_size=8).hexdigest()
+    return f'W/"{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    # Для If-None-Match используется слабое сравнение (RFC 9110)
+    if not if_none_match:
+        return False
+
+    if if_none_match.strip() == "*":
+        return True
+
+    opaque = etag.removeprefix("W/")
+    for candidate in if_none_match.split(","):
+        if candidate.strip().removeprefix("W/") == opaque:
+            return True
+    return False
+
+
+def set_cache_headers(response: Response, etag: str, cache_control: str) -> None:
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = cache_control
+
+
+def not_modified(etag: str, cache_control: str) -> Response:
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={"ETag": etag, "Cache-Control": cache_control},
+    )
@@ -1,41 +1,176 @@
+"""Логирование: очередь, запись в отдельном потоке
+
+Корневой логгер получает только QueueHandler: в потоке запроса запись
+собирается в текст (с маскировкой токенов) и кладется в очередь, формат,
+JSON и запись в stdout делает QueueListener в своем потоке. Уровень -
+LOG_LEVEL, ниже него вызов logger.debug("... %s", x) возвращается сразу,
+без форматирования, поэтому сообщения пишутся в %-стиле, а не f-строками.
+
+LOG_FORMAT=json - одна строка JSON на запись, поля из extra (например
+timings из app/core/server_timing.py) идут отдельными ключами.
+
+LOG_SAMPLING - доля DEBUG-записей, которые доходят до очереди, по префиксу
+имени логгера, самый длинный префикс выигрывает. Поэтому модули берут
+логгер через get_logger(__name__).
+"""
+
+import atexit
 import logging
+import logging.handlers
+import queue
+import random
+import re
 import sys
-from colorama import init, Fore, Back, Style
+from datetime import datetime, UTC
+
+import orjson
+
+from app.core.config import settings
+
+try:
+    import colorama
+except ImportError:
+    colorama = None
+
 
+# JWT (access и refresh): в лог уходят только последние символы подписи,
+# чтобы записи об одном токене можно было связать
+TOKEN_PATTERN = re.compile(r"eyJ[\w-]+\.[\w-]+\.([\w-]+)")
+RECORD_ATTRIBUTES = set(
+    logging.LogRecord("", logging.INFO, "", 0, "", None, None).__dict__
+) | {"message", "asctime", "taskName"}
 
-init(autoreset=True)
+
+def mask_tokens(text: str) -> str:
+    return TOKEN_PATTERN.sub(lambda match: f"***{match.group(1)[-6:]}", text)
 
 
 class ColorFormatter(logging.Formatter):
-    LEVEL_COLORS = {
-        "DEBUG": Fore.CYAN,
-        "INFO": Fore.GREEN,
-        "WARNING": Fore.YELLOW,
-        "ERROR": Fore.RED,
-        "CRITICAL": Fore.RED + Back.WHITE + Style.BRIGHT,
-    }
+    # Только при установленном colorama, см. _make_formatter
+    LEVEL_COLORS = (
+        {
+            "DEBUG": colorama.Fore.CYAN,
+            "INFO": colorama.Fore.GREEN,
+            "WARNING": colorama.Fore.YELLOW,
+            "ERROR": colorama.Fore.RED,
+            "CRITICAL": colorama.Fore.RED + colorama.Back.WHITE + colorama.Style.BRIGHT,
+        }
+        if colorama is not None
+        else {}
+    )
 
     def format(self, record):
         message = super().format(record)
 
-        color = self.LEVEL_COLORS.get(record.levelname, Fore.WHITE)
-        return color + message
+        color = self.LEVEL_COLORS.get(record.levelname, colorama.Fore.WHITE)
+        return color + message + colorama.Style.RESET_ALL
+
+
+class JSONFormatter(logging.Formatter):
+
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, UTC).isoformat(
+                timespec="milliseconds"
+            ),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        entry.update(
+            (key, value)
+            for key, value in record.__dict__.items()
+            if key not in RECORD_ATTRIBUTES
+        )
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return orjson.dumps(entry, default=str).decode()
+
+
+class SamplingFilter(logging.Filter):
+
+    def __init__(self, rates: dict[str, float]):
+        super().__init__()
+        self.rates = sorted(rates.items(), key=lambda item: len(item[0]), reverse=True)
+        self._by_logger: dict[str, float] = {}
+
+    def filter(self, record):
+        if record.levelno > logging.DEBUG:
+            return True
+        rate = self._rate(record.name)
+        return rate >= 1.0 or random.random() < rate
+
+    def _rate(self, name: str) -> float:
+        rate = self._by_logger.get(name)
+        if rate is None:
+            rate = next(
+                (
+                    rate
+                    for prefix, rate in self.rates
+                    if name == prefix or name.startswith(prefix + ".")
+                ),
+                1.0,
+            )
+            self._by_logger[name] = rate
+        return rate
+
+
+class MaskingQueueHandler(logging.handlers.QueueHandler):
+
+    def prepare(self, record):
+        # Аргументы могут измениться, пока запись ждет в очереди, поэтому
+        # текст собирается здесь. Формат строки - уже в потоке записи.
+        # Без копии записи: handler корневого логгера вызывается последним
+        record.msg = mask_tokens(record.getMessage())
+        record.args = None
+        if record.exc_info:
+            record.exc_text = mask_tokens(
+                logging.Formatter().formatException(record.exc_info)
+            )
+            record.exc_info = None
+        return record
+
+
+def _make_formatter(log_format: str) -> logging.Formatter:
+    if log_format == "json":
+        return JSONFormatter()
+
+    text_format = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    if log_format == "color" and colorama is not None:
+        colorama.just_fix_windows_console()
+        return ColorFormatter(text_format, datefmt="%H:%M:%S")
+    return logging.Formatter(text_format, datefmt="%H:%M:%S")
 
 
 def setup_logger():
+    # Поиск файла и строки вызова (findCaller) и id процесса - самое дорогое в
+    # создании записи, в форматах они не используются
+    logging._srcfile = None
+    logging.logProcesses = False
+    logging.logMultiprocessing = False
+
     logger = logging.getLogger()
-    logger.setLevel(logging.DEBUG)
+    logger.setLevel(settings.LOG_LEVEL.upper())
     logger.handlers.clear()
 
     console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setLevel(logging.DEBUG)
+    console_handler.setFormatter(_make_formatter(settings.LOG_FORMAT))
 
-    formatter = ColorFormatter(
-        "%(asctime)s - %(name)s - %(levelname)s - %(message)s", datefmt="%H:%M:%S"
-    )
-    console_handler.setFormatter(formatter)
+    log_queue = queue.SimpleQueue()
+    queue_handler = MaskingQueueHandler(log_queue)
+    if settings.LOG_SAMPLING:
+        queue_handler.addFilter(SamplingFilter(settings.LOG_SAMPLING))
+    logger.addHandler(queue_handler)
+
+    listener = logging.handlers.QueueListener(log_queue, console_handler)
+    listener.start()
+    # Остаток очереди дописывается при выходе
+    atexit.register(listener.stop)
+
+    if settings.DB_ECHO:
+        # Не echo=True у движка: он вешает свой синхронный handler мимо очереди
+        logging.getLogger("sqlalchemy.engine").setLevel(logging.INFO)
 
-    logger.addHandler(console_handler)
     return logger
 
 
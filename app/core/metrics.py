@@ -0,0 +1,152 @@
+"""Метрики Prometheus: HTTP, пул соединений БД, Redis, кеши, bcrypt
+
+Несколько воркеров: переменная окружения PROMETHEUS_MULTIPROC_DIR должна
+указывать на пустой каталог до импорта приложения (очищается при деплое).
+Тогда каждый воркер пишет значения в свои mmap-файлы, а GET /metrics в
+любом воркере собирает сумму по всем через MultiProcessCollector. Без
+переменной - обычный реестр одного процесса. Для gunicorn в child_exit
+нужен multiprocess.mark_process_dead(worker.pid), иначе живые gauge
+умерших воркеров останутся в сумме.
+
+Цена на запрос - два обновления gauge и одно наблюдение histogram, это
+единицы микросекунд. Пул и bcrypt обновляют gauge в момент события, а не
+при опросе: опрос попал бы только в один воркер.
+
+Доля попаданий кеша считается на стороне Prometheus:
+    sum by (cache) (rate(cache_requests_total{result="hit"}[5m]))
+    / sum by (cache) (rate(cache_requests_total[5m]))
+"""
+
+import os
+import time
+
+from fastapi import Response
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+UNMATCHED_ROUTE = "unmatched"
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Время обработки HTTP-запроса",
+    ["method", "route", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+HTTP_REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "HTTP-запросы в обработке",
+    ["method"],
+    multiprocess_mode="livesum",
+)
+
+DB_POOL_SIZE = Gauge(
+    "db_pool_size", "Размер пула соединений БД", multiprocess_mode="livesum"
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out",
+    "Соединения БД, выданные из пула",
+    multiprocess_mode="livesum",
+)
+DB_POOL_OVERFLOW = Gauge(
+    "db_pool_overflow",
+    "Соединения БД сверх размера пула",
+    multiprocess_mode="livesum",
+)
+
+REDIS_COMMAND_DURATION = Histogram(
+    "redis_command_duration_seconds",
+    "Время команды Redis, pipeline - целиком",
+    ["command"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0),
+)
+
+CACHE_REQUESTS = Counter(
+    "cache_requests",
+    "Обращения к кешам приложения",
+    ["cache", "result"],
+)
+
+PASSWORD_HASH_QUEUE = Gauge(
+    "password_hash_queue_depth",
+    "Задачи bcrypt в пуле потоков: ждущие и выполняемые",
+    multiprocess_mode="livesum",
+)
+
+
+def record_cache(cache: str, hits: int, misses: int) -> None:
+    if hits:
+        CACHE_REQUESTS.labels(cache, "hit").inc(hits)
+    if misses:
+        CACHE_REQUESTS.labels(cache, "miss").inc(misses)
+
+
+def install_pool_metrics(engine: Engine) -> None:
+    """
+    Gauge пула по событиям выдачи и возврата соединения. Для AsyncEngine
+    передается engine.sync_engine
+    """
+    pool = engine.pool
+    DB_POOL_SIZE.set(pool.size())
+
+    def _update(*args) -> None:
+        DB_POOL_CHECKED_OUT.set(pool.checkedout())
+        DB_POOL_OVERFLOW.set(max(pool.overflow(), 0))
+
+    event.listen(engine, "checkout", _update)
+    event.listen(engine, "checkin", _update)
+
+
+def metrics_response() -> Response:
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return Response(content=generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
+
+
+class MetricsMiddleware:
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+        started = time.perf_counter()
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        in_progress = HTTP_REQUESTS_IN_PROGRESS.labels(method)
+        in_progress.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            in_progress.dec()
+            # Шаблон пути, а не сам путь: иначе по метке на каждый id
+            route = scope.get("route")
+            HTTP_REQUEST_DURATION.labels(
+                method,
+                route.path if route is not None else UNMATCHED_ROUTE,
+                str(status_code),
+            ).observe(time.perf_counter() - started)
@@ -0,0 +1,46 @@
+import asyncio
+from typing import Awaitable, Callable
+
+from app.core.logger_config import get_logger
+
+
+logger = get_logger(__name__)
+
+
+class PeriodicTasks:
+    """
+    Фоновые задачи приложения, запускаются в lifespan и гасятся при остановке
+    """
+
+    def __init__(self):
+        self._tasks: list[asyncio.Task] = []
+
+    def start(
+        self, name: str, interval: float, func: Callable[[], Awaitable[object]]
+    ) -> None:
+        task = asyncio.create_task(self._run(name, interval, func), name=name)
+        self._tasks.append(task)
+        logger.info("Фоновая задача %s запущена, интервал %s сек", name, interval)
+
+    @staticmethod
+    async def _run(
+        name: str, interval: float, func: Callable[[], Awaitable[object]]
+    ) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await func()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Произошла ошибка в фоновой задаче %s: %s", name, e)
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+        logger.info("Фоновые задачи остановлены")
+
+
+periodic_tasks = PeriodicTasks()
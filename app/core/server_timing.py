@@ -0,0 +1,153 @@
+"""Разбивка времени запроса: заголовок Server-Timing и строка в лог
+
+Для каждого HTTP-запроса middleware заводит RequestTimings в contextvar,
+код приложения добавляет в него время по метрикам:
+
+    auth      - проверка JWT и загрузка пользователя (зависимости get_current_*)
+    db        - сумма времени SQL-запросов, события cursor_execute движка
+    hash      - bcrypt: хеширование и проверка паролей
+    serialize - typed_json_response / trusted_json_response
+    app       - от входа в приложение до начала ответа
+
+Метрики пересекаются: запрос пользователя в auth попадает и в db. Заголовок
+виден в devtools браузера (вкладка Timing), та же разбивка уходит в лог
+одной строкой key=value и в extra["timings"] записи лога.
+
+Вне HTTP-запроса (фоновые задачи, CLI) contextvar пустой и timed ничего не
+делает.
+"""
+
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Iterator, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.logger_config import get_logger
+
+
+logger = get_logger(__name__)
+
+
+METRICS = ("auth", "db", "hash", "serialize")
+
+
+@dataclass
+class RequestTimings:
+    started: float = field(default_factory=time.perf_counter)
+    seconds: dict[str, float] = field(default_factory=dict)
+    counts: dict[str, int] = field(default_factory=dict)
+
+    def add(self, metric: str, seconds: float) -> None:
+        self.seconds[metric] = self.seconds.get(metric, 0.0) + seconds
+        self.counts[metric] = self.counts.get(metric, 0) + 1
+
+    def as_milliseconds(self) -> dict[str, float]:
+        return {metric: round(value * 1000, 2) for metric, value in self.seconds.items()}
+
+    def header_value(self, app_seconds: float) -> str:
+        parts = [f"app;dur={app_seconds * 1000:.2f}"]
+        for metric in METRICS:
+            if metric in self.seconds:
+                part = f"{metric};dur={self.seconds[metric] * 1000:.2f}"
+                if self.counts[metric] > 1:
+                    part += f';desc="{self.counts[metric]}x"'
+                parts.append(part)
+        return ", ".join(parts)
+
+
+_request_timings: ContextVar[Optional[RequestTimings]] = ContextVar(
+    "request_timings", default=None
+)
+
+
+@contextmanager
+def timed(metric: str) -> Iterator[None]:
+    timings = _request_timings.get()
+    if timings is None:
+        yield
+        return
+
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(metric, time.perf_counter() - started)
+
+
+def install_db_timing(engine: Engine) -> None:
+    """
+    Время SQL-запросов в метрику db. Для AsyncEngine передается
+    engine.sync_engine: слушатели синхронные, но выполняются в том же
+    контексте, что и запрос, contextvar виден
+    """
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("server_timing_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["server_timing_started"].pop()
+        timings = _request_timings.get()
+        if timings is not None:
+            timings.add("db", time.perf_counter() - started)
+
+
+class ServerTimingMiddleware:
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings()
+        token = _request_timings.set(timings)
+        status_code = 0
+        app_seconds = 0.0
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status_code, app_seconds
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                app_seconds = time.perf_counter() - timings.started
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", timings.header_value(app_seconds))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _request_timings.reset(token)
+            # 0 - ответ не начался, исключение ушло выше
+            self._log(scope, status_code or 500, app_seconds, timings)
+
+    @staticmethod
+    def _log(scope: Scope, status_code: int, app_seconds: float, timings: RequestTimings) -> None:
+        if not logger.isEnabledFor(logging.INFO):
+            return
+        route = scope.get("route")
+        path = route.path if route is not None else scope["path"]
+        milliseconds = {"app": round(app_seconds * 1000, 2), **timings.as_milliseconds()}
+        logger.info(
+            "Время запроса %s %s %s: %s",
+            scope["method"],
+            path,
+            status_code,
+            " ".join(f"{metric}={value}ms" for metric, value in milliseconds.items()),
+            extra={
+                "timings": milliseconds,
+                "method": scope["method"],
+                "route": path,
+                "status": status_code,
+            },
+        )
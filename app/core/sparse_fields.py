@@ -0,0 +1,72 @@
+"""Выборочные поля ответа: ?fields=id,title,year
+
+Список проверяется по схеме ответа, id добавляется всегда, порядок полей -
+как в схеме, поэтому один и тот же набор дает один и тот же кортеж и одну
+запись в кешах ниже. По кортежу CRUD выбирает только нужные колонки
+(select колонок или load_only), а ответ сериализуется урезанной копией
+схемы с теми же Field и проверками.
+"""
+
+from functools import lru_cache
+from typing import Optional
+
+from pydantic import BaseModel, ConfigDict, TypeAdapter, create_model
+from sqlalchemy import Column, Table
+
+
+def parse_fields(
+    fields: Optional[str], schema: type[BaseModel]
+) -> Optional[tuple[str, ...]]:
+    """
+    None - все поля. ValueError на неизвестные имена
+    """
+    if fields is None:
+        return None
+
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = sorted(requested - schema.model_fields.keys())
+    if unknown:
+        raise ValueError(f"Неизвестные поля: {', '.join(unknown)}")
+
+    # id нужен всегда: по нему клиент сопоставляет ответ со своими данными
+    requested.add("id")
+    return tuple(name for name in schema.model_fields if name in requested)
+
+
+def table_columns(table: Table, fields: tuple[str, ...]) -> list[Column]:
+    """
+    Колонки таблицы под запрошенные поля. Поля без колонки (связи, вычисляемые)
+    CRUD загружает отдельно или схема заполняет значением по умолчанию
+    """
+    return [table.c[name] for name in fields if name in table.c]
+
+
+@lru_cache(maxsize=256)
+def sparse_model(schema: type[BaseModel], fields: tuple[str, ...]) -> type[BaseModel]:
+    return create_model(
+        f"{schema.__name__}Fields",
+        __config__=ConfigDict(from_attributes=True),
+        **{
+            name: (schema.model_fields[name].annotation, schema.model_fields[name])
+            for name in fields
+        },
+    )
+
+
+@lru_cache(maxsize=256)
+def sparse_adapter(schema: type[BaseModel], fields: tuple[str, ...]) -> TypeAdapter:
+    return TypeAdapter(sparse_model(schema, fields))
+
+
+@lru_cache(maxsize=256)
+def sparse_list_adapter(schema: type[BaseModel], fields: tuple[str, ...]) -> TypeAdapter:
+    """
+    Для ответов вида {"items": [...], "total": n}
+    """
+    return TypeAdapter(
+        create_model(
+            f"{schema.__name__}FieldsList",
+            items=(list[sparse_model(schema, fields)], ...),
+            total=(int, ...),
+        )
+    )
@@ -0,0 +1,71 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func
+from sqlalchemy.orm import selectinload, load_only
+from typing import Optional
+
+from app.models.actor import Actor
+from app.core.logger_config import get_logger
+from app.core.sparse_fields import table_columns
+
+
+logger = get_logger(__name__)
+
+
+def _load_only(fields: tuple[str, ...]):
+    # load_only принимает атрибуты модели, не колонки таблицы
+    return load_only(
+        *(getattr(Actor, column.key) for column in table_columns(Actor.__table__, fields))
+    )
+
+
+def _sparse_options(fields: Optional[tuple[str, ...]]) -> list:
+    # Без fields - актер целиком с фильмами, иначе только запрошенные колонки
+    if fields is None:
+        return [selectinload(Actor.films)]
+
+    options = [_load_only(fields)]
+    if "films" in fields:
+        options.append(selectinload(Actor.films))
+    return options
+
+
+class ActorCRUD:
+
+    @staticmethod
+    async def get_by_id(
+        db: AsyncSession, actor_id: int, fields: Optional[tuple[str, ...]] = None
+    ) -> Optional[Actor]:
+        try:
+            result = await db.execute(
+                select(Actor).options(*_sparse_options(fields)).where(Actor.id == actor_id)
+            )
+            actor = result.scalar_one_or_none()
+
+            if not actor:
+                logger.debug("Актер с ID: %s не найден", actor_id)
+
+            return actor
+
+        except Exception as e:
+            logger.error("Произошла ошибка получения актера с ID: %s: %s", actor_id, e)
+            raise
+
+    @staticmethod
+    async def get_list(
+        db: AsyncSession,
+        skip: int = 0,
+        limit: int = 50,
+        fields: Optional[tuple[str, ...]] = None,
+    ) -> tuple[list[Actor], int]:
+        try:
+            statement = select(Actor).order_by(Actor.id).offset(skip).limit(limit)
+            if fields is not None:
+                statement = statement.options(_load_only(fields))
+
+            result = await db.execute(statement)
+            total = await db.scalar(select(func.count(Actor.id)))
+            return list(result.scalars().all()), total
+
+        except Exception as e:
+            logger.error("Произошла ошибка получения списка актеров: %s", e)
+            raise
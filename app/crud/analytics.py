@@ -0,0 +1,90 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func
+from typing import Sequence
+from sqlalchemy.engine import Row
+from datetime import date
+
+from app.models.analytics import FilmDailyStats, GenreDailyStats
+from app.models.film import Film
+from app.core.logger_config import get_logger
+
+
+logger = get_logger(__name__)
+
+
+class AnalyticsCRUD:
+    """
+    Чтение дневных агрегатов для дашбордов, сырой watch_history не трогает
+    """
+
+    @staticmethod
+    async def get_film_daily(
+        db: AsyncSession, film_id: int, date_from: date, date_to: date
+    ) -> Sequence[FilmDailyStats]:
+        try:
+            result = await db.execute(
+                select(FilmDailyStats)
+                .where(
+                    FilmDailyStats.film_id == film_id,
+                    FilmDailyStats.day.between(date_from, date_to),
+                )
+                .order_by(FilmDailyStats.day)
+            )
+            return result.scalars().all()
+
+        except Exception as e:
+            logger.error(
+                "Произошла ошибка получения дневной статистики фильма %s: %s",
+                film_id,
+                e,
+            )
+            raise
+
+    @staticmethod
+    async def get_genre_daily(
+        db: AsyncSession, genre_id: int, date_from: date, date_to: date
+    ) -> Sequence[GenreDailyStats]:
+        try:
+            result = await db.execute(
+                select(GenreDailyStats)
+                .where(
+                    GenreDailyStats.genre_id == genre_id,
+                    GenreDailyStats.day.between(date_from, date_to),
+                )
+                .order_by(GenreDailyStats.day)
+            )
+            return result.scalars().all()
+
+        except Exception as e:
+            logger.error(
+                "Произошла ошибка получения дневной статистики жанра %s: %s",
+                genre_id,
+                e,
+            )
+            raise
+
+    @staticmethod
+    async def get_top_films(
+        db: AsyncSession, date_from: date, date_to: date, limit: int = 20
+    ) -> Sequence[Row]:
+        # Уникальных зрителей между днями не складываем - одни и те же люди
+        views = func.sum(FilmDailyStats.views).label("views")
+        try:
+            result = await db.execute(
+                select(
+                    FilmDailyStats.film_id,
+                    Film.title,
+                    views,
+                    func.sum(FilmDailyStats.watch_seconds).label("watch_seconds"),
+                )
+                .join(Film, Film.id == FilmDailyStats.film_id)
+                .where(FilmDailyStats.day.between(date_from, date_to))
+                .group_by(FilmDailyStats.film_id, Film.title)
+                .order_by(views.desc(), FilmDailyStats.film_id)
+                .limit(limit)
+            )
+            return result.all()
+
+        except Exception as e:
+            logger.error("Произошла ошибка получения топа фильмов за период: %s", e)
+            raise
@@ -0,0 +1,120 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, delete
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import IntegrityError
+
+from app.models.favorites import Favorite
+from app.core.logger_config import get_logger
+
+
+logger = get_logger(__name__)
+
+
+class FavoriteCRUD:
+
+    @staticmethod
+    async def add(db: AsyncSession, user_id: int, film_id: int) -> bool:
+        # Идемпотентно: повторное добавление ничего не меняет, True только если строка вставлена
+        try:
+            result = await db.execute(
+                insert(Favorite)
+                .values(user_id=user_id, film_id=film_id)
+                .on_conflict_do_nothing(constraint="uq_favorites_user_film")
+                .returning(Favorite.id)
+            )
+            created = result.scalar_one_or_none() is not None
+            await db.commit()
+
+            if created:
+                logger.info(
+                    "Фильм %s добавлен в избранное пользователя %s", film_id, user_id
+                )
+
+            return created
+
+        except IntegrityError as e:
+            logger.warning(
+                "Добавление в избранное не удалось: фильм %s не найден", film_id
+            )
+            await db.rollback()
+            raise ValueError("Фильм не найден") from e
+
+        except Exception as e:
+            logger.error(
+                "Произошла ошибка добавления фильма %s в избранное пользователя %s: %s",
+                film_id,
+                user_id,
+                e,
+            )
+            await db.rollback()
+            raise
+
+    @staticmethod
+    async def remove(db: AsyncSession, user_id: int, film_id: int) -> bool:
+        try:
+            result = await db.execute(
+                delete(Favorite)
+                .where(Favorite.user_id == user_id, Favorite.film_id == film_id)
+                .returning(Favorite.id)
+            )
+            removed = result.scalar_one_or_none() is not None
+            await db.commit()
+
+            if removed:
+                logger.info(
+                    "Фильм %s удален из избранного пользователя %s", film_id, user_id
+                )
+
+            return removed
+
+        except Exception as e:
+            logger.error(
+                "Произошла ошибка удаления фильма %s из избранного пользователя %s: %s",
+                film_id,
+                user_id,
+                e,
+            )
+            await db.rollback()
+            raise
+
+    @staticmethod
+    async def get_favorited_ids(
+        db: AsyncSession, user_id: int, film_ids: list[int]
+    ) -> set[int]:
+        # Один запрос по уникальному индексу (user_id, film_id) на всю страницу каталога
+        if not film_ids:
+            return set()
+
+        try:
+            result = await db.execute(
+                select(Favorite.film_id).where(
+                    Favorite.user_id == user_id, Favorite.film_id.in_(film_ids)
+                )
+            )
+            return set(result.scalars().all())
+
+        except Exception as e:
+            logger.error(
+                "Произошла ошибка проверки избранного пользователя %s: %s", user_id, e
+            )
+            raise
+
+    @staticmethod
+    async def get_user_favorites(
+        db: AsyncSession, user_id: int, skip: int = 0, limit: int = 50
+    ) -> list[Favorite]:
+        try:
+            result = await db.execute(
+                select(Favorite)
+                .where(Favorite.user_id == user_id)
+                .order_by(Favorite.created_at.desc())
+                .offset(skip)
+                .limit(limit)
+            )
+            return list(result.scalars().all())
+
+        except Exception as e:
+            logger.error(
+                "Произошла ошибка получения избранного пользователя %s: %s", user_id, e
+            )
+            raise
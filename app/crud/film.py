@@ -0,0 +1,218 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func, any_, bindparam, Integer
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.orm import selectinload
+from typing import Optional, Sequence
+from sqlalchemy.engine import Row
+from datetime import datetime
+
+from app.models.film import Film
+from app.models.genre import Genre
+from app.models.association_tables.film_genre import film_genre
+from app.models.film_card import film_cards
+from app.schemas.film import PopularitySort
+from app.core.logger_config import get_logger
+from app.core.sparse_fields import table_columns
+
+
+logger = get_logger(__name__)
+
+
+# Колонки карточки фильма для путей только на чтение
+DETAIL_COLUMNS = (
+    Film.id,
+    Film.title,
+    Film.description,
+    Film.duration,
+    Film.year,
+    Film.rating,
+)
+
+
+class FilmCRUD:
+
+    @staticmethod
+    async def get_by_id(db: AsyncSession, film_id: int) -> Optional[Film]:
+        try:
+            result = await db.execute(
+                select(Film).options(selectinload(Film.genres)).where(Film.id == film_id)
+            )
+            film = result.scalar_one_or_none()
+
+            if not film:
+                logger.debug("Фильм с ID: %s не найден", film_id)
+
+            return film
+
+        except Exception as e:
+            logger.error("Произошла ошибка получения фильма с ID: %s: %s", film_id, e)
+            raise
+
+    @staticmethod
+    async def get_detail(
+        db: AsyncSession, film_id: int, fields: Optional[tuple[str, ...]] = None
+    ) -> Optional[dict]:
+        """
+        То же, что get_by_id, для отдачи только на чтение: колонки под
+        FilmDetailResponse строками Core, без сущностей Film / Genre.
+        С fields (см. app/core/sparse_fields.py) выбираются только эти
+        колонки, жанры - только если запрошены
+        """
+        columns = DETAIL_COLUMNS if fields is None else table_columns(Film.__table__, fields)
+        try:
+            result = await db.execute(select(*columns).where(Film.id == film_id))
+            film = result.first()
+            if not film:
+                logger.debug("Фильм с ID: %s не найден", film_id)
+                return None
+
+            detail = dict(zip(film._fields, film))
+            if fields is None or "genres" in fields:
+                genres = await db.execute(
+                    select(Genre.id, Genre.name)
+                    .join(film_genre, film_genre.c.genre_id == Genre.id)
+                    .where(film_genre.c.film_id == film_id)
+                    .order_by(Genre.id)
+                )
+                detail["genres"] = genres.all()
+            return detail
+
+        except Exception as e:
+            logger.error("Произошла ошибка получения фильма с ID: %s: %s", film_id, e)
+            raise
+
+    @staticmethod
+    async def get_version(db: AsyncSession, film_id: int) -> Optional[datetime]:
+        # Только updated_at, без загрузки самого фильма
+        try:
+            result = await db.execute(
+                select(Film.updated_at).where(Film.id == film_id)
+            )
+            return result.scalar_one_or_none()
+
+        except Exception as e:
+            logger.error("Произошла ошибка получения версии фильма %s: %s", film_id, e)
+            raise
+
+    @staticmethod
+    async def get_catalog_version(db: AsyncSession) -> tuple[int, Optional[datetime]]:
+        # Количество фильмов и последнее изменение каталога для ETag списка
+        try:
+            result = await db.execute(select(func.count(Film.id), func.max(Film.updated_at)))
+            total, last_updated = result.one()
+            return total, last_updated
+
+        except Exception as e:
+            logger.error("Произошла ошибка получения версии каталога: %s", e)
+            raise
+
+    @staticmethod
+    async def get_list(db: AsyncSession, skip: int = 0, limit: int = 50) -> list[Film]:
+        try:
+            result = await db.execute(
+                select(Film).order_by(Film.id).offset(skip).limit(limit)
+            )
+            return list(result.scalars().all())
+
+        except Exception as e:
+            logger.error("Произошла ошибка получения списка фильмов: %s", e)
+            raise
+
+    @staticmethod
+    async def get_cards(
+        db: AsyncSession,
+        skip: int = 0,
+        limit: int = 50,
+        fields: Optional[tuple[str, ...]] = None,
+    ) -> Sequence[Row]:
+        # Карточки из film_cards: одно чтение по индексу вместо join на четыре таблицы.
+        # С fields в SELECT только запрошенные колонки
+        columns = [film_cards] if fields is None else table_columns(film_cards, fields)
+        try:
+            result = await db.execute(
+                select(*columns)
+                .order_by(film_cards.c.id)
+                .offset(skip)
+                .limit(limit)
+            )
+            return result.all()
+
+        except Exception as e:
+            logger.error("Произошла ошибка получения карточек фильмов: %s", e)
+            raise
+
+    @staticmethod
+    async def get_cards_by_ids(db: AsyncSession, film_ids: list[int]) -> dict[int, Row]:
+        if not film_ids:
+            return {}
+        try:
+            # Один параметр-массив: один подготовленный запрос на любую длину списка
+            result = await db.execute(
+                select(film_cards).where(
+                    film_cards.c.id
+                    == any_(bindparam("film_ids", film_ids, type_=ARRAY(Integer)))
+                )
+            )
+            return {row.id: row for row in result}
+
+        except Exception as e:
+            logger.error("Произошла ошибка получения карточек фильмов по ID: %s", e)
+            raise
+
+    @staticmethod
+    async def get_scored_cards(
+        db: AsyncSession, scored: list[tuple[int, float]]
+    ) -> list[dict]:
+        # Порядок как в scored, фильмы, которых уже нет в каталоге, пропускаются
+        cards = await FilmCRUD.get_cards_by_ids(db, [film_id for film_id, _ in scored])
+        return [
+            {**cards[film_id]._mapping, "score": score}
+            for film_id, score in scored
+            if film_id in cards
+        ]
+
+    @staticmethod
+    async def get_cards_version(db: AsyncSession) -> tuple[int, Optional[datetime]]:
+        try:
+            result = await db.execute(
+                select(func.count(), func.max(film_cards.c.updated_at)).select_from(
+                    film_cards
+                )
+            )
+            total, last_updated = result.one()
+            return total, last_updated
+
+        except Exception as e:
+            logger.error("Произошла ошибка получения версии film_cards: %s", e)
+            raise
+
+    @staticmethod
+    async def get_popular(
+        db: AsyncSession, by: PopularitySort = PopularitySort.views, limit: int = 20
+    ) -> Sequence[Row]:
+        # Готовые счетчики с индексом, без COUNT(*) по favorites / watch_history / film_ratings
+        order_by = {
+            PopularitySort.views: (Film.views_count.desc(), Film.id),
+            PopularitySort.favorites: (Film.favorites_count.desc(), Film.id),
+            PopularitySort.rating: (Film.bayesian_rating.desc().nulls_last(), Film.id),
+        }[by]
+        try:
+            result = await db.execute(
+                select(
+                    Film.id,
+                    Film.title,
+                    Film.year,
+                    Film.rating,
+                    Film.favorites_count,
+                    Film.views_count,
+                    Film.ratings_count,
+                    Film.bayesian_rating,
+                )
+                .order_by(*order_by)
+                .limit(limit)
+            )
+            return result.all()
+
+        except Exception as e:
+            logger.error("Произошла ошибка получения популярных фильмов: %s", e)
+            raise
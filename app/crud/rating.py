@@ -0,0 +1,225 @@
+"""Оценки и агрегаты фильма
+
+Запись оценки - одна транзакция: блокировка строки фильма, чтение прежней
+оценки, upsert / delete оценки и UPDATE films на разницу (+-1 к числу,
+новая минус старая к сумме). Байесовское среднее
+(PRIOR_WEIGHT * PRIOR_MEAN + sum) / (PRIOR_WEIGHT + count) считается из
+новых count и sum в том же UPDATE, все оценки фильма не перечитываются.
+
+Блокировка фильма сериализует оценки одного фильма: без нее две первые
+оценки одного пользователя из параллельных запросов обе не увидели бы
+прежней и дважды прибавили бы count. UPDATE films все равно берет эту
+блокировку, она только берется раньше.
+
+updated_at фильма не трогается: оценки не меняют карточку в каталоге и не
+должны сбрасывать ETag и пересчет похожих фильмов.
+"""
+
+from typing import Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, delete, text
+from sqlalchemy.dialects.postgresql import insert
+
+from app.models.rating import FilmRating
+from app.core.config import settings
+from app.core.logger_config import get_logger
+
+
+logger = get_logger(__name__)
+
+
+LOCK_FILM_SQL = text("SELECT id FROM films WHERE id = :film_id FOR UPDATE")
+
+APPLY_DELTA_SQL = text(
+    """
+    UPDATE films SET
+        ratings_count = ratings_count + :count_delta,
+        ratings_sum = ratings_sum + :sum_delta,
+        bayesian_rating = CASE
+            WHEN ratings_count + :count_delta = 0 THEN NULL
+            ELSE (CAST(:prior_weight AS integer) * CAST(:prior_mean AS double precision)
+                + ratings_sum + :sum_delta)
+                / (CAST(:prior_weight AS integer) + ratings_count + :count_delta)
+        END
+    WHERE id = :film_id
+    RETURNING ratings_count, bayesian_rating
+    """
+)
+
+RECALCULATE_SQL = text(
+    """
+    UPDATE films SET
+        ratings_count = coalesce(r.cnt, 0),
+        ratings_sum = coalesce(r.total, 0),
+        bayesian_rating = CASE
+            WHEN r.cnt IS NULL THEN NULL
+            ELSE (CAST(:prior_weight AS integer) * CAST(:prior_mean AS double precision) + r.total)
+                / (CAST(:prior_weight AS integer) + r.cnt)
+        END
+    FROM films f
+    LEFT JOIN (
+        SELECT film_id, count(*) AS cnt, sum(score) AS total
+        FROM film_ratings GROUP BY film_id
+    ) r ON r.film_id = f.id
+    WHERE films.id = f.id
+    """
+)
+
+
+def _prior() -> dict:
+    return {
+        "prior_weight": settings.RATING_PRIOR_WEIGHT,
+        "prior_mean": settings.RATING_PRIOR_MEAN,
+    }
+
+
+class RatingCRUD:
+
+    @staticmethod
+    async def rate(
+        db: AsyncSession, user_id: int, film_id: int, score: int
+    ) -> tuple[int, Optional[float]]:
+        """
+        Ставит или меняет оценку. Возвращает (ratings_count, bayesian_rating) фильма
+        """
+        try:
+            if (await db.execute(LOCK_FILM_SQL, {"film_id": film_id})).first() is None:
+                raise ValueError("Фильм не найден")
+
+            previous = await RatingCRUD._get_score(db, user_id, film_id)
+            await db.execute(
+                insert(FilmRating)
+                .values(user_id=user_id, film_id=film_id, score=score)
+                .on_conflict_do_update(
+                    index_elements=[FilmRating.user_id, FilmRating.film_id],
+                    set_={"score": score, "updated_at": text("now()")},
+                )
+            )
+            aggregate = await RatingCRUD._apply_delta(
+                db,
+                film_id,
+                count_delta=0 if previous is not None else 1,
+                sum_delta=score - (previous or 0),
+            )
+            await db.commit()
+
+            logger.info(
+                "Пользователь %s оценил фильм %s на %s", user_id, film_id, score
+            )
+            return aggregate
+
+        except ValueError:
+            logger.warning("Оценка не сохранена: фильм %s не найден", film_id)
+            await db.rollback()
+            raise
+
+        except Exception as e:
+            logger.error(
+                "Произошла ошибка сохранения оценки фильма %s пользователем %s: %s",
+                film_id,
+                user_id,
+                e,
+            )
+            await db.rollback()
+            raise
+
+    @staticmethod
+    async def remove(
+        db: AsyncSession, user_id: int, film_id: int
+    ) -> Optional[tuple[int, Optional[float]]]:
+        """
+        None, если оценки не было
+        """
+        try:
+            if (await db.execute(LOCK_FILM_SQL, {"film_id": film_id})).first() is None:
+                await db.rollback()
+                return None
+
+            result = await db.execute(
+                delete(FilmRating)
+                .where(FilmRating.user_id == user_id, FilmRating.film_id == film_id)
+                .returning(FilmRating.score)
+            )
+            previous = result.scalar_one_or_none()
+            if previous is None:
+                await db.rollback()
+                return None
+
+            aggregate = await RatingCRUD._apply_delta(
+                db, film_id, count_delta=-1, sum_delta=-previous
+            )
+            await db.commit()
+
+            logger.info("Пользователь %s удалил оценку фильма %s", user_id, film_id)
+            return aggregate
+
+        except Exception as e:
+            logger.error(
+                "Произошла ошибка удаления оценки фильма %s пользователем %s: %s",
+                film_id,
+                user_id,
+                e,
+            )
+            await db.rollback()
+            raise
+
+    @staticmethod
+    async def get_user_ratings(
+        db: AsyncSession, user_id: int, skip: int = 0, limit: int = 50
+    ) -> list[FilmRating]:
+        try:
+            result = await db.execute(
+                select(FilmRating)
+                .where(FilmRating.user_id == user_id)
+                .order_by(FilmRating.updated_at.desc())
+                .offset(skip)
+                .limit(limit)
+            )
+            return list(result.scalars().all())
+
+        except Exception as e:
+            logger.error(
+                "Произошла ошибка получения оценок пользователя %s: %s", user_id, e
+            )
+            raise
+
+    @staticmethod
+    async def recalculate(db: AsyncSession) -> int:
+        # Полный пересчет из film_ratings, нужен только после смены RATING_PRIOR_*
+        try:
+            result = await db.execute(RECALCULATE_SQL, _prior())
+            await db.commit()
+
+            logger.info("Агрегаты оценок пересчитаны для %s фильмов", result.rowcount)
+            return result.rowcount
+
+        except Exception as e:
+            logger.error("Произошла ошибка пересчета агрегатов оценок: %s", e)
+            await db.rollback()
+            raise
+
+    @staticmethod
+    async def _get_score(db: AsyncSession, user_id: int, film_id: int) -> Optional[int]:
+        result = await db.execute(
+            select(FilmRating.score).where(
+                FilmRating.user_id == user_id, FilmRating.film_id == film_id
+            )
+        )
+        return result.scalar_one_or_none()
+
+    @staticmethod
+    async def _apply_delta(
+        db: AsyncSession, film_id: int, count_delta: int, sum_delta: int
+    ) -> tuple[int, Optional[float]]:
+        result = await db.execute(
+            APPLY_DELTA_SQL,
+            {
+                "film_id": film_id,
+                "count_delta": count_delta,
+                "sum_delta": sum_delta,
+                **_prior(),
+            },
+        )
+        ratings_count, bayesian_rating = result.one()
+        return ratings_count, bayesian_rating
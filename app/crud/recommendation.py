@@ -0,0 +1,63 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from typing import Optional
+
+from app.models.recommendation import FilmSimilar, UserRecommendation
+from app.core.logger_config import get_logger
+
+
+logger = get_logger(__name__)
+
+
+class RecommendationCRUD:
+    """
+    Чтение предрасчитанных списков: одна строка по первичному ключу
+    """
+
+    @staticmethod
+    async def get_similar(
+        db: AsyncSession, film_id: int, source: str, limit: int
+    ) -> list[tuple[int, float]]:
+        try:
+            result = await db.execute(
+                select(FilmSimilar.neighbor_ids, FilmSimilar.scores).where(
+                    FilmSimilar.film_id == film_id, FilmSimilar.source == source
+                )
+            )
+            row = result.one_or_none()
+            if row is None:
+                return []
+            return list(zip(row.neighbor_ids, row.scores))[:limit]
+
+        except Exception as e:
+            logger.error(
+                "Произошла ошибка получения похожих фильмов (%s) для фильма %s: %s",
+                source,
+                film_id,
+                e,
+            )
+            raise
+
+    @staticmethod
+    async def get_user_recommendations(
+        db: AsyncSession, user_id: int, limit: int
+    ) -> Optional[list[tuple[int, float]]]:
+        # None - для пользователя ничего не посчитано, в отличие от пустого списка
+        try:
+            result = await db.execute(
+                select(UserRecommendation.film_ids, UserRecommendation.scores).where(
+                    UserRecommendation.user_id == user_id
+                )
+            )
+            row = result.one_or_none()
+            if row is None:
+                return None
+            return list(zip(row.film_ids, row.scores))[:limit]
+
+        except Exception as e:
+            logger.error(
+                "Произошла ошибка получения рекомендаций пользователя %s: %s",
+                user_id,
+                e,
+            )
+            raise
@@ -16,10 +16,13 @@ from app.schemas.refresh_token import (
     RefreshTokenResponse,
     RefreshTokenUpdate,
 )
-from app.core.logger_config import logger
+from app.core.logger_config import get_logger
 from app.models.refresh_token import RefreshToken
 
 
+logger = get_logger(__name__)
+
+
 class RefreshTokenCRUD:
 
     @staticmethod
@@ -32,12 +35,12 @@ class RefreshTokenCRUD:
             token_res = result.scalar_one_or_none()
 
             if not token_res:
-                logger.debug(f"Токен: {token} не найден")
+                logger.debug("Токен: %s не найден", token)
 
             return token_res
 
         except Exception as e:
-            logger.error(f"Токен: {token} не найден : {e}")
+            logger.error("Токен: %s не найден : %s", token, e)
             raise
 
     @staticmethod
@@ -52,12 +55,12 @@ class RefreshTokenCRUD:
             res_token_id = result.scalar_one_or_none()
 
             if not res_token_id:
-                logger.debug(f"Токен с ID: {token_id} не найден")
+                logger.debug("Токен с ID: %s не найден", token_id)
                 return None
             return res_token_id
 
         except Exception as e:
-            logger.error(f"Произошла ошибка получения токена с ID: {token_id}")
+            logger.error("Произошла ошибка получения токена с ID: %s", token_id)
             raise
 
     @staticmethod
@@ -81,11 +84,11 @@ class RefreshTokenCRUD:
             db.add(db_token)
             await db.commit()
             await db.refresh(db_token)
-            logger.info(f"Создан refresh token для пользователя: {token_data.user_id}")
+            logger.info("Создан refresh token для пользователя: %s", token_data.user_id)
             return db_token
 
         except Exception as e:
-            logger.error(f"Произошла ошибка создания токена:{e}")
+            logger.error("Произошла ошибка создания токена:%s", e)
             await db.rollback()
             raise
 
@@ -95,19 +98,19 @@ class RefreshTokenCRUD:
             db_token = await RefreshTokenCRUD.get_by_token(db, token)
 
             if not db_token:
-                logger.warning(f"Попытка отозвать не существующий токен: {token}")
+                logger.warning("Попытка отозвать не существующий токен: %s", token)
                 return False
 
             if db_token.is_revoked:
-                logger.debug(f"Токен: {token} уже отозван")
+                logger.debug("Токен: %s уже отозван", token)
                 return True
 
             db_token.is_revoked = True
             await db.commit()
-            logger.info(f"Токен {token} отзван")
+            logger.info("Токен %s отзван", token)
             return True
         except Exception as e:
-            logger.error(f"Произошла ошибка отзывания токена:{token}:{e}")
+            logger.error("Произошла ошибка отзывания токена:%s:%s", token, e)
             await db.rollback()
             raise
 
@@ -117,7 +120,7 @@ class RefreshTokenCRUD:
             db_token = await RefreshTokenCRUD.get_by_token(db, token)
 
             if not db_token:
-                logger.debug(f"Токен {token} не найден")
+                logger.debug("Токен %s не найден", token)
                 return False
 
             is_valid = not db_token.is_revoked and db_token.expires_at > datetime.now(
@@ -125,12 +128,14 @@ class RefreshTokenCRUD:
             )
 
             if not is_valid:
-                logger.debug(f"Токен: {token} не валидный")
+                logger.debug("Токен: %s не валидный", token)
 
             return is_valid
 
         except Exception as e:
-            logger.error(f"Произошла ошибка проверки токена:{token} на валидность:{e}")
+            logger.error(
+                "Произошла ошибка проверки токена:%s на валидность:%s", token, e
+            )
             return False
 
     @staticmethod
@@ -147,7 +152,7 @@ class RefreshTokenCRUD:
             tokens = result.scalars().all()
 
             if not tokens:
-                logger.debug(f"Активных токенов у пользователя с ID: {user_id} нет")
+                logger.debug("Активных токенов у пользователя с ID: %s нет", user_id)
                 return True
 
             for token in tokens:
@@ -155,12 +160,14 @@ class RefreshTokenCRUD:
 
             await db.commit()
 
-            logger.info(f"Все токены пользователя с ID: {user_id} успешно отозваны")
+            logger.info("Все токены пользователя с ID: %s успешно отозваны", user_id)
             return True
 
         except Exception as e:
             logger.error(
-                f"Произошла ошибка отзывания токенов пользователя с ID: {user_id}: {e}"
+                "Произошла ошибка отзывания токенов пользователя с ID: %s: %s",
+                user_id,
+                e,
             )
             await db.rollback()
             raise
@@ -178,7 +185,7 @@ class RefreshTokenCRUD:
             expired_tokens = result.scalars().all()
 
             if not expired_tokens:
-                logger.debug(f"Очистка не требуется, истекших токенов нет")
+                logger.debug("Очистка не требуется, истекших токенов нет")
                 return 0
 
             for token in expired_tokens:
@@ -186,11 +193,11 @@ class RefreshTokenCRUD:
 
             await db.commit()
 
-            logger.info(f"Удалено просроченных токенов: {len(expired_tokens)} шт")
+            logger.info("Удалено просроченных токенов: %s шт", len(expired_tokens))
 
             return len(expired_tokens)
 
         except Exception as e:
-            logger.error(f"Ошибка очистки истекших токенов: {e}")
+            logger.error("Ошибка очистки истекших токенов: %s", e)
             await db.rollback()
             raise
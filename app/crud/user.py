@@ -2,21 +2,57 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
+from sqlalchemy.engine import Row
 from typing import Optional
 
-from app.security.password import verify_password
 from app.models.user import User
 from app.security.password import (
-    get_password_hash,
-    verify_password,
+    get_password_hash_async,
+    verify_password_async,
     validate_password_strength,
 )
 from app.schemas.user import UserCreate, UserUpdate, UserChangePassword, UserLogin
-from app.core.logger_config import logger
+from app.core.logger_config import get_logger
+
+
+logger = get_logger(__name__)
+
+
+# Колонки профиля для путей только на чтение: без hashed_password и без сущности User
+PROFILE_COLUMNS = (
+    User.id,
+    User.username,
+    User.email,
+    User.is_active,
+    User.is_admin,
+    User.created_at,
+    User.updated_at,
+)
 
 
 class UserCRUD:
 
+    @staticmethod
+    async def get_profile(db: AsyncSession, user_id: int) -> Optional[Row]:
+        """
+        Строка Core вместо User: без identity map, отслеживания изменений и
+        ленивых связей. Атрибуты те же, что у User, кроме hashed_password
+        """
+        try:
+            result = await db.execute(select(*PROFILE_COLUMNS).where(User.id == user_id))
+            profile = result.first()
+
+            if not profile:
+                logger.debug("Пользователь с ID: %s не найден", user_id)
+
+            return profile
+
+        except Exception as e:
+            logger.error(
+                "Произошла ошибка получения профиля пользователя %s: %s", user_id, e
+            )
+            raise
+
     @staticmethod
     async def get_by_id(db: AsyncSession, user_id: int) -> Optional[User]:
         try:
@@ -24,12 +60,12 @@ class UserCRUD:
             user = result.scalar_one_or_none()
 
             if not user:
-                logger.debug(f"Пользователь с ID: {user_id} не найден")
+                logger.debug("Пользователь с ID: %s не найден", user_id)
 
             return user
 
         except Exception as e:
-            logger.error(f"Произошла при получении пользователя с ID:{user_id}:{e}")
+            logger.error("Произошла при получении пользователя с ID:%s:%s", user_id, e)
             raise
 
     @staticmethod
@@ -40,13 +76,13 @@ class UserCRUD:
             user = result.scalar_one_or_none()
 
             if not user:
-                logger.debug(f"Пользователь с email: {user_email} не найден")
+                logger.debug("Пользователь с email: %s не найден", user_email)
 
             return user
 
         except Exception as e:
             logger.error(
-                f"Произошла при получении пользователя с email:{user_email}:{e}"
+                "Произошла при получении пользователя с email:%s:%s", user_email, e
             )
             raise
 
@@ -58,12 +94,14 @@ class UserCRUD:
             user = result.scalar_one_or_none()
 
             if not user:
-                logger.debug(f"Пользователь с username: {username} не найден")
+                logger.debug("Пользователь с username: %s не найден", username)
 
             return user
 
         except Exception as e:
-            logger.error(f"Произошла при получении пользователя с email:{username}:{e}")
+            logger.error(
+                "Произошла при получении пользователя с email:%s:%s", username, e
+            )
             raise
 
     @staticmethod
@@ -74,7 +112,8 @@ class UserCRUD:
             if existing_email:
 
                 logger.warning(
-                    f"Создание пользователя не удалось: email {user_data.email} уже существует"
+                    "Создание пользователя не удалось: email %s уже существует",
+                    user_data.email,
                 )
                 raise ValueError("Пользователь с такой почтой уже существует")
 
@@ -82,11 +121,12 @@ class UserCRUD:
 
             if existing_username:
                 logger.warning(
-                    f"Создание пользователя не удалось: username {user_data.username} уже существует"
+                    "Создание пользователя не удалось: username %s уже существует",
+                    user_data.username,
                 )
                 raise ValueError("Пользователь с таким username уже существует")
 
-            hashed_password = get_password_hash(user_data.password)
+            hashed_password = await get_password_hash_async(user_data.password)
 
             db_user = User(
                 username=user_data.username,
@@ -98,12 +138,12 @@ class UserCRUD:
             await db.commit()
             await db.refresh(db_user)
 
-            logger.info(f"Пользователь: {user_data.username} успешно создан")
+            logger.info("Пользователь: %s успешно создан", user_data.username)
 
             return db_user
 
         except Exception as e:
-            logger.error(f"Произошла ошибка создания пользователя: {e}")
+            logger.error("Произошла ошибка создания пользователя: %s", e)
             await db.rollback()
             raise
 
@@ -113,22 +153,26 @@ class UserCRUD:
             db_user = await UserCRUD.get_by_username(db, user_login.username)
             if not db_user:
                 logger.warning(
-                    f"Не удачный вход пользователь с username: {user_login.username} не найден"
+                    "Не удачный вход пользователь с username: %s не найден",
+                    user_login.username,
                 )
 
                 return None
 
-            if not verify_password(user_login.password, db_user.hashed_password):
+            if not await verify_password_async(
+                user_login.password, db_user.hashed_password
+            ):
                 logger.warning(
-                    f"Не удачный вход: неверный пароль для пользователя: {user_login.username}"
+                    "Не удачный вход: неверный пароль для пользователя: %s",
+                    user_login.username,
                 )
                 return None
 
-            logger.info(f"Успешный вход: пользователь:{user_login.username}")
+            logger.info("Успешный вход: пользователь:%s", user_login.username)
             return db_user
 
         except Exception as e:
-            logger.error(f"Произошла ошибка аутентификации пользователя: {e}")
+            logger.error("Произошла ошибка аутентификации пользователя: %s", e)
             return None
 
     @staticmethod
@@ -140,7 +184,7 @@ class UserCRUD:
 
             if not db_user:
                 logger.warning(
-                    f"Обновление не удалось: Пользователь с ID: {user_id} не найден"
+                    "Обновление не удалось: Пользователь с ID: %s не найден", user_id
                 )
                 return None
 
@@ -148,7 +192,7 @@ class UserCRUD:
                 existing_email = await UserCRUD.get_by_email(db, user_data.email)
                 if existing_email:
                     logger.warning(
-                        f"Обновление не удалось email {user_data.email} уже существует"
+                        "Обновление не удалось email %s уже существует", user_data.email
                     )
                     raise ValueError("Пользователь с такой почтой уже существует")
 
@@ -159,7 +203,8 @@ class UserCRUD:
 
                 if existing_username:
                     logger.warning(
-                        f"Обновление не удалось пользователь с username: {user_data.username} уже существует"
+                        "Обновление не удалось пользователь с username: %s уже существует",
+                        user_data.username,
                     )
                     raise ValueError("Пользователь с таким username уже существует")
 
@@ -171,18 +216,18 @@ class UserCRUD:
             await db.commit()
             await db.refresh(db_user)
 
-            logger.info(f"Пользователь с ID: {user_id} успешно обновлен")
+            logger.info("Пользователь с ID: %s успешно обновлен", user_id)
             return db_user
 
         except ValueError as e:
             logger.warning(
-                f"Произошла ошибка валидации при обновлении пользователя: {e}"
+                "Произошла ошибка валидации при обновлении пользователя: %s", e
             )
             raise
 
         except Exception as e:
             logger.error(
-                f"Произошла ошибка обновления пользователя с ID:{user_id} : {e}"
+                "Произошла ошибка обновления пользователя с ID:%s : %s", user_id, e
             )
             await db.rollback()
             raise
@@ -195,23 +240,28 @@ class UserCRUD:
             db_user = await UserCRUD.get_by_id(db, user_id)
             if not db_user:
                 logger.warning(
-                    f"Смена пароля не удалась: пользователь {user_id} не найден"
+                    "Смена пароля не удалась: пользователь %s не найден", user_id
                 )
                 return None
 
-            if not verify_password(
+            if not await verify_password_async(
                 password_change.current_password, db_user.hashed_password
             ):
                 logger.warning(
-                    f"Смена пароля не удалась: неверный текущий пароль для пользователя {user_id}"
+                    "Смена пароля не удалась: неверный текущий пароль для пользователя %s",
+                    user_id,
                 )
                 raise ValueError("Неверный текущий пароль")
 
-            if verify_password(password_change.new_password, db_user.hashed_password):
+            if await verify_password_async(
+                password_change.new_password, db_user.hashed_password
+            ):
                 raise ValueError("Новый пароль не должен совпадать со старым")
 
             validate_password_strength(password_change.new_password)
-            hashed_password = get_password_hash(password_change.new_password)
+            hashed_password = await get_password_hash_async(
+                password_change.new_password
+            )
 
             db_user.hashed_password = hashed_password
             await db.commit()
@@ -220,17 +270,17 @@ class UserCRUD:
             password_change.current_password = None
             password_change.new_password = None
 
-            logger.info(f"Пароль успешно изменён для пользователя: {user_id}")
+            logger.info("Пароль успешно изменён для пользователя: %s", user_id)
             return db_user
 
         except ValueError as e:
             logger.warning(
-                f"Ошибка валидации при смене пароля для пользователя {user_id}: {e}"
+                "Ошибка валидации при смене пароля для пользователя %s: %s", user_id, e
             )
             await db.rollback()
             raise
         except Exception as e:
-            logger.error(f"Ошибка при смене пароля для пользователя {user_id}: {e}")
+            logger.error("Ошибка при смене пароля для пользователя %s: %s", user_id, e)
             await db.rollback()
             raise
 
@@ -239,16 +289,18 @@ class UserCRUD:
         try:
             db_user = await UserCRUD.get_by_id(db, user_id)
             if not db_user:
-                logger.warning(f"Удаление не удалось: пользователь {user_id} не найден")
+                logger.warning(
+                    "Удаление не удалось: пользователь %s не найден", user_id
+                )
                 return False
 
             await db.delete(db_user)
             await db.commit()
 
-            logger.info(f"Пользователь успешно удалён: {user_id}")
+            logger.info("Пользователь успешно удалён: %s", user_id)
             return True
 
         except Exception as e:
-            logger.error(f"Ошибка при удалении пользователя {user_id}: {e}")
+            logger.error("Ошибка при удалении пользователя %s: %s", user_id, e)
             await db.rollback()
             raise
@@ -1,11 +1,35 @@
 from fastapi import FastAPI
 import uvicorn
-from app.core.database import db_manager
+from app.core.database import db_manager, redis_manager
 from contextlib import asynccontextmanager
 from app.core.logger_config import get_logger
 from app.core.config import settings
 import asyncio
-from app.api.v1 import auth_router
+from app.api.v1 import (
+    auth_router,
+    films_router,
+    admin_router,
+    favorites_router,
+    watch_router,
+    me_router,
+    analytics_router,
+    ratings_router,
+    actors_router,
+    metrics_router,
+)
+from app.core.periodic import periodic_tasks
+from app.core.compression import CompressionMiddleware
+from app.core.server_timing import ServerTimingMiddleware
+from app.core.metrics import MetricsMiddleware
+from app.services.film_card_service import film_card_service
+from app.services.popularity_service import popularity_service
+from app.services.watch_ingest_service import watch_ingest_service
+from app.services.watch_history_partitions import watch_history_partition_service
+from app.services.analytics_service import analytics_service
+from app.services.trending_service import trending_service
+from app.services.recommendation_service import collaborative_filtering_service
+from app.services.content_similarity_service import content_similarity_service
+from app.services.affinity_service import affinity_builder
 
 logger = get_logger(__name__)
 
@@ -21,17 +45,94 @@ async def lifespan(app: FastAPI):
         logger.info("Создание таблиц")
 
         await db_manager.create_tables()
+        await watch_history_partition_service.maintain()
+        await redis_manager.init_redis(db_url=REDIS_URL)
+
+        periodic_tasks.start(
+            "film_cards_refresh",
+            settings.FILM_CARDS_REFRESH_SECONDS,
+            film_card_service.refresh,
+        )
+        periodic_tasks.start(
+            "popularity_flush",
+            settings.POPULARITY_FLUSH_SECONDS,
+            popularity_service.flush,
+        )
+        periodic_tasks.start(
+            "popularity_reconcile",
+            settings.POPULARITY_RECONCILE_SECONDS,
+            popularity_service.reconcile,
+        )
+        periodic_tasks.start(
+            "watch_progress_flush",
+            settings.WATCH_FLUSH_SECONDS,
+            watch_ingest_service.flush,
+        )
+        periodic_tasks.start(
+            "watch_history_partitions",
+            settings.WATCH_HISTORY_MAINTENANCE_SECONDS,
+            watch_history_partition_service.maintain,
+        )
+        periodic_tasks.start(
+            "analytics_rollups",
+            settings.ANALYTICS_ROLLUP_SECONDS,
+            analytics_service.run,
+        )
+        periodic_tasks.start(
+            "trending_renormalize",
+            settings.TRENDING_RENORMALIZE_SECONDS,
+            trending_service.renormalize,
+        )
+        periodic_tasks.start(
+            "content_similar_refresh",
+            settings.CONTENT_SIMILAR_REFRESH_SECONDS,
+            content_similarity_service.refresh,
+        )
+        if settings.RECOMMENDATIONS_REFRESH_SECONDS > 0:
+            periodic_tasks.start(
+                "recommendations_build",
+                settings.RECOMMENDATIONS_REFRESH_SECONDS,
+                collaborative_filtering_service.build,
+            )
+        if settings.AFFINITY_REFRESH_SECONDS > 0:
+            periodic_tasks.start(
+                "affinity_build",
+                settings.AFFINITY_REFRESH_SECONDS,
+                affinity_builder.build,
+            )
 
         yield
 
+        await periodic_tasks.stop()
+        await watch_ingest_service.flush()
+        await redis_manager.close()
         await db_manager.close()
 
     except Exception as e:
-        logger.error(f"Произошла ошибка при старте приложения: {e}")
+        logger.error("Произошла ошибка при старте приложения: %s", e)
 
 
 app = FastAPI(lifespan=lifespan)
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MIN_SIZE,
+    gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+    brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+)
+if settings.SERVER_TIMING_ENABLED:
+    # Снаружи сжатия: app в Server-Timing включает и его
+    app.add_middleware(ServerTimingMiddleware)
+app.add_middleware(MetricsMiddleware)
 app.include_router(router=auth_router)
+app.include_router(router=films_router)
+app.include_router(router=admin_router)
+app.include_router(router=favorites_router)
+app.include_router(router=watch_router)
+app.include_router(router=me_router)
+app.include_router(router=analytics_router)
+app.include_router(router=ratings_router)
+app.include_router(router=actors_router)
+app.include_router(router=metrics_router)
 
 
 @app.post("/")
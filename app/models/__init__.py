@@ -6,6 +6,10 @@ from .watch_history import WatchHistory
 from .refresh_token import RefreshToken
 from .actor import Actor
 from .genre import Genre
+from .film_card import film_cards
+from .analytics import FilmDailyStats, GenreDailyStats, AnalyticsWatermark, CounterFlush
+from .recommendation import FilmSimilar, UserRecommendation
+from .rating import FilmRating
 
 
 __all__ = [
@@ -17,4 +21,12 @@ __all__ = [
     "RefreshToken",
     "Actor",
     "Genre",
+    "film_cards",
+    "FilmDailyStats",
+    "GenreDailyStats",
+    "AnalyticsWatermark",
+    "CounterFlush",
+    "FilmSimilar",
+    "UserRecommendation",
+    "FilmRating",
 ]
@@ -0,0 +1,59 @@
+"""Дневные агрегаты просмотров для дашбордов
+
+Строки целиком пересчитываются AnalyticsService по watch_history за день
+(UTC), вручную их не правим. Дашборды читают только эти таблицы.
+"""
+
+from sqlalchemy import String, ForeignKey, Date, DateTime, BigInteger, func
+from sqlalchemy.orm import Mapped, mapped_column
+from .base import Base
+from datetime import date, datetime
+
+
+class FilmDailyStats(Base):
+    __tablename__ = "film_daily_stats"
+
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    film_id: Mapped[int] = mapped_column(
+        ForeignKey("films.id", ondelete="CASCADE"), primary_key=True, index=True
+    )
+    views: Mapped[int] = mapped_column(default=0)
+    unique_viewers: Mapped[int] = mapped_column(default=0)
+    watch_seconds: Mapped[int] = mapped_column(BigInteger, default=0)
+
+
+class GenreDailyStats(Base):
+    __tablename__ = "genre_daily_stats"
+
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    genre_id: Mapped[int] = mapped_column(
+        ForeignKey("genres.id", ondelete="CASCADE"), primary_key=True, index=True
+    )
+    views: Mapped[int] = mapped_column(default=0)
+    unique_viewers: Mapped[int] = mapped_column(default=0)
+    watch_seconds: Mapped[int] = mapped_column(BigInteger, default=0)
+
+
+class AnalyticsWatermark(Base):
+    """
+    До какого watched_at данные watch_history уже учтены в агрегатах
+    """
+
+    __tablename__ = "analytics_watermarks"
+
+    name: Mapped[str] = mapped_column(String(64), primary_key=True)
+    processed_until: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+
+
+class CounterFlush(Base):
+    """
+    Примененные сбросы счетчиков популярности: запись вставляется в той же
+    транзакции, что и дельты, повторный сброс той же пачки пропускается
+    """
+
+    __tablename__ = "counter_flushes"
+
+    flush_id: Mapped[str] = mapped_column(String(32), primary_key=True)
+    applied_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now()
+    )
@@ -1,5 +1,7 @@
-from sqlalchemy import String
+from sqlalchemy import String, DateTime, BigInteger, Index, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.sql import func
+from datetime import datetime
 from .base import Base
 from .association_tables.film_actor import film_actor
 from .association_tables.film_genre import film_genre
@@ -7,6 +9,14 @@ from .association_tables.film_genre import film_genre
 
 class Film(Base):
     __tablename__ = "films"
+    __table_args__ = (
+        # Сортировка каталога по оценкам - чтение индекса в его порядке
+        Index(
+            "ix_films_bayesian_rating",
+            text("bayesian_rating DESC NULLS LAST"),
+            "id",
+        ),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     title: Mapped[str] = mapped_column(String(255), nullable=False)
@@ -14,6 +24,29 @@ class Film(Base):
     duration: Mapped[int] = mapped_column(nullable=False)
     year: Mapped[int] = mapped_column(nullable=False)
     rating: Mapped[float] = mapped_column(nullable=True)
+    # Счетчики поддерживаются инкрементально через Redis, см. PopularityService
+    favorites_count: Mapped[int] = mapped_column(
+        default=0, server_default=text("0"), index=True
+    )
+    views_count: Mapped[int] = mapped_column(
+        default=0, server_default=text("0"), index=True
+    )
+    # Просмотры из удаленных партиций watch_history, см. WatchHistoryPartitionService.
+    # Сверка считает views_count = views_archived + строки watch_history
+    views_archived: Mapped[int] = mapped_column(default=0, server_default=text("0"))
+    # Агрегаты пользовательских оценок, ведутся инкрементально, см. RatingCRUD.
+    # rating выше - редакционный рейтинг из каталога, он не меняется
+    ratings_count: Mapped[int] = mapped_column(default=0, server_default=text("0"))
+    ratings_sum: Mapped[int] = mapped_column(
+        BigInteger, default=0, server_default=text("0")
+    )
+    bayesian_rating: Mapped[float] = mapped_column(nullable=True)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now(),
+        index=True,
+    )
 
     favorites: Mapped[list["Favorite"]] = relationship(back_populates="film")
     watch_history: Mapped[list["WatchHistory"]] = relationship(back_populates="film")
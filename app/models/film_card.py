@@ -0,0 +1,79 @@
+"""Read model карточки фильма: materialized view film_cards
+
+Фильм + названия жанров + первые актеры массивами, чтобы список не собирал
+films, film_genre, genres, film_actor и actors на каждый запрос.
+Отдельная MetaData, чтобы Base.metadata.create_all не создал view как таблицу.
+"""
+
+from sqlalchemy import (
+    MetaData,
+    Table,
+    Column,
+    Integer,
+    String,
+    Float,
+    DateTime,
+    ARRAY,
+)
+
+
+FILM_CARD_TOP_ACTORS = 5
+
+views_metadata = MetaData()
+
+film_cards = Table(
+    "film_cards",
+    views_metadata,
+    Column("id", Integer, primary_key=True),
+    Column("title", String(255)),
+    Column("year", Integer),
+    Column("duration", Integer),
+    Column("rating", Float),
+    Column("updated_at", DateTime(timezone=True)),
+    Column("genres", ARRAY(String(50))),
+    Column("top_actors", ARRAY(String(101))),
+)
+
+
+FILM_CARDS_CREATE_SQL = f"""
+CREATE MATERIALIZED VIEW IF NOT EXISTS film_cards AS
+SELECT
+    f.id,
+    f.title,
+    f.year,
+    f.duration,
+    f.rating,
+    f.updated_at,
+    COALESCE(
+        (
+            SELECT array_agg(g.name ORDER BY g.name)
+            FROM film_genre fg
+            JOIN genres g ON g.id = fg.genre_id
+            WHERE fg.film_id = f.id
+        ),
+        '{{}}'
+    ) AS genres,
+    COALESCE(
+        (
+            SELECT array_agg(top.full_name ORDER BY top.id)
+            FROM (
+                SELECT a.id, a.name || ' ' || a.surname AS full_name
+                FROM film_actor fa
+                JOIN actors a ON a.id = fa.actor_id
+                WHERE fa.film_id = f.id
+                ORDER BY a.id
+                LIMIT {FILM_CARD_TOP_ACTORS}
+            ) top
+        ),
+        '{{}}'
+    ) AS top_actors
+FROM films f
+"""
+
+# Уникальный индекс обязателен для REFRESH MATERIALIZED VIEW CONCURRENTLY
+FILM_CARDS_INDEXES_SQL = (
+    "CREATE UNIQUE INDEX IF NOT EXISTS ix_film_cards_id ON film_cards (id)",
+    "CREATE INDEX IF NOT EXISTS ix_film_cards_updated_at ON film_cards (updated_at)",
+)
+
+FILM_CARDS_DROP_SQL = "DROP MATERIALIZED VIEW IF EXISTS film_cards"
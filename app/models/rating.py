@@ -0,0 +1,33 @@
+"""Оценки фильмов пользователями
+
+Одна оценка на пару (user_id, film_id). Агрегаты фильма (films.ratings_count,
+films.ratings_sum, films.bayesian_rating) меняются на разницу в той же
+транзакции, что и сама оценка, см. RatingCRUD.
+"""
+
+from sqlalchemy import ForeignKey, DateTime, SmallInteger, CheckConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql import func
+from .base import Base
+from datetime import datetime
+
+
+class FilmRating(Base):
+    __tablename__ = "film_ratings"
+    __table_args__ = (
+        CheckConstraint("score BETWEEN 1 AND 10", name="ck_film_ratings_score"),
+    )
+
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    film_id: Mapped[int] = mapped_column(
+        ForeignKey("films.id", ondelete="CASCADE"), primary_key=True, index=True
+    )
+    score: Mapped[int] = mapped_column(SmallInteger)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now()
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
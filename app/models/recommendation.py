@@ -0,0 +1,48 @@
+"""Предрасчитанные рекомендации
+
+Строки целиком перезаписываются пакетными задачами, при отдаче читается
+одна строка по первичному ключу. neighbor_ids / film_ids упорядочены по
+убыванию score, scores идут в том же порядке.
+"""
+
+from sqlalchemy import String, ForeignKey, DateTime, Integer, REAL
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql import func
+from .base import Base
+from datetime import datetime
+
+
+SOURCE_CF = "cf"
+SOURCE_CONTENT = "content"
+
+
+class FilmSimilar(Base):
+    """
+    source: cf - по совместным просмотрам и избранному, content - по жанрам и актерам
+    """
+
+    __tablename__ = "film_similar"
+
+    film_id: Mapped[int] = mapped_column(
+        ForeignKey("films.id", ondelete="CASCADE"), primary_key=True
+    )
+    source: Mapped[str] = mapped_column(String(16), primary_key=True)
+    neighbor_ids: Mapped[list[int]] = mapped_column(ARRAY(Integer))
+    scores: Mapped[list[float]] = mapped_column(ARRAY(REAL))
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
+
+
+class UserRecommendation(Base):
+    __tablename__ = "user_recommendations"
+
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    film_ids: Mapped[list[int]] = mapped_column(ARRAY(Integer))
+    scores: Mapped[list[float]] = mapped_column(ARRAY(REAL))
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
@@ -1,17 +1,31 @@
-from sqlalchemy import String, ForeignKey
+from sqlalchemy import String, ForeignKey, Index, DateTime
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from .base import Base
 from datetime import datetime, timezone
 
 
 class WatchHistory(Base):
+    """
+    Партиционирована по месяцам по watched_at, поэтому watched_at входит в PK.
+    Партиции создает и удаляет WatchHistoryPartitionService
+    """
+
     __tablename__ = "watch_history"
+    __table_args__ = (
+        Index(
+            "ix_watch_history_user_film_watched_at", "user_id", "film_id", "watched_at"
+        ),
+        Index("ix_watch_history_watched_at", "watched_at"),
+        {"postgresql_partition_by": "RANGE (watched_at)"},
+    )
 
-    id: Mapped[int] = mapped_column(primary_key=True)
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
     film_id: Mapped[int] = mapped_column(ForeignKey("films.id"))
     watched_at: Mapped[datetime] = mapped_column(
-        default=lambda: datetime.now(timezone.utc)
+        DateTime(timezone=True),
+        primary_key=True,
+        default=lambda: datetime.now(timezone.utc),
     )
     watch_duration: Mapped[int] = mapped_column(default=0)
 
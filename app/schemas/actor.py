@@ -1,7 +1,7 @@
 from datetime import datetime
 from typing import Optional
-from pydantic import BaseModel, Field, ConfigDict
-from schemas.film import FilmResponse
+from pydantic import BaseModel, Field, ConfigDict, TypeAdapter
+from app.schemas.film import FilmResponse
 
 
 class ActorBase(BaseModel):
@@ -42,3 +42,7 @@ class ActorListResponse(BaseModel):
     total: int = Field(..., description="Общее количество")
 
     model_config = ConfigDict(from_attributes=True)
+
+
+# Собирается один раз при импорте, см. app/core/responses.py
+actor_list_adapter = TypeAdapter(ActorListResponse)
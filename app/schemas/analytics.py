@@ -0,0 +1,90 @@
+from datetime import date, datetime
+from pydantic import BaseModel, Field, ConfigDict
+
+
+class DailyStatsBase(BaseModel):
+    day: date = Field(..., description="День (UTC)")
+    views: int = Field(..., description="Сеансов просмотра")
+    unique_viewers: int = Field(..., description="Уникальных зрителей за день")
+    watch_seconds: int = Field(..., description="Суммарное время просмотра в секундах")
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class FilmDailyStatsResponse(DailyStatsBase):
+    film_id: int = Field(..., description="ID фильма")
+
+
+class GenreDailyStatsResponse(DailyStatsBase):
+    genre_id: int = Field(..., description="ID жанра")
+
+
+class TopFilmResponse(BaseModel):
+    film_id: int = Field(..., description="ID фильма")
+    title: str = Field(..., description="Название фильма")
+    views: int = Field(..., description="Сеансов просмотра за период")
+    watch_seconds: int = Field(..., description="Время просмотра за период в секундах")
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class RollupReprocessResponse(BaseModel):
+    date_from: date = Field(..., description="Первый пересчитанный день")
+    date_to: date = Field(..., description="Последний пересчитанный день")
+    days: int = Field(..., description="Сколько дней пересчитано")
+
+
+class ReportTopFilm(BaseModel):
+    film_id: int = Field(..., description="ID фильма")
+    views: int = Field(..., description="Сеансов просмотра")
+    watch_seconds: int = Field(..., description="Время просмотра в секундах")
+
+
+class ReportCompletion(BaseModel):
+    film_id: int = Field(..., description="ID фильма")
+    views: int = Field(..., description="Сеансов просмотра")
+    completion_rate: float = Field(..., description="Доля досмотренных сеансов")
+
+
+class ReportCohort(BaseModel):
+    cohort_start: datetime = Field(..., description="Начало недели первого просмотра")
+    users: int = Field(..., description="Пользователей в когорте")
+    retention: list[float] = Field(
+        ..., description="Доля когорты, смотревшей через 0, 1, 2... недель"
+    )
+
+
+class WatchReportResponse(BaseModel):
+    date_from: date = Field(..., description="Начало периода")
+    date_to: date = Field(..., description="Конец периода")
+    sessions: int = Field(..., description="Сеансов просмотра за период")
+    top_films: list[ReportTopFilm]
+    duration_percentiles: dict[str, float] = Field(
+        ..., description="Перцентили длительности сеанса в секундах"
+    )
+    completion_rate: float = Field(..., description="Доля досмотренных сеансов")
+    completion_by_film: list[ReportCompletion]
+    cohorts: list[ReportCohort]
+
+
+class DailyUniqueViewers(BaseModel):
+    day: date = Field(..., description="День (UTC)")
+    unique_viewers: int = Field(..., description="Оценка уникальных зрителей")
+
+
+class UniqueViewersResponse(BaseModel):
+    date_from: date = Field(..., description="Начало периода")
+    date_to: date = Field(..., description="Конец периода")
+    unique_viewers: int = Field(
+        ..., description="Оценка уникальных зрителей за весь период (HyperLogLog)"
+    )
+    standard_error: float = Field(..., description="Стандартная относительная ошибка")
+    daily: list[DailyUniqueViewers]
+
+
+class UniqueViewersCheck(BaseModel):
+    day: date = Field(..., description="День (UTC)")
+    approx: int = Field(..., description="Оценка HyperLogLog")
+    exact: int = Field(..., description="Точное значение из дневных агрегатов")
+    relative_error: float = Field(..., description="Относительная ошибка")
+    within_bounds: bool = Field(..., description="Ошибка в пределах 3 сигм")
@@ -0,0 +1,28 @@
+from enum import Enum
+from pydantic import BaseModel, Field, ConfigDict
+
+
+class CatalogEntity(str, Enum):
+    films = "films"
+    actors = "actors"
+    genres = "genres"
+    film_actor = "film_actor"
+    film_genre = "film_genre"
+
+
+class ImportFormat(str, Enum):
+    csv = "csv"
+    jsonl = "jsonl"
+
+
+class CatalogImportResponse(BaseModel):
+
+    entity: CatalogEntity = Field(..., description="Что импортировалось")
+    rows_read: int = Field(..., description="Прочитано строк из источника")
+    rows_invalid: int = Field(..., description="Пропущено невалидных строк")
+    rows_written: int = Field(
+        ..., description="Вставлено или обновлено строк в таблице"
+    )
+    batches: int = Field(..., description="Количество пачек COPY")
+
+    model_config = ConfigDict(from_attributes=True)
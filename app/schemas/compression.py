@@ -0,0 +1,16 @@
+from pydantic import BaseModel, Field
+
+
+class CompressionRouteStats(BaseModel):
+    route: str = Field(..., description="Шаблон пути маршрута")
+    responses: int = Field(..., description="Всего ответов")
+    compressed: int = Field(..., description="Сжато middleware")
+    precompressed: int = Field(..., description="Отдано уже сжатыми из кеша")
+    bytes_in: int = Field(..., description="Байт до сжатия")
+    bytes_out: int = Field(..., description="Байт отдано")
+    bytes_saved: int = Field(..., description="Сэкономлено байт")
+    ratio: float = Field(..., description="Отдано / до сжатия")
+    cpu_ms: float = Field(..., description="Процессорное время сжатия, мс")
+    cpu_us_per_kb_saved: float = Field(
+        ..., description="Микросекунд CPU на килобайт экономии"
+    )
@@ -22,3 +22,19 @@ class FavoriteResponse(FavoriteBase):
     created_at: datetime = Field(..., description="Дата добавления в избраное")
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class FavoriteLookupRequest(BaseModel):
+    film_ids: list[int] = Field(
+        ..., max_length=100, description="ID фильмов, которые надо проверить"
+    )
+
+
+class FavoriteLookupResponse(BaseModel):
+    film_ids: list[int] = Field(..., description="ID фильмов, которые в избранном")
+
+
+class FavoriteStatusResponse(BaseModel):
+    film_id: int = Field(..., description="ID фильма")
+    favorited: bool = Field(..., description="Фильм в избранном")
+    changed: bool = Field(..., description="Изменилось ли состояние этим запросом")
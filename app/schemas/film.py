@@ -1,6 +1,8 @@
 from datetime import datetime
+from enum import Enum
 from typing import Optional
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, Field, ConfigDict, TypeAdapter
+from app.schemas.genre import GenreResponse
 
 
 class FilmBase(BaseModel):
@@ -42,3 +44,69 @@ class FilmResponse(FilmBase):
     created_at: Optional[datetime] = Field(None, description="Дата создания")
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class FilmDetailResponse(FilmResponse):
+    genres: list[GenreResponse] = Field([], description="Жанры фильма")
+
+
+class FilmListResponse(BaseModel):
+    items: list[FilmResponse] = Field(..., description="Список фильмов")
+    total: int = Field(..., description="Общее количество")
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class FilmCardResponse(BaseModel):
+
+    id: int = Field(..., description="ID фильма")
+    title: str = Field(..., description="Название фильма")
+    year: int = Field(..., description="Год выпуска фильма")
+    duration: int = Field(..., description="Длительность фильма в секундах")
+    rating: Optional[float] = Field(None, description="Рейтинг фильма")
+    genres: list[str] = Field([], description="Названия жанров")
+    top_actors: list[str] = Field([], description="Первые актеры фильма")
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class FilmScoredCardResponse(FilmCardResponse):
+    score: float = Field(..., description="Вес фильма в выдаче")
+
+
+class FilmCardListResponse(BaseModel):
+    items: list[FilmCardResponse] = Field(..., description="Карточки фильмов")
+    total: int = Field(..., description="Общее количество")
+
+
+class FilmBatchResponse(BaseModel):
+    items: list[FilmCardResponse] = Field(..., description="Карточки в порядке запроса")
+    missing: list[int] = Field([], description="ID, которых нет в каталоге")
+
+
+class FilmPopularityResponse(BaseModel):
+
+    id: int = Field(..., description="ID фильма")
+    title: str = Field(..., description="Название фильма")
+    year: int = Field(..., description="Год выпуска фильма")
+    rating: Optional[float] = Field(None, description="Рейтинг фильма")
+    favorites_count: int = Field(..., description="Сколько раз добавлен в избранное")
+    views_count: int = Field(..., description="Количество просмотров")
+    ratings_count: int = Field(..., description="Количество пользовательских оценок")
+    bayesian_rating: Optional[float] = Field(
+        None, description="Байесовское среднее пользовательских оценок"
+    )
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class PopularitySort(str, Enum):
+    views = "views"
+    favorites = "favorites"
+    rating = "rating"
+
+
+# Собираются один раз при импорте, см. app/core/responses.py
+film_card_list_adapter = TypeAdapter(FilmCardListResponse)
+film_scored_cards_adapter = TypeAdapter(list[FilmScoredCardResponse])
+film_batch_adapter = TypeAdapter(FilmBatchResponse)
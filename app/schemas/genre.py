@@ -0,0 +1,17 @@
+from pydantic import BaseModel, Field, ConfigDict
+
+
+class GenreBase(BaseModel):
+
+    name: str = Field(..., min_length=1, max_length=50, description="Название жанра")
+
+
+class GenreCreate(GenreBase):
+    pass
+
+
+class GenreResponse(GenreBase):
+
+    id: int = Field(..., description="ID жанра")
+
+    model_config = ConfigDict(from_attributes=True)
@@ -0,0 +1,29 @@
+from datetime import datetime
+from typing import Optional
+from pydantic import BaseModel, Field, ConfigDict
+
+
+class RatingRequest(BaseModel):
+    score: int = Field(..., ge=1, le=10, description="Оценка фильма от 1 до 10")
+
+
+class RatingResponse(BaseModel):
+    film_id: int = Field(..., description="ID фильма")
+    score: int = Field(..., description="Оценка фильма")
+    updated_at: datetime = Field(..., description="Дата последнего изменения оценки")
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class RatingStatusResponse(BaseModel):
+    film_id: int = Field(..., description="ID фильма")
+    score: Optional[int] = Field(None, description="Оценка пользователя, None если удалена")
+    changed: bool = Field(..., description="Изменилось ли состояние этим запросом")
+    ratings_count: Optional[int] = Field(None, description="Количество оценок фильма")
+    bayesian_rating: Optional[float] = Field(
+        None, description="Байесовское среднее оценок фильма"
+    )
+
+
+class RatingRecalculateResponse(BaseModel):
+    films: int = Field(..., description="Сколько фильмов пересчитано")
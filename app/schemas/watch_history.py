@@ -27,3 +27,30 @@ class WatchHistoryResponse(WatchHistoryBase):
     watched_at: datetime = Field(..., description="Когда просмотрено")
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class WatchProgressHeartbeat(BaseModel):
+    film_id: int = Field(..., gt=0, description="ID фильма")
+    watch_duration: int = Field(
+        ..., ge=0, description="Текущая позиция просмотра в секундах"
+    )
+
+
+class WatchIngestStatsResponse(BaseModel):
+    pending_events: int = Field(..., description="Пар пользователь/фильм ждут сброса")
+    pending_lag_seconds: float = Field(
+        ..., description="Возраст самого старого несброшенного события"
+    )
+    last_flush_at: Optional[datetime] = Field(None, description="Время последнего сброса")
+    last_flush_rows: int = Field(0, description="Строк записано последним сбросом")
+    last_flush_lag_seconds: float = Field(
+        0, description="Задержка последнего сброса от первого события"
+    )
+
+
+class ContinueWatchingItem(BaseModel):
+    film_id: int = Field(..., description="ID фильма")
+    watched_at: datetime = Field(..., description="Когда смотрели последний раз")
+    watch_duration: int = Field(..., description="Позиция просмотра в секундах")
+    duration: int = Field(..., description="Длительность фильма в секундах")
+    progress_percent: float = Field(..., description="Процент просмотра")
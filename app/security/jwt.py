@@ -75,7 +75,7 @@ class JWTManager:
             payload = jwt.decode(token, self.secret_key, algorithms=[self.algoritm])
             return payload
         except PyJWTError as e:
-            logger.error(f"Не валидный токен: {e}")
+            logger.error("Не валидный токен: %s", e)
             return None
 
     def verify_access_token(self, token: str) -> Optional[Dict[str, Any]]:
@@ -87,7 +87,7 @@ class JWTManager:
             return None
 
         except PyJWTError as e:
-            logger.error(f"Не валидный access token: {e}")
+            logger.error("Не валидный access token: %s", e)
             return None
 
     def verify_refresh_token(self, token: str) -> Optional[Dict[str, Any]]:
@@ -99,7 +99,7 @@ class JWTManager:
             return None
 
         except PyJWTError as e:
-            logger.error(f"Не валидный refresh token: {e}")
+            logger.error("Не валидный refresh token: %s", e)
             return None
 
     def get_token_payload(
@@ -118,7 +118,7 @@ class JWTManager:
             return payload
 
         except PyJWTError as e:
-            logger.error(f"Не удалось раскодировать токен: {e}")
+            logger.error("Не удалось раскодировать токен: %s", e)
             return None
 
     def is_token_expired(
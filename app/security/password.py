@@ -1,12 +1,21 @@
 from passlib.context import CryptContext
+import asyncio
 import bcrypt
 import hmac
 import hashlib
+from concurrent.futures import ThreadPoolExecutor
 from app.core.config import settings
+from app.core.metrics import PASSWORD_HASH_QUEUE
+from app.core.server_timing import timed
 
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# bcrypt - десятки миллисекунд CPU, в event loop он останавливал все запросы воркера
+_hash_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt"
+)
+
 
 def validate_password_strength(password: str) -> str:
     """
@@ -49,3 +58,23 @@ def verify_password(input_password: str, hashed_password: bytes) -> bool:
     ).hexdigest()
 
     return bcrypt.checkpw(peppered_password.encode("utf-8"), hashed_password)
+
+
+async def _run_in_hash_pool(func, *args):
+    # Время в Server-Timing вместе с ожиданием свободного потока
+    PASSWORD_HASH_QUEUE.inc()
+    try:
+        with timed("hash"):
+            return await asyncio.get_running_loop().run_in_executor(
+                _hash_executor, func, *args
+            )
+    finally:
+        PASSWORD_HASH_QUEUE.dec()
+
+
+async def get_password_hash_async(password: str) -> bytes:
+    return await _run_in_hash_pool(get_password_hash, password)
+
+
+async def verify_password_async(input_password: str, hashed_password: bytes) -> bool:
+    return await _run_in_hash_pool(verify_password, input_password, hashed_password)
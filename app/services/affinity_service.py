@@ -0,0 +1,336 @@
+"""Векторы жанровых предпочтений пользователей
+
+Вектор пользователя - float32 длины (max genre_id + 1): сумма по жанрам
+досмотренной доли фильмов (watch_duration / Film.duration, не больше 1)
+за AFFINITY_HISTORY_DAYS плюс AFFINITY_FAVORITE_WEIGHT за фильм в
+избранном, нормированная по L2. Векторы фильмов - нормированные
+one-hot жанров. Близость фильма пользователю - скалярное произведение.
+
+Снимок строится пакетной задачей пачками по user_id и пишется в .npy:
+users.npy - матрица (max user_id + 1) x жанры, строка = id пользователя,
+films.npy - то же для фильмов. Каталог снимка пишется рядом, затем
+симлинк current атомарно переключается на него. Воркеры открывают
+users.npy через memmap (страницы общие для всех процессов на хосте) и
+перечитывают снимок, когда current указывает на новый каталог.
+
+Переранжирование 500 кандидатов - gather строк фильмов, один matvec и
+argsort, порядка десятков микросекунд (benchmarks/affinity_rerank.py).
+"""
+
+import asyncio
+import itertools
+import os
+import shutil
+import time
+import uuid
+from datetime import datetime, timedelta, UTC
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.core.config import settings, project_root
+from app.core.database import db_manager
+from app.core.logger_config import get_logger
+from app.services import recommendation_arrays
+
+
+logger = get_logger(__name__)
+
+
+USERS_FILE = "users.npy"
+FILMS_FILE = "films.npy"
+CURRENT_LINK = "current"
+FETCH_SIZE = 10_000
+KEEP_SNAPSHOTS = 2
+
+# Ключ advisory lock, чтобы снимок не строили два процесса сразу
+AFFINITY_BUILD_LOCK = 703305
+
+
+# Границы :films_shape и :genres_shape берутся один раз в начале сборки, а
+# пачки читаются в разных транзакциях: фильмы и жанры, созданные во время
+# сборки, не должны выйти за размер матриц, они попадут в следующий снимок
+FILM_GENRE_SQL = text(
+    """
+    SELECT film_id, genre_id
+    FROM film_genre
+    WHERE film_id < :films_shape AND genre_id < :genres_shape
+    """
+)
+
+AFFINITY_SQL = text(
+    """
+    SELECT user_id, genre_id, sum(weight) AS weight
+    FROM (
+        SELECT w.user_id, fg.genre_id,
+            least(CAST(w.watch_duration AS real) / f.duration, 1.0) AS weight
+        FROM watch_history w
+        JOIN films f ON f.id = w.film_id
+        JOIN film_genre fg ON fg.film_id = w.film_id
+        WHERE w.user_id >= :user_from AND w.user_id < :user_to
+          AND w.watched_at >= :since AND f.duration > 0
+          AND fg.genre_id < :genres_shape
+        UNION ALL
+        SELECT fa.user_id, fg.genre_id, CAST(:favorite_weight AS real)
+        FROM favorites fa
+        JOIN film_genre fg ON fg.film_id = fa.film_id
+        WHERE fa.user_id >= :user_from AND fa.user_id < :user_to
+          AND fg.genre_id < :genres_shape
+    ) weights
+    GROUP BY user_id, genre_id
+    """
+)
+
+
+def _affinity_dir() -> Path:
+    path = Path(settings.AFFINITY_DIR)
+    return path if path.is_absolute() else project_root / path
+
+
+class AffinityStore:
+    """
+    Текущий снимок векторов в процессе воркера
+    """
+
+    def __init__(self):
+        self._snapshot: Optional[Path] = None
+        self._users: Optional[np.ndarray] = None
+        self._films: Optional[np.ndarray] = None
+        self._checked_at = 0.0
+
+    def _refresh(self) -> None:
+        # realpath раз в AFFINITY_RELOAD_SECONDS, а не на каждый запрос
+        now = time.monotonic()
+        if now - self._checked_at < settings.AFFINITY_RELOAD_SECONDS:
+            return
+        self._checked_at = now
+
+        current = _affinity_dir() / CURRENT_LINK
+        if not current.exists():
+            return
+
+        snapshot = current.resolve()
+        if snapshot == self._snapshot:
+            return
+
+        try:
+            self._users = np.load(snapshot / USERS_FILE, mmap_mode="r")
+            self._films = np.load(snapshot / FILMS_FILE)
+            self._snapshot = snapshot
+            logger.info("Загружен снимок жанровых векторов %s", snapshot.name)
+        except (OSError, ValueError) as e:
+            logger.warning(
+                "Не удалось открыть снимок жанровых векторов %s: %s", snapshot, e
+            )
+
+    def user_vector(self, user_id: int) -> Optional[np.ndarray]:
+        self._refresh()
+        if self._users is None or user_id >= len(self._users):
+            return None
+
+        vector = self._users[user_id]
+        return vector if vector.any() else None
+
+    def rerank(
+        self, user_id: int, film_ids: np.ndarray, base_scores: np.ndarray
+    ) -> Optional[tuple[np.ndarray, np.ndarray]]:
+        """
+        (порядок кандидатов, оценки) или None, если вектора пользователя нет
+        """
+        vector = self.user_vector(user_id)
+        if vector is None:
+            return None
+
+        return recommendation_arrays.rerank(
+            vector, self._films, film_ids, base_scores, settings.AFFINITY_RERANK_WEIGHT
+        )
+
+
+class AffinityBuilder:
+
+    async def build(self) -> Optional[Path]:
+        started = time.perf_counter()
+
+        async with db_manager.engine.connect() as conn:
+            locked = await conn.execute(
+                text("SELECT pg_try_advisory_lock(:key)"), {"key": AFFINITY_BUILD_LOCK}
+            )
+            if not locked.scalar_one():
+                logger.info("Жанровые векторы уже строит другой процесс")
+                return None
+            await conn.commit()
+
+            try:
+                snapshot = await self._build(conn)
+                logger.info(
+                    "Снимок жанровых векторов %s построен за %.1f сек",
+                    snapshot.name,
+                    time.perf_counter() - started,
+                )
+                return snapshot
+
+            except Exception as e:
+                logger.error("Произошла ошибка построения жанровых векторов: %s", e)
+                await conn.rollback()
+                raise
+
+            finally:
+                await conn.execute(
+                    text("SELECT pg_advisory_unlock(:key)"), {"key": AFFINITY_BUILD_LOCK}
+                )
+                await conn.commit()
+
+    async def _build(self, conn: AsyncConnection) -> Path:
+        bounds = await conn.execute(
+            text(
+                "SELECT (SELECT coalesce(max(id), 0) FROM films), "
+                "(SELECT coalesce(max(id), 0) FROM users), "
+                "(SELECT coalesce(max(id), 0) FROM genres)"
+            )
+        )
+        max_film_id, max_user_id, max_genre_id = bounds.one()
+        films_shape = max_film_id + 1
+        genres_shape = max_genre_id + 1
+
+        # Имя уникально и у двух сборок в одну секунду (другой хост на общем
+        # томе, повторный запуск), а префикс-время сохраняет сортировку снимков.
+        # Пишем в скрытый .tmp и переименовываем готовый каталог: current не
+        # может указать на недописанный снимок, а сбой не оставит мусора
+        root = _affinity_dir()
+        root.mkdir(parents=True, exist_ok=True)
+        stamp = datetime.now(UTC).strftime("%Y%m%dT%H%M%S%f")
+        name = f"{stamp}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        building = root / f".{name}.tmp"
+        building.mkdir(exist_ok=False)
+
+        try:
+            await self._write_snapshot(
+                conn, building, films_shape, genres_shape, max_user_id
+            )
+        except BaseException:
+            shutil.rmtree(building, ignore_errors=True)
+            raise
+
+        snapshot = root / name
+        os.replace(building, snapshot)
+        self._publish(root, snapshot)
+        return snapshot
+
+    async def _write_snapshot(
+        self,
+        conn: AsyncConnection,
+        snapshot: Path,
+        films_shape: int,
+        genres_shape: int,
+        max_user_id: int,
+    ) -> None:
+        result = await conn.execute(
+            FILM_GENRE_SQL, {"films_shape": films_shape, "genres_shape": genres_shape}
+        )
+        pairs = self._to_array(result.all(), 2).astype(np.int64)
+        # Запись файлов и нормировка - в потоке, не блокируя цикл событий
+        await asyncio.to_thread(
+            self._save_films, snapshot / FILMS_FILE, pairs, films_shape, genres_shape
+        )
+
+        users = await asyncio.to_thread(
+            np.lib.format.open_memmap,
+            snapshot / USERS_FILE,
+            mode="w+",
+            dtype=np.float32,
+            shape=(max_user_id + 1, genres_shape),
+        )
+        since = datetime.now(UTC) - timedelta(days=settings.AFFINITY_HISTORY_DAYS)
+        chunk = settings.AFFINITY_USER_CHUNK
+
+        for user_from in range(0, max_user_id + 1, chunk):
+            user_to = min(user_from + chunk, max_user_id + 1)
+            stream = await conn.stream(
+                AFFINITY_SQL,
+                {
+                    "user_from": user_from,
+                    "user_to": user_to,
+                    "since": since,
+                    "favorite_weight": settings.AFFINITY_FAVORITE_WEIGHT,
+                    "genres_shape": genres_shape,
+                },
+            )
+            parts = [
+                self._to_array(rows, 3) async for rows in stream.partitions(FETCH_SIZE)
+            ]
+            if not parts:
+                continue
+
+            await asyncio.to_thread(
+                self._write_block, users, np.concatenate(parts), user_from, user_to
+            )
+
+        await asyncio.to_thread(users.flush)
+        del users
+
+    @staticmethod
+    def _save_films(
+        path: Path, pairs: np.ndarray, films_shape: int, genres_shape: int
+    ) -> None:
+        films = np.zeros((films_shape, genres_shape), dtype=np.float32)
+        films[pairs[:, 0], pairs[:, 1]] = 1.0
+        np.save(path, recommendation_arrays.normalize_rows(films))
+
+    @staticmethod
+    def _write_block(
+        users: np.ndarray, data: np.ndarray, user_from: int, user_to: int
+    ) -> None:
+        block = np.zeros((user_to - user_from, users.shape[1]), dtype=np.float32)
+        # (user_id, genre_id) уникальны после GROUP BY, сложение не нужно
+        block[data[:, 0].astype(np.int64) - user_from, data[:, 1].astype(np.int64)] = (
+            data[:, 2]
+        )
+        users[user_from:user_to] = recommendation_arrays.normalize_rows(block)
+
+    @staticmethod
+    def _to_array(rows, columns: int) -> np.ndarray:
+        return np.fromiter(
+            itertools.chain.from_iterable(rows),
+            dtype=np.float64,
+            count=len(rows) * columns,
+        ).reshape(-1, columns)
+
+    @staticmethod
+    def _publish(root: Path, snapshot: Path) -> None:
+        # Новый симлинк рядом и rename поверх current - атомарная замена
+        link = root / f"{CURRENT_LINK}.tmp"
+        if link.is_symlink():
+            link.unlink()
+        link.symlink_to(snapshot.name)
+        os.replace(link, root / CURRENT_LINK)
+
+        # Предыдущий снимок оставляем: его еще могут держать открытым воркеры.
+        # Скрытые каталоги - недописанные снимки других сборок, их не трогаем
+        snapshots = sorted(
+            path
+            for path in root.iterdir()
+            if path.is_dir() and not path.is_symlink() and not path.name.startswith(".")
+        )
+        for old in snapshots[:-KEEP_SNAPSHOTS]:
+            shutil.rmtree(old, ignore_errors=True)
+
+
+affinity_store = AffinityStore()
+affinity_builder = AffinityBuilder()
+
+
+async def _run_build() -> None:
+    db_manager.init_db(db_url=settings.DATABASE_URL)
+    try:
+        await affinity_builder.build()
+    finally:
+        await db_manager.close()
+
+
+# python -m app.services.affinity_service
+
+if __name__ == "__main__":
+    asyncio.run(_run_build())
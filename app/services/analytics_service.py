@@ -0,0 +1,296 @@
+"""Инкрементальные дневные агрегаты по watch_history
+
+Водяной знак analytics_watermarks хранит максимальный watched_at, уже
+учтенный в агрегатах. Каждый проход берет строки новее знака за вычетом
+запаса (WATCH_SESSION_GAP_MIN + ANALYTICS_LATENESS_MIN): сеанс в
+watch_history обновляется in place и его watched_at может переехать
+с уже посчитанного дня, а heartbeat-ы доезжают с задержкой сброса.
+
+Затронутые дни пересчитываются целиком: DELETE агрегатов дня и INSERT
+из watch_history в одной транзакции, поэтому повторная обработка дня
+дает тот же результат. Дни считаются в UTC.
+
+Ad-hoc отчеты (топ, перцентили, досмотры, когорты) не ложатся на дневные
+агрегаты: колонки watch_history за период читаются курсором пачками
+в массивы NumPy и считаются в analytics_arrays в отдельном потоке.
+"""
+
+import asyncio
+from datetime import date, datetime, time, timedelta, UTC
+from typing import Optional
+
+import numpy as np
+from sqlalchemy import select, func, delete, text, cast, BigInteger
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import db_manager
+from app.core.logger_config import get_logger
+from app.models.analytics import FilmDailyStats, GenreDailyStats, AnalyticsWatermark
+from app.models.film import Film
+from app.models.watch_history import WatchHistory
+from app.services import analytics_arrays
+from app.services.analytics_arrays import WatchArrays, WatchArraysBuilder
+
+
+logger = get_logger(__name__)
+
+
+ROLLUP_WATERMARK = "watch_history_daily"
+
+# Ключ advisory lock, чтобы агрегаты не пересчитывались из нескольких воркеров сразу
+ANALYTICS_ROLLUP_LOCK = 703302
+
+
+FILM_ROLLUP_SQL = text(
+    """
+    INSERT INTO film_daily_stats (day, film_id, views, unique_viewers, watch_seconds)
+    SELECT
+        (w.watched_at AT TIME ZONE 'UTC')::date,
+        w.film_id,
+        count(*),
+        count(DISTINCT w.user_id),
+        sum(w.watch_duration)
+    FROM watch_history w
+    WHERE w.watched_at >= :start_ts AND w.watched_at < :end_ts
+    GROUP BY 1, 2
+    """
+)
+
+GENRE_ROLLUP_SQL = text(
+    """
+    INSERT INTO genre_daily_stats (day, genre_id, views, unique_viewers, watch_seconds)
+    SELECT
+        (w.watched_at AT TIME ZONE 'UTC')::date,
+        fg.genre_id,
+        count(*),
+        count(DISTINCT w.user_id),
+        sum(w.watch_duration)
+    FROM watch_history w
+    JOIN film_genre fg ON fg.film_id = w.film_id
+    WHERE w.watched_at >= :start_ts AND w.watched_at < :end_ts
+    GROUP BY 1, 2
+    """
+)
+
+
+def _day_start(day: date) -> datetime:
+    return datetime.combine(day, time.min, tzinfo=UTC)
+
+
+class AnalyticsService:
+
+    async def run(self) -> int:
+        """
+        Периодический проход: пересчитывает дни, затронутые строками
+        новее водяного знака. Возвращает число пересчитанных дней
+        """
+        async with db_manager.session_factory() as session:
+            try:
+                locked = await session.execute(
+                    text("SELECT pg_try_advisory_xact_lock(:key)"),
+                    {"key": ANALYTICS_ROLLUP_LOCK},
+                )
+                if not locked.scalar_one():
+                    logger.debug("Агрегаты аналитики пересчитывает другой воркер")
+                    return 0
+
+                watermark = await session.get(AnalyticsWatermark, ROLLUP_WATERMARK)
+                processed_until = watermark.processed_until if watermark else None
+
+                query = select(
+                    func.min(WatchHistory.watched_at), func.max(WatchHistory.watched_at)
+                )
+                window_start = None
+                if processed_until is not None:
+                    margin = timedelta(
+                        minutes=settings.WATCH_SESSION_GAP_MIN
+                        + settings.ANALYTICS_LATENESS_MIN
+                    )
+                    window_start = processed_until - margin
+                    query = query.where(WatchHistory.watched_at >= window_start)
+
+                earliest, latest = (await session.execute(query)).one()
+                if latest is None or (
+                    processed_until is not None and latest <= processed_until
+                ):
+                    return 0
+
+                # День начала окна пересчитывается, даже если строк в нем уже нет:
+                # сеанс мог переехать из него на следующий день
+                day_from = earliest.astimezone(UTC).date()
+                if window_start is not None:
+                    day_from = min(day_from, window_start.astimezone(UTC).date())
+                day_to = latest.astimezone(UTC).date()
+                days = await self._recompute(session, day_from, day_to)
+
+                await session.execute(
+                    insert(AnalyticsWatermark)
+                    .values(name=ROLLUP_WATERMARK, processed_until=latest)
+                    .on_conflict_do_update(
+                        index_elements=[AnalyticsWatermark.name],
+                        set_={"processed_until": latest},
+                    )
+                )
+                await session.commit()
+
+                logger.info(
+                    "Агрегаты аналитики пересчитаны за %s - %s, учтено до %s",
+                    day_from,
+                    day_to,
+                    latest.isoformat(),
+                )
+                return days
+
+            except Exception as e:
+                logger.error("Произошла ошибка пересчета агрегатов аналитики: %s", e)
+                await session.rollback()
+                raise
+
+    async def reprocess(self, day_from: date, day_to: date) -> int:
+        """
+        Ручной пересчет диапазона дней, например после правки истории.
+        Водяной знак не трогает
+        """
+        async with db_manager.session_factory() as session:
+            try:
+                # Ждем периодический проход, а не пропускаем запрос
+                await session.execute(
+                    text("SELECT pg_advisory_xact_lock(:key)"),
+                    {"key": ANALYTICS_ROLLUP_LOCK},
+                )
+                days = await self._recompute(session, day_from, day_to)
+                await session.commit()
+
+                logger.info(
+                    "Агрегаты аналитики пересчитаны вручную за %s - %s",
+                    day_from,
+                    day_to,
+                )
+                return days
+
+            except Exception as e:
+                logger.error(
+                    "Произошла ошибка ручного пересчета агрегатов за %s - %s: %s",
+                    day_from,
+                    day_to,
+                    e,
+                )
+                await session.rollback()
+                raise
+
+    @staticmethod
+    async def _recompute(session: AsyncSession, day_from: date, day_to: date) -> int:
+        params = {
+            # Константные границы дают отсечение партиций watch_history
+            "start_ts": _day_start(day_from),
+            "end_ts": _day_start(day_to + timedelta(days=1)),
+        }
+
+        await session.execute(
+            delete(FilmDailyStats).where(FilmDailyStats.day.between(day_from, day_to))
+        )
+        await session.execute(
+            delete(GenreDailyStats).where(GenreDailyStats.day.between(day_from, day_to))
+        )
+        await session.execute(FILM_ROLLUP_SQL, params)
+        await session.execute(GENRE_ROLLUP_SQL, params)
+
+        return (day_to - day_from).days + 1
+
+    async def load_watch_arrays(
+        self, since: datetime, until: datetime, chunk_size: Optional[int] = None
+    ) -> WatchArrays:
+        chunk_size = chunk_size or settings.ANALYTICS_CHUNK_SIZE
+        query = (
+            select(
+                WatchHistory.user_id,
+                WatchHistory.film_id,
+                WatchHistory.watch_duration,
+                cast(func.extract("epoch", WatchHistory.watched_at), BigInteger),
+            )
+            .where(WatchHistory.watched_at >= since, WatchHistory.watched_at < until)
+            .execution_options(yield_per=chunk_size)
+        )
+
+        builder = WatchArraysBuilder()
+        async with db_manager.session_factory() as session:
+            try:
+                # Серверный курсор: в памяти Python только текущая пачка строк
+                result = await session.stream(query)
+                async for rows in result.partitions():
+                    builder.append_rows(rows)
+
+            except Exception as e:
+                logger.error(
+                    "Произошла ошибка выгрузки истории просмотров в массивы: %s", e
+                )
+                raise
+
+        return builder.build()
+
+    @staticmethod
+    async def load_film_durations() -> np.ndarray:
+        async with db_manager.session_factory() as session:
+            try:
+                result = await session.execute(select(Film.id, Film.duration))
+                rows = result.all()
+
+            except Exception as e:
+                logger.error("Произошла ошибка загрузки длительностей фильмов: %s", e)
+                raise
+
+        if not rows:
+            return np.zeros(0, dtype=np.int32)
+
+        ids, durations = np.array(rows, dtype=np.int64).T
+        film_durations = np.zeros(int(ids.max()) + 1, dtype=np.int32)
+        film_durations[ids] = durations
+        return film_durations
+
+    async def build_report(self, day_from: date, day_to: date, top_n: int = 20) -> dict:
+        arrays = await self.load_watch_arrays(
+            _day_start(day_from), _day_start(day_to + timedelta(days=1))
+        )
+        film_durations = await self.load_film_durations()
+
+        # Расчет занимает CPU, event loop не блокируем
+        report = await asyncio.to_thread(
+            self._compute_report, arrays, film_durations, top_n
+        )
+        report.update(date_from=day_from, date_to=day_to, sessions=len(arrays))
+
+        logger.info(
+            "Отчет по просмотрам за %s - %s построен, сеансов %s",
+            day_from,
+            day_to,
+            len(arrays),
+        )
+        return report
+
+    @staticmethod
+    def _compute_report(
+        arrays: WatchArrays, film_durations: np.ndarray, top_n: int
+    ) -> dict:
+        completion = analytics_arrays.completion_rates(
+            arrays,
+            film_durations,
+            ratio=settings.ANALYTICS_COMPLETION_RATIO,
+            min_views=settings.ANALYTICS_MIN_VIEWS,
+            n=top_n,
+        )
+        cohorts = analytics_arrays.cohort_retention(arrays)
+        for cohort in cohorts:
+            cohort["cohort_start"] = datetime.fromtimestamp(cohort["cohort_start"], tz=UTC)
+
+        return {
+            "top_films": analytics_arrays.top_films(arrays, top_n),
+            "duration_percentiles": analytics_arrays.duration_percentiles(arrays),
+            "completion_rate": completion["overall"],
+            "completion_by_film": completion["films"],
+            "cohorts": cohorts,
+        }
+
+
+analytics_service = AnalyticsService()
@@ -6,12 +6,15 @@ from app.schemas.refresh_token import RefreshTokenCreate
 from app.security.jwt import JWTManager
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
-from app.core.logger_config import logger
+from app.core.logger_config import get_logger
 from app.schemas.user import UserLogin
 from app.models.user import User
 from app.schemas.user import UserCreate
 
 
+logger = get_logger(__name__)
+
+
 class AuthService:
     def __init__(self):
         self.jwt_manager = JWTManager()
@@ -28,7 +31,7 @@ class AuthService:
             user = await UserCRUD.authenticate(db, login_data)
             if not user:
                 logger.warning(
-                    f"Неудачная попытка входа для пользователя {login_data.username}"
+                    "Неудачная попытка входа для пользователя %s", login_data.username
                 )
                 return None
 
@@ -52,7 +55,7 @@ class AuthService:
                 db=db, token_data=refresh_token_data
             )
 
-            logger.info(f"Успешный вход для пользователя {user.username}")
+            logger.info("Успешный вход для пользователя %s", user.username)
 
             return {
                 "access_token": access_token,
@@ -63,7 +66,7 @@ class AuthService:
             }
         except Exception as e:
             logger.error(
-                f"Произошла ошибка аутентификации пользователя: {user.username}:{e}"
+                "Произошла ошибка аутентификации пользователя: %s:%s", user.username, e
             )
             raise
 
@@ -78,18 +81,18 @@ class AuthService:
         try:
             payload = self.jwt_manager.verify_refresh_token(refresh_token)
             if not payload:
-                logger.warning(f"Невалидный refresh token")
+                logger.warning("Невалидный refresh token")
                 return None
 
             if not await RefreshTokenCRUD.valid_token(db=db, token=refresh_token):
-                logger.warning(f"Токен не найден или отозван")
+                logger.warning("Токен не найден или отозван")
                 return None
 
             user_id = int(payload.get("sub"))
 
             user = await UserCRUD.get_by_id(db, user_id)
             if not user:
-                logger.warning(f"Пользователь с ID {user_id} не найден")
+                logger.warning("Пользователь с ID %s не найден", user_id)
                 return None
 
             await RefreshTokenCRUD.revoke_token(db=db, token=refresh_token)
@@ -114,7 +117,7 @@ class AuthService:
                 db=db, token_data=new_refresh_token_data
             )
 
-            logger.info(f"Токены обновлены для пользователя {user.username}")
+            logger.info("Токены обновлены для пользователя %s", user.username)
 
             return {
                 "access_token": new_access_token,
@@ -122,7 +125,7 @@ class AuthService:
                 "token_type": "bearer",
             }
         except Exception as e:
-            logger.error(f"Произошла ошибка обновления токенов:{e}")
+            logger.error("Произошла ошибка обновления токенов:%s", e)
             raise
 
     async def logout(
@@ -138,7 +141,7 @@ class AuthService:
             if refresh_token:
                 success = await RefreshTokenCRUD.revoke_token(db, token=refresh_token)
                 if success:
-                    logger.info(f"Пользователь вышел с устройства: {refresh_token}")
+                    logger.info("Пользователь вышел с устройства: %s", refresh_token)
                     return success
                 return False
 
@@ -149,16 +152,16 @@ class AuthService:
                 )
 
                 if success:
-                    logger.info(f"Все токены пользователя:{user_id} отозваны")
+                    logger.info("Все токены пользователя:%s отозваны", user_id)
                     return success
                 return False
 
             else:
-                logger.error(f"Для выхода надо указать refresh_token или user_id")
+                logger.error("Для выхода надо указать refresh_token или user_id")
                 return False
 
         except Exception as e:
-            logger.error(f"Произошла ошибка выхода:{e}")
+            logger.error("Произошла ошибка выхода:%s", e)
             raise
 
     async def valid_access_token(
@@ -179,7 +182,7 @@ class AuthService:
             return user
 
         except Exception as e:
-            logger.error(f"Произошла ошибка валидации токена:{e}")
+            logger.error("Произошла ошибка валидации токена:%s", e)
             return None
 
     async def register(self, db: AsyncSession, user_data: UserCreate) -> Optional[dict]:
@@ -199,5 +202,5 @@ class AuthService:
             return await self.login(db, login_data)
 
         except Exception as e:
-            logger.error(f"Ошибка регистрации пользователя: {e}")
+            logger.error("Ошибка регистрации пользователя: %s", e)
             raise
@@ -0,0 +1,133 @@
+import zlib
+from typing import AsyncIterator
+
+from sqlalchemy import select, func, cast, literal_column, Text
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+
+from app.core.config import settings
+from app.core.database import db_manager
+from app.core.logger_config import get_logger
+from app.models.film import Film
+from app.models.genre import Genre
+from app.models.actor import Actor
+from app.models.association_tables.film_actor import film_actor
+from app.models.association_tables.film_genre import film_genre
+
+
+logger = get_logger(__name__)
+
+
+def _json_object(**fields):
+    # Ключи литералами: asyncpg не может вывести тип параметра у json_build_object
+    args = []
+    for key, value in fields.items():
+        args.extend((literal_column(f"'{key}'"), value))
+    return func.json_build_object(*args)
+
+
+class CatalogExportService:
+    """
+    Выгрузка каталога в NDJSON: одна строка на фильм вместе с жанрами и актерами.
+    JSON собирает сам Postgres, читаем через server-side cursor пачками
+    по EXPORT_BATCH_SIZE, поэтому память не растет с размером каталога
+    """
+
+    def __init__(self, batch_size: int = settings.EXPORT_BATCH_SIZE):
+        self.batch_size = batch_size
+
+    @staticmethod
+    def _export_query(after_id: int):
+        genres = (
+            select(
+                func.coalesce(
+                    func.json_agg(aggregate_order_by(Genre.name, Genre.name)),
+                    literal_column("'[]'::json"),
+                )
+            )
+            .select_from(film_genre.join(Genre, Genre.id == film_genre.c.genre_id))
+            .where(film_genre.c.film_id == Film.id)
+            .scalar_subquery()
+        )
+
+        actors = (
+            select(
+                func.coalesce(
+                    func.json_agg(
+                        aggregate_order_by(
+                            _json_object(
+                                id=Actor.id,
+                                name=Actor.name,
+                                surname=Actor.surname,
+                                age=Actor.age,
+                            ),
+                            Actor.id,
+                        )
+                    ),
+                    literal_column("'[]'::json"),
+                )
+            )
+            .select_from(film_actor.join(Actor, Actor.id == film_actor.c.actor_id))
+            .where(film_actor.c.film_id == Film.id)
+            .scalar_subquery()
+        )
+
+        document = _json_object(
+            id=Film.id,
+            title=Film.title,
+            description=Film.description,
+            duration=Film.duration,
+            year=Film.year,
+            rating=Film.rating,
+            updated_at=Film.updated_at,
+            genres=genres,
+            actors=actors,
+        )
+
+        return (
+            select(Film.id, cast(document, Text).label("document"))
+            .where(Film.id > after_id)
+            .order_by(Film.id)
+        )
+
+    async def iter_ndjson(self, after_id: int = 0) -> AsyncIterator[bytes]:
+        exported = 0
+        last_id = after_id
+
+        # Своя сессия: генератор живет дольше обработчика запроса
+        async with db_manager.session_factory() as session:
+            try:
+                result = await session.stream(
+                    self._export_query(after_id).execution_options(
+                        yield_per=self.batch_size
+                    )
+                )
+
+                async for partition in result.partitions():
+                    yield "".join(row.document + "\n" for row in partition).encode(
+                        "utf-8"
+                    )
+                    exported += len(partition)
+                    last_id = partition[-1].id
+
+                logger.info(
+                    "Выгрузка каталога завершена: %s фильмов, последний ID: %s",
+                    exported,
+                    last_id,
+                )
+
+            except Exception as e:
+                logger.error(
+                    "Произошла ошибка выгрузки каталога после ID %s: %s", last_id, e
+                )
+                raise
+
+    async def iter_ndjson_gzip(self, after_id: int = 0) -> AsyncIterator[bytes]:
+        # wbits=31 дает gzip-заголовок, сжимаем по мере чтения пачек
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+
+        async for chunk in self.iter_ndjson(after_id=after_id):
+            compressed = compressor.compress(chunk)
+            if compressed:
+                yield compressed
+
+        yield compressor.flush()
@@ -0,0 +1,503 @@
+"""Потоковый импорт каталога от партнеров
+
+Строки читаются из источника по одной, копятся пачками по IMPORT_BATCH_SIZE,
+заливаются через COPY (asyncpg copy_records_to_table) во временную staging
+таблицу и одним INSERT ... SELECT ... ON CONFLICT переносятся в основную.
+Память не зависит от размера файла: в Python живет одна пачка, staging
+таблица очищается перед каждой пачкой.
+
+Фильмы и актеры приходят со своими id, жанры идентифицируются по name,
+связи film_genre приходят как (film_id, genre), film_actor как (film_id, actor_id).
+"""
+
+import argparse
+import asyncio
+import codecs
+import csv
+import io
+import json
+from pathlib import Path
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.core.config import settings, project_root
+from app.core.database import db_manager
+from app.core.logger_config import get_logger
+from app.schemas.catalog_import import CatalogEntity, ImportFormat
+from app.services.film_meta_cache import film_meta_cache
+
+
+logger = get_logger(__name__)
+
+
+def _required_int(value: Any) -> int:
+    if value is None or value == "":
+        raise ValueError("обязательное целое поле пустое")
+    return int(value)
+
+
+def _optional_int(value: Any) -> Optional[int]:
+    if value is None or value == "":
+        return None
+    return int(value)
+
+
+def _optional_float(value: Any) -> Optional[float]:
+    if value is None or value == "":
+        return None
+    return float(value)
+
+
+def _required_str(max_length: int) -> Callable[[Any], str]:
+    def convert(value: Any) -> str:
+        if value is None or not str(value).strip():
+            raise ValueError("обязательное строковое поле пустое")
+        value = str(value).strip()
+        if len(value) > max_length:
+            raise ValueError(f"строка длиннее {max_length} символов")
+        return value
+
+    return convert
+
+
+def _optional_str(max_length: int) -> Callable[[Any], Optional[str]]:
+    def convert(value: Any) -> Optional[str]:
+        if value is None or value == "":
+            return None
+        value = str(value)
+        if len(value) > max_length:
+            raise ValueError(f"строка длиннее {max_length} символов")
+        return value
+
+    return convert
+
+
+@dataclass(frozen=True)
+class _EntitySpec:
+    staging_table: str
+    fields: tuple[tuple[str, Callable[[Any], Any]], ...]
+    staging_ddl: str
+    merge_sql: str
+    sequence_table: Optional[str] = None
+
+    @property
+    def columns(self) -> tuple[str, ...]:
+        return ("seq",) + tuple(name for name, _ in self.fields)
+
+    def to_row(self, seq: int, record: dict) -> tuple:
+        return (seq,) + tuple(convert(record.get(name)) for name, convert in self.fields)
+
+
+_SPECS: dict[CatalogEntity, _EntitySpec] = {
+    CatalogEntity.films: _EntitySpec(
+        staging_table="import_films",
+        fields=(
+            ("id", _required_int),
+            ("title", _required_str(255)),
+            ("description", _optional_str(2000)),
+            ("duration", _required_int),
+            ("year", _required_int),
+            ("rating", _optional_float),
+        ),
+        staging_ddl="""
+            CREATE TEMP TABLE IF NOT EXISTS import_films (
+                seq bigint, id integer, title text, description text,
+                duration integer, year integer, rating double precision
+            )
+        """,
+        merge_sql="""
+            WITH merged AS (
+                INSERT INTO films (id, title, description, duration, year, rating)
+                SELECT DISTINCT ON (id) id, title, description, duration, year, rating
+                FROM import_films
+                ORDER BY id, seq DESC
+                ON CONFLICT (id) DO UPDATE SET
+                    title = EXCLUDED.title,
+                    description = EXCLUDED.description,
+                    duration = EXCLUDED.duration,
+                    year = EXCLUDED.year,
+                    rating = EXCLUDED.rating,
+                    updated_at = now()
+                WHERE (films.title, films.description, films.duration, films.year, films.rating)
+                    IS DISTINCT FROM
+                    (EXCLUDED.title, EXCLUDED.description, EXCLUDED.duration, EXCLUDED.year, EXCLUDED.rating)
+                RETURNING 1
+            )
+            SELECT count(*) FROM merged
+        """,
+        sequence_table="films",
+    ),
+    CatalogEntity.actors: _EntitySpec(
+        staging_table="import_actors",
+        fields=(
+            ("id", _required_int),
+            ("name", _required_str(50)),
+            ("surname", _required_str(50)),
+            ("age", _optional_int),
+        ),
+        staging_ddl="""
+            CREATE TEMP TABLE IF NOT EXISTS import_actors (
+                seq bigint, id integer, name text, surname text, age integer
+            )
+        """,
+        merge_sql="""
+            WITH merged AS (
+                INSERT INTO actors (id, name, surname, age)
+                SELECT DISTINCT ON (id) id, name, surname, age
+                FROM import_actors
+                ORDER BY id, seq DESC
+                ON CONFLICT (id) DO UPDATE SET
+                    name = EXCLUDED.name,
+                    surname = EXCLUDED.surname,
+                    age = EXCLUDED.age
+                WHERE (actors.name, actors.surname, actors.age)
+                    IS DISTINCT FROM (EXCLUDED.name, EXCLUDED.surname, EXCLUDED.age)
+                RETURNING id
+            ),
+            touched AS (
+                -- Имена актеров есть в film_cards.top_actors: новая версия фильмов
+                -- нужна для REFRESH film_cards, ETag и ключей кеша ответов
+                UPDATE films SET updated_at = now()
+                WHERE id IN (
+                    SELECT fa.film_id FROM film_actor fa
+                    WHERE fa.actor_id IN (SELECT id FROM merged)
+                )
+            )
+            SELECT count(*) FROM merged
+        """,
+        sequence_table="actors",
+    ),
+    CatalogEntity.genres: _EntitySpec(
+        staging_table="import_genres",
+        fields=(("name", _required_str(50)),),
+        staging_ddl="""
+            CREATE TEMP TABLE IF NOT EXISTS import_genres (seq bigint, name text)
+        """,
+        merge_sql="""
+            WITH merged AS (
+                INSERT INTO genres (name)
+                SELECT DISTINCT name FROM import_genres
+                ON CONFLICT (name) DO NOTHING
+                RETURNING 1
+            )
+            SELECT count(*) FROM merged
+        """,
+    ),
+    CatalogEntity.film_genre: _EntitySpec(
+        staging_table="import_film_genre",
+        fields=(("film_id", _required_int), ("genre", _required_str(50))),
+        staging_ddl="""
+            CREATE TEMP TABLE IF NOT EXISTS import_film_genre (
+                seq bigint, film_id integer, genre text
+            )
+        """,
+        merge_sql="""
+            WITH merged AS (
+                INSERT INTO film_genre (film_id, genre_id)
+                SELECT DISTINCT s.film_id, g.id
+                FROM import_film_genre s
+                JOIN films f ON f.id = s.film_id
+                JOIN genres g ON g.name = s.genre
+                ON CONFLICT DO NOTHING
+                RETURNING film_id
+            ),
+            touched AS (
+                UPDATE films SET updated_at = now()
+                WHERE id IN (SELECT film_id FROM merged)
+            )
+            SELECT count(*) FROM merged
+        """,
+    ),
+    CatalogEntity.film_actor: _EntitySpec(
+        staging_table="import_film_actor",
+        fields=(("film_id", _required_int), ("actor_id", _required_int)),
+        staging_ddl="""
+            CREATE TEMP TABLE IF NOT EXISTS import_film_actor (
+                seq bigint, film_id integer, actor_id integer
+            )
+        """,
+        merge_sql="""
+            WITH merged AS (
+                INSERT INTO film_actor (film_id, actor_id)
+                SELECT DISTINCT s.film_id, s.actor_id
+                FROM import_film_actor s
+                JOIN films f ON f.id = s.film_id
+                JOIN actors a ON a.id = s.actor_id
+                ON CONFLICT DO NOTHING
+                RETURNING film_id
+            ),
+            touched AS (
+                UPDATE films SET updated_at = now()
+                WHERE id IN (SELECT film_id FROM merged)
+            )
+            SELECT count(*) FROM merged
+        """,
+    ),
+}
+
+
+@dataclass
+class ImportProgress:
+    entity: CatalogEntity
+    rows_read: int = 0
+    rows_invalid: int = 0
+    rows_written: int = 0
+    batches: int = 0
+
+
+async def iter_file_chunks(
+    path: str, chunk_size: int = 1 << 20
+) -> AsyncIterator[bytes]:
+    with open(path, "rb") as file:
+        while chunk := await asyncio.to_thread(file.read, chunk_size):
+            yield chunk
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    # Байты могут резаться посреди utf-8 символа, поэтому инкрементальный декодер
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    tail = ""
+
+    async for chunk in chunks:
+        tail += decoder.decode(chunk)
+        lines = tail.split("\n")
+        tail = lines.pop()
+        for line in lines:
+            yield line.rstrip("\r")
+
+    tail += decoder.decode(b"", final=True)
+    if tail:
+        yield tail.rstrip("\r")
+
+
+async def iter_csv_rows(
+    lines: AsyncIterator[str],
+) -> AsyncIterator[Optional[list[str]]]:
+    # Поле в кавычках может содержать перевод строки (описание фильма): физические
+    # строки копятся, пока кавычки не закроются, и запись целиком идет в csv.reader.
+    # Экранированная кавычка "" не меняет четность. None - запись не разобралась
+    pending: list[str] = []
+    quotes = 0
+
+    async for line in lines:
+        if not pending and not line.strip():
+            continue
+        pending.append(line)
+        quotes += line.count('"')
+        if quotes % 2:
+            continue
+
+        record = "\n".join(pending)
+        pending, quotes = [], 0
+        try:
+            yield next(csv.reader(io.StringIO(record, newline="")))
+        except csv.Error:
+            yield None
+
+    if pending:
+        raise ValueError("файл кончился внутри незакрытых кавычек")
+
+
+async def iter_records(
+    lines: AsyncIterator[str], fmt: ImportFormat
+) -> AsyncIterator[Optional[dict]]:
+    # None означает строку, которую не удалось разобрать
+    if fmt == ImportFormat.jsonl:
+        async for line in lines:
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                record = None
+            yield record if isinstance(record, dict) else None
+        return
+
+    header: Optional[list[str]] = None
+    number = 0
+    async for values in iter_csv_rows(lines):
+        if header is None:
+            if values is None:
+                raise ValueError("Не удалось разобрать заголовок CSV")
+            header = [name.strip() for name in values]
+            continue
+
+        number += 1
+        if values is None:
+            yield None
+            continue
+        if len(values) != len(header):
+            # Обычно это лишняя кавычка: склейка строк съела следующие записи,
+            # дальше разбор идет вразнобой, поэтому импорт останавливается
+            raise ValueError(
+                f"запись CSV {number}: полей {len(values)}, в заголовке {len(header)}"
+            )
+
+        yield dict(zip(header, values))
+
+
+class CatalogImportService:
+    def __init__(self, batch_size: int = settings.IMPORT_BATCH_SIZE):
+        self.batch_size = batch_size
+
+    async def import_stream(
+        self,
+        conn: AsyncConnection,
+        entity: CatalogEntity,
+        chunks: AsyncIterator[bytes],
+        fmt: ImportFormat,
+        on_progress: Optional[Callable[[ImportProgress], None]] = None,
+    ) -> ImportProgress:
+
+        records = iter_records(iter_lines(chunks), fmt)
+        return await self.import_records(conn, entity, records, on_progress)
+
+    async def import_records(
+        self,
+        conn: AsyncConnection,
+        entity: CatalogEntity,
+        records: AsyncIterator[Optional[dict]],
+        on_progress: Optional[Callable[[ImportProgress], None]] = None,
+    ) -> ImportProgress:
+        """
+        Импорт на выделенном соединении: временная таблица живет в рамках
+        соединения, а AsyncSession может сменить его после commit
+        """
+        spec = _SPECS[entity]
+        progress = ImportProgress(entity=entity)
+
+        try:
+            raw_connection = await conn.get_raw_connection()
+            driver = raw_connection.driver_connection
+
+            await conn.execute(text(spec.staging_ddl))
+            await conn.commit()
+
+            batch: list[tuple] = []
+            async for record in records:
+                progress.rows_read += 1
+                try:
+                    batch.append(spec.to_row(progress.rows_read, record))
+                except (AttributeError, TypeError, ValueError) as e:
+                    progress.rows_invalid += 1
+                    logger.debug(
+                        "Импорт %s: строка %s пропущена: %s",
+                        entity.value,
+                        progress.rows_read,
+                        e,
+                    )
+
+                if len(batch) >= self.batch_size:
+                    await self._flush_batch(conn, driver, spec, batch, progress)
+                    batch.clear()
+                    self._report(progress, on_progress)
+
+            if batch:
+                await self._flush_batch(conn, driver, spec, batch, progress)
+                self._report(progress, on_progress)
+
+            if spec.sequence_table:
+                # id пришли от партнера, сдвигаем sequence за максимальный
+                await conn.execute(
+                    text(
+                        f"SELECT setval(pg_get_serial_sequence('{spec.sequence_table}', 'id'), "
+                        f"GREATEST((SELECT MAX(id) FROM {spec.sequence_table}), 1))"
+                    )
+                )
+
+            await conn.execute(text(f"DROP TABLE IF EXISTS {spec.staging_table}"))
+            await conn.commit()
+
+            if entity in (CatalogEntity.films, CatalogEntity.film_genre):
+                await self._invalidate_film_meta()
+
+            logger.info(
+                "Импорт %s завершен: прочитано %s, пропущено %s, записано %s",
+                entity.value,
+                progress.rows_read,
+                progress.rows_invalid,
+                progress.rows_written,
+            )
+            return progress
+
+        except Exception as e:
+            logger.error("Произошла ошибка импорта %s: %s", entity.value, e)
+            await conn.rollback()
+            raise
+
+    @staticmethod
+    async def _invalidate_film_meta() -> None:
+        # Длительности и жанры могли поменяться, кеш заполнится заново по промахам
+        try:
+            await film_meta_cache.clear()
+        except Exception as e:
+            logger.warning("Не удалось сбросить кеш метаданных фильмов: %s", e)
+
+    @staticmethod
+    async def _flush_batch(
+        conn: AsyncConnection,
+        driver: Any,
+        spec: _EntitySpec,
+        batch: list[tuple],
+        progress: ImportProgress,
+    ) -> None:
+        # TRUNCATE через SQLAlchemy открывает транзакцию, COPY и merge идут в ней же
+        await conn.execute(text(f"TRUNCATE {spec.staging_table}"))
+        await driver.copy_records_to_table(
+            spec.staging_table, records=batch, columns=spec.columns
+        )
+        result = await conn.execute(text(spec.merge_sql))
+        progress.rows_written += result.scalar_one()
+        await conn.commit()
+        progress.batches += 1
+
+    @staticmethod
+    def _report(
+        progress: ImportProgress,
+        on_progress: Optional[Callable[[ImportProgress], None]],
+    ) -> None:
+        logger.info(
+            "Импорт %s: пачка %s, прочитано %s, записано %s",
+            progress.entity.value,
+            progress.batches,
+            progress.rows_read,
+            progress.rows_written,
+        )
+        if on_progress:
+            on_progress(progress)
+
+
+async def _run_import(entity: CatalogEntity, path: str, fmt: ImportFormat) -> None:
+    # config делает chdir в app/core, относительные пути считаем от корня проекта
+    if not Path(path).is_absolute():
+        path = str(project_root / path)
+
+    db_manager.init_db(db_url=settings.DATABASE_URL)
+    try:
+        async with db_manager.engine.connect() as conn:
+            await CatalogImportService().import_stream(
+                conn, entity, iter_file_chunks(path), fmt
+            )
+    finally:
+        await db_manager.close()
+
+
+# python -m app.services.catalog_import_service films ./films.jsonl --format jsonl
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Импорт каталога из CSV/JSONL")
+    parser.add_argument("entity", choices=[entity.value for entity in CatalogEntity])
+    parser.add_argument("path")
+    parser.add_argument(
+        "--format",
+        choices=[fmt.value for fmt in ImportFormat],
+        default=ImportFormat.jsonl.value,
+    )
+    args = parser.parse_args()
+
+    asyncio.run(
+        _run_import(CatalogEntity(args.entity), args.path, ImportFormat(args.format))
+    )
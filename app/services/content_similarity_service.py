@@ -0,0 +1,436 @@
+"""Похожие фильмы по жанрам и актерам
+
+Нужны для новых фильмов, по которым еще нет взаимодействий. Близость -
+взвешенная сумма Жаккара по жанрам и по актерам (CONTENT_GENRE_WEIGHT,
+CONTENT_ACTOR_WEIGHT), пересечения считаются произведением разреженных
+бинарных матриц фильмы x признаки блоками строк. Жанров несколько десятков,
+строка по жанрам заполнена почти на весь каталог, поэтому размер блока
+ограничен и по строкам (CONTENT_BLOCK_SIZE), и по оценке числа ненулевых
+(CONTENT_BLOCK_MAX_NNZ). Top-k хранится в film_similar с source = content, страница фильма читает
+готовый список.
+
+Инкрементально: импорт жанров и актеров фильма двигает films.updated_at,
+поэтому измененные фильмы - те, что новее водяного знака минус
+CONTENT_LATENESS_MIN. Водяной знак - время начала прошлого пересчета по
+часам БД, а запас нужен для импорта, который закоммитился позже: его
+updated_at - время начала транзакции импорта.
+
+Полностью пересчитываются только строки измененных фильмов. Близость
+симметрична, поэтому их новые оценки - это и столбцы для остальных
+фильмов: в сохраненный top-k фильма измененные вливаются заново (старые
+записи о них убираются). Оценки ниже k-го места сохраненного списка
+отбрасываются сразу. Если измененный выпал из заполненного списка и k-е
+место стало ниже прежнего, за ним мог оказаться фильм вне списка - такая
+строка пересчитывается целиком. Если изменилось больше
+CONTENT_FULL_REBUILD_RATIO каталога, пересчитывается все.
+
+Удаление связей film_genre / film_actor и фильмов не двигает updated_at,
+поэтому раз в CONTENT_FULL_REBUILD_HOURS пересчет идет полностью.
+"""
+
+import asyncio
+import itertools
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+from scipy import sparse
+from sqlalchemy import select, func, delete, text, bindparam, any_, Integer
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import db_manager
+from app.core.logger_config import get_logger
+from app.models.analytics import AnalyticsWatermark
+from app.models.association_tables.film_actor import film_actor
+from app.models.association_tables.film_genre import film_genre
+from app.models.film import Film
+from app.models.recommendation import FilmSimilar, SOURCE_CONTENT
+from app.services import recommendation_arrays
+
+
+logger = get_logger(__name__)
+
+
+CONTENT_WATERMARK = "film_content_similar"
+CONTENT_FULL_WATERMARK = "film_content_similar_full"
+INSERT_BATCH_SIZE = 1_000
+
+# Ключ advisory lock, чтобы пересчет не шел из нескольких воркеров сразу
+CONTENT_SIMILAR_LOCK = 703304
+
+
+def _pairs(rows) -> np.ndarray:
+    return np.fromiter(
+        itertools.chain.from_iterable(rows), dtype=np.int64, count=len(rows) * 2
+    ).reshape(-1, 2)
+
+
+class ContentSimilarityService:
+
+    async def refresh(self, full: bool = False) -> int:
+        """
+        Возвращает число пересчитанных фильмов
+        """
+        started = time.perf_counter()
+
+        async with db_manager.session_factory() as session:
+            try:
+                locked = await session.execute(
+                    text("SELECT pg_try_advisory_xact_lock(:key)"),
+                    {"key": CONTENT_SIMILAR_LOCK},
+                )
+                if not locked.scalar_one():
+                    logger.debug("Похожие фильмы пересчитывает другой воркер")
+                    return 0
+
+                watermark = await session.get(AnalyticsWatermark, CONTENT_WATERMARK)
+                full_watermark = await session.get(AnalyticsWatermark, CONTENT_FULL_WATERMARK)
+                # now() - начало транзакции, до чтения фильмов
+                max_film_id, run_started = (
+                    await session.execute(select(func.max(Film.id), func.now()))
+                ).one()
+                if max_film_id is None:
+                    return 0
+
+                if full_watermark is None or (
+                    run_started - full_watermark.processed_until
+                    >= timedelta(hours=settings.CONTENT_FULL_REBUILD_HOURS)
+                ):
+                    full = True
+
+                dirty = None
+                if watermark is not None and not full:
+                    since = watermark.processed_until - timedelta(
+                        minutes=settings.CONTENT_LATENESS_MIN
+                    )
+                    dirty = await self._changed_films(session, since)
+                    # Фильм мог появиться после чтения max(id)
+                    dirty = dirty[dirty <= max_film_id]
+                    if len(dirty) == 0:
+                        await self._set_watermark(session, CONTENT_WATERMARK, run_started)
+                        await session.commit()
+                        return 0
+                    if len(dirty) > settings.CONTENT_FULL_REBUILD_RATIO * (max_film_id + 1):
+                        dirty = None
+
+                genres, actors = await self._load_features(session, max_film_id + 1)
+                if dirty is None:
+                    affected = np.arange(max_film_id + 1)
+                    lists = await asyncio.to_thread(
+                        self._similarity_lists, genres, actors, affected
+                    )
+                else:
+                    lists, affected = await self._incremental(
+                        session, dirty, genres, actors
+                    )
+
+                await self._save(session, lists, affected, full=dirty is None)
+
+                await self._set_watermark(session, CONTENT_WATERMARK, run_started)
+                if dirty is None:
+                    await self._set_watermark(session, CONTENT_FULL_WATERMARK, run_started)
+                await session.commit()
+
+                logger.info(
+                    "Похожие фильмы по жанрам и актерам пересчитаны (%s): %s фильмов за %.1f сек",
+                    'полностью' if dirty is None else f'изменено {len(dirty)}',
+                    len(affected),
+                    time.perf_counter() - started,
+                )
+                return len(affected)
+
+            except Exception as e:
+                logger.error("Произошла ошибка пересчета похожих фильмов: %s", e)
+                await session.rollback()
+                raise
+
+    @staticmethod
+    async def _set_watermark(session: AsyncSession, name: str, value: datetime) -> None:
+        await session.execute(
+            insert(AnalyticsWatermark)
+            .values(name=name, processed_until=value)
+            .on_conflict_do_update(
+                index_elements=[AnalyticsWatermark.name],
+                set_={"processed_until": value},
+            )
+        )
+
+    @staticmethod
+    async def _changed_films(session: AsyncSession, since: datetime) -> np.ndarray:
+        result = await session.execute(select(Film.id).where(Film.updated_at > since))
+        return np.array(result.scalars().all(), dtype=np.int64)
+
+    @staticmethod
+    async def _load_features(
+        session: AsyncSession, films_shape: int
+    ) -> tuple[sparse.csr_matrix, sparse.csr_matrix]:
+        matrices = []
+        for table, column in ((film_genre, "genre_id"), (film_actor, "actor_id")):
+            result = await session.execute(select(table.c.film_id, table.c[column]))
+            pairs = _pairs(result.all())
+            features_shape = int(pairs[:, 1].max()) + 1 if len(pairs) else 1
+            matrices.append(
+                recommendation_arrays.interactions_matrix(
+                    pairs[:, 0],
+                    pairs[:, 1],
+                    np.ones(len(pairs)),
+                    shape=(films_shape, features_shape),
+                )
+            )
+        return matrices[0], matrices[1]
+
+    async def _incremental(
+        self,
+        session: AsyncSession,
+        dirty: np.ndarray,
+        genres: sparse.csr_matrix,
+        actors: sparse.csr_matrix,
+    ) -> tuple[list[tuple[int, list[int], list[float]]], np.ndarray]:
+        """
+        Списки для записи и id фильмов, чьи строки перезаписываются
+        """
+        k = settings.RECOMMENDATIONS_NEIGHBORS
+        thresholds = await self._thresholds(session, genres.shape[0], k)
+        dirty_top, columns = await asyncio.to_thread(
+            self._dirty_scores, genres, actors, dirty, thresholds
+        )
+
+        # Фильмы, у которых измененный уже в списке, даже если общих признаков не осталось
+        result = await session.execute(
+            select(FilmSimilar.film_id).where(
+                FilmSimilar.source == SOURCE_CONTENT,
+                FilmSimilar.neighbor_ids.overlap(dirty.tolist()),
+            )
+        )
+        listed = np.array(result.scalars().all(), dtype=np.int64)
+
+        candidates = np.setdiff1d(np.union1d(columns[0], listed), dirty)
+        stored = await self._stored_lists(session, candidates)
+        merged, recompute = self._merge(candidates, stored, dirty, columns, k)
+        recomputed = await asyncio.to_thread(
+            self._similarity_lists, genres, actors, recompute
+        )
+
+        logger.debug(
+            "Похожие фильмы: %s измененных, %s списков дополнено, %s пересчитано",
+            len(dirty),
+            len(merged),
+            len(recompute),
+        )
+        lists = (
+            recommendation_arrays.rows_to_lists(dirty_top, row_ids=dirty)
+            + merged
+            + recomputed
+        )
+        return lists, np.concatenate([dirty, candidates])
+
+    @staticmethod
+    async def _thresholds(session: AsyncSession, films_shape: int, k: int) -> np.ndarray:
+        # k-я оценка заполненных списков, 0 - в список попадет любая ненулевая
+        result = await session.execute(
+            select(FilmSimilar.film_id, FilmSimilar.scores[k]).where(
+                FilmSimilar.source == SOURCE_CONTENT,
+                func.cardinality(FilmSimilar.scores) >= k,
+                FilmSimilar.film_id < films_shape,
+            )
+        )
+        rows = result.all()
+        thresholds = np.zeros(films_shape, dtype=np.float32)
+        if rows:
+            film_ids, scores = zip(*rows)
+            thresholds[list(film_ids)] = scores
+        return thresholds
+
+    @staticmethod
+    async def _stored_lists(
+        session: AsyncSession, film_ids: np.ndarray
+    ) -> dict[int, tuple[list[int], list[float]]]:
+        result = await session.execute(
+            select(
+                FilmSimilar.film_id, FilmSimilar.neighbor_ids, FilmSimilar.scores
+            ).where(
+                FilmSimilar.source == SOURCE_CONTENT,
+                FilmSimilar.film_id
+                == any_(bindparam("film_ids", film_ids.tolist(), type_=ARRAY(Integer))),
+            )
+        )
+        return {film_id: (ids, scores) for film_id, ids, scores in result.all()}
+
+    def _dirty_scores(
+        self,
+        genres: sparse.csr_matrix,
+        actors: sparse.csr_matrix,
+        dirty: np.ndarray,
+        thresholds: np.ndarray,
+    ) -> tuple[sparse.csr_matrix, tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """
+        Top-k измененных фильмов и их оценки как столбцы для остальных:
+        (фильм, измененный сосед, оценка), только не ниже k-го места фильма
+        """
+        is_dirty = np.zeros(genres.shape[0], dtype=bool)
+        is_dirty[dirty] = True
+
+        tops, parts = [], []
+        for block in self._blocks(genres, actors, dirty):
+            similarity = self._block_similarity(genres, actors, block)
+            tops.append(
+                recommendation_arrays.top_k_per_row(
+                    similarity, settings.RECOMMENDATIONS_NEIGHBORS
+                )
+            )
+            pairs = similarity.tocoo()
+            keep = (pairs.data >= thresholds[pairs.col]) & ~is_dirty[pairs.col]
+            parts.append((pairs.col[keep], block[pairs.row[keep]], pairs.data[keep]))
+
+        columns = tuple(
+            np.concatenate([part[i] for part in parts]) for i in range(3)
+        )
+        return sparse.vstack(tops, format="csr"), columns
+
+    @staticmethod
+    def _merge(
+        candidates: np.ndarray,
+        stored: dict[int, tuple[list[int], list[float]]],
+        dirty: np.ndarray,
+        columns: tuple[np.ndarray, np.ndarray, np.ndarray],
+        k: int,
+    ) -> tuple[list[tuple[int, list[int], list[float]]], np.ndarray]:
+        """
+        Сохраненные списки кандидатов с новыми оценками измененных.
+        Возвращает (списки, фильмы для полного пересчета)
+        """
+        dirty_ids = set(dirty.tolist())
+        film_ids, neighbor_ids, scores = columns
+        order = np.argsort(film_ids, kind="stable")
+        film_ids, neighbor_ids, scores = film_ids[order], neighbor_ids[order], scores[order]
+        bounds = np.searchsorted(film_ids, candidates, side="left"), np.searchsorted(
+            film_ids, candidates, side="right"
+        )
+
+        merged, recompute = [], []
+        for film_id, start, stop in zip(candidates.tolist(), *bounds):
+            old_ids, old_scores = stored.get(film_id, ([], []))
+            entries = [
+                (score, neighbor)
+                for neighbor, score in zip(old_ids, old_scores)
+                if neighbor not in dirty_ids
+            ]
+            entries += zip(
+                (round(float(score), 6) for score in scores[start:stop]),
+                neighbor_ids[start:stop].tolist(),
+            )
+            entries.sort(key=lambda entry: -entry[0])
+            entries = entries[:k]
+
+            # Список был заполнен, а k-е место опустилось: за ним мог быть фильм вне списка
+            if len(old_ids) >= k and (len(entries) < k or entries[-1][0] < old_scores[k - 1]):
+                recompute.append(film_id)
+            elif entries:
+                merged.append(
+                    (film_id, [neighbor for _, neighbor in entries], [s for s, _ in entries])
+                )
+
+        return merged, np.array(recompute, dtype=np.int64)
+
+    @staticmethod
+    def _blocks(
+        genres: sparse.csr_matrix, actors: sparse.csr_matrix, rows: np.ndarray
+    ):
+        """
+        Блоки строк не больше CONTENT_BLOCK_SIZE и с оценкой ненулевых
+        произведения не больше CONTENT_BLOCK_MAX_NNZ. Оценка сверху для строки -
+        сумма частот ее признаков, но не больше числа фильмов
+        """
+        films_shape = genres.shape[0]
+        estimate = np.zeros(len(rows), dtype=np.int64)
+        for features in (genres, actors):
+            frequencies = np.diff(features.tocsc().indptr)
+            estimate += (features[rows] @ frequencies).astype(np.int64)
+        cumulative = np.cumsum(np.minimum(estimate, films_shape))
+
+        start = 0
+        while start < len(rows):
+            base = cumulative[start - 1] if start else 0
+            stop = int(
+                np.searchsorted(
+                    cumulative, base + settings.CONTENT_BLOCK_MAX_NNZ, side="right"
+                )
+            )
+            stop = min(max(stop, start + 1), start + settings.CONTENT_BLOCK_SIZE)
+            yield rows[start:stop]
+            start = stop
+
+    @staticmethod
+    def _block_similarity(
+        genres: sparse.csr_matrix, actors: sparse.csr_matrix, block: np.ndarray
+    ) -> sparse.csr_matrix:
+        genre_weight = settings.CONTENT_GENRE_WEIGHT
+        actor_weight = settings.CONTENT_ACTOR_WEIGHT
+        similarity = (
+            genre_weight * recommendation_arrays.jaccard_rows(genres, block)
+            + actor_weight * recommendation_arrays.jaccard_rows(actors, block)
+        ) / (genre_weight + actor_weight)
+        return similarity.tocsr()
+
+    def _similarity_lists(
+        self, genres: sparse.csr_matrix, actors: sparse.csr_matrix, rows: np.ndarray
+    ) -> list[tuple[int, list[int], list[float]]]:
+        lists = []
+        for block in self._blocks(genres, actors, rows):
+            top = recommendation_arrays.top_k_per_row(
+                self._block_similarity(genres, actors, block),
+                settings.RECOMMENDATIONS_NEIGHBORS,
+            )
+            lists += recommendation_arrays.rows_to_lists(top, row_ids=block)
+        return lists
+
+    @staticmethod
+    async def _save(
+        session: AsyncSession,
+        lists: list[tuple[int, list[int], list[float]]],
+        rows: np.ndarray,
+        full: bool,
+    ) -> None:
+        values = [
+            {
+                "film_id": film_id,
+                "source": SOURCE_CONTENT,
+                "neighbor_ids": ids,
+                "scores": scores,
+            }
+            for film_id, ids, scores in lists
+        ]
+
+        # Фильмы без соседей и удаленные из каталога теряют свой список
+        statement = delete(FilmSimilar).where(FilmSimilar.source == SOURCE_CONTENT)
+        if not full:
+            # Один параметр-массив вместо IN на десятки тысяч параметров
+            statement = statement.where(
+                FilmSimilar.film_id
+                == any_(bindparam("film_ids", rows.tolist(), type_=ARRAY(Integer)))
+            )
+        await session.execute(statement)
+        for start in range(0, len(values), INSERT_BATCH_SIZE):
+            await session.execute(
+                insert(FilmSimilar).values(values[start : start + INSERT_BATCH_SIZE])
+            )
+
+
+content_similarity_service = ContentSimilarityService()
+
+
+async def _run_refresh() -> None:
+    db_manager.init_db(db_url=settings.DATABASE_URL)
+    try:
+        await content_similarity_service.refresh(full=True)
+    finally:
+        await db_manager.close()
+
+
+# python -m app.services.content_similarity_service
+
+if __name__ == "__main__":
+    asyncio.run(_run_refresh())
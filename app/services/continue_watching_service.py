@@ -0,0 +1,204 @@
+"""Лента "Продолжить просмотр"
+
+На пользователя два ключа: sorted set фильмов со score = время последнего
+просмотра и хеш film_id -> позиция в секундах. Обновляются на каждый
+heartbeat, set обрезается до CONTINUE_WATCHING_SIZE, досмотренные фильмы
+удаляются. Чтение - один round-trip за лентой и один за длительностями,
+Postgres нужен только для восстановления ленты после потери ключей.
+"""
+
+from datetime import datetime, timedelta, UTC
+
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.core.database import db_manager, redis_manager
+from app.core.logger_config import get_logger
+from app.models.watch_history import WatchHistory
+from app.services.film_meta_cache import film_meta_cache
+
+
+logger = get_logger(__name__)
+
+
+# KEYS: feed, progress, built. ARGV: film_id, score, position, cap, ttl, finished
+RECORD_SCRIPT = """
+if ARGV[6] == '1' then
+    redis.call('ZREM', KEYS[1], ARGV[1])
+    redis.call('HDEL', KEYS[2], ARGV[1])
+else
+    redis.call('ZADD', KEYS[1], ARGV[2], ARGV[1])
+    redis.call('HSET', KEYS[2], ARGV[1], ARGV[3])
+    local extra = redis.call('ZCARD', KEYS[1]) - tonumber(ARGV[4])
+    if extra > 0 then
+        local trimmed = redis.call('ZRANGE', KEYS[1], 0, extra - 1)
+        redis.call('ZREMRANGEBYRANK', KEYS[1], 0, extra - 1)
+        redis.call('HDEL', KEYS[2], unpack(trimmed))
+    end
+end
+redis.call('EXPIRE', KEYS[1], ARGV[5])
+redis.call('EXPIRE', KEYS[2], ARGV[5])
+-- Метка восстановления живет столько же, сколько лента: иначе лента
+-- истечет раньше метки и get_feed не восстановит ее из watch_history.
+-- Без метки EXPIRE ничего не делает, ленту восстановит get_feed
+redis.call('EXPIRE', KEYS[3], ARGV[5])
+return 1
+"""
+
+
+def _feed_key(user_id: int) -> str:
+    return f"user:{user_id}:continue"
+
+
+def _progress_key(user_id: int) -> str:
+    return f"user:{user_id}:continue:progress"
+
+
+def _built_key(user_id: int) -> str:
+    return f"user:{user_id}:continue:built"
+
+
+def _is_finished(position: int, duration: int) -> bool:
+    return duration > 0 and position >= duration * settings.CONTINUE_WATCHING_DONE_RATIO
+
+
+class ContinueWatchingService:
+    @property
+    def _ttl(self) -> int:
+        return settings.CONTINUE_WATCHING_TTL_DAYS * 24 * 60 * 60
+
+    async def record(
+        self, user_id: int, film_id: int, watch_duration: int, watched_at: float
+    ) -> None:
+        durations = await film_meta_cache.get_durations([film_id])
+        finished = _is_finished(watch_duration, durations.get(film_id, 0))
+
+        async with redis_manager.get_client() as client:
+            await client.eval(
+                RECORD_SCRIPT,
+                3,
+                _feed_key(user_id),
+                _progress_key(user_id),
+                _built_key(user_id),
+                film_id,
+                watched_at,
+                watch_duration,
+                settings.CONTINUE_WATCHING_SIZE,
+                self._ttl,
+                1 if finished else 0,
+            )
+
+    async def get_feed(self, user_id: int) -> list[dict]:
+        async with redis_manager.get_client() as client:
+            built = await client.exists(_built_key(user_id))
+
+        if not built:
+            await self.rebuild(user_id)
+
+        async with redis_manager.get_client() as client:
+            pipe = client.pipeline(transaction=False)
+            pipe.zrevrange(
+                _feed_key(user_id),
+                0,
+                settings.CONTINUE_WATCHING_SIZE - 1,
+                withscores=True,
+            )
+            pipe.hgetall(_progress_key(user_id))
+            entries, positions = await pipe.execute()
+
+        return await self._to_items(entries, positions)
+
+    @staticmethod
+    async def _to_items(entries: list, positions: dict) -> list[dict]:
+        film_ids = [int(member) for member, _ in entries]
+        durations = await film_meta_cache.get_durations(film_ids)
+
+        items = []
+        for (member, score), film_id in zip(entries, film_ids):
+            position = int(positions.get(member, 0))
+            duration = durations.get(film_id)
+            if duration is None:
+                # Фильм удален из каталога
+                continue
+
+            items.append(
+                {
+                    "film_id": film_id,
+                    "watched_at": datetime.fromtimestamp(score, tz=UTC),
+                    "watch_duration": position,
+                    "duration": duration,
+                    "progress_percent": (
+                        round(min(position / duration, 1.0) * 100, 1) if duration else 0.0
+                    ),
+                }
+            )
+        return items
+
+    async def rebuild(self, user_id: int) -> None:
+        """
+        Восстановление из watch_history: последний сеанс по каждому фильму
+        за CONTINUE_WATCHING_REBUILD_DAYS. ZADD GT и HSETNX не затирают
+        более свежие данные, которые успели прийти через heartbeat
+        """
+        since = datetime.now(UTC) - timedelta(days=settings.CONTINUE_WATCHING_REBUILD_DAYS)
+
+        async with db_manager.session_factory() as session:
+            try:
+                result = await session.execute(
+                    select(
+                        WatchHistory.film_id,
+                        WatchHistory.watched_at,
+                        WatchHistory.watch_duration,
+                    )
+                    .where(
+                        WatchHistory.user_id == user_id,
+                        WatchHistory.watched_at >= since,
+                    )
+                    .distinct(WatchHistory.film_id)
+                    .order_by(WatchHistory.film_id, WatchHistory.watched_at.desc())
+                )
+                sessions = result.all()
+
+            except Exception as e:
+                logger.error(
+                    "Произошла ошибка восстановления ленты просмотра пользователя %s: %s",
+                    user_id,
+                    e,
+                )
+                raise
+
+        durations = await film_meta_cache.get_durations([row.film_id for row in sessions])
+        unfinished = [
+            row
+            for row in sessions
+            if row.film_id in durations
+            and not _is_finished(row.watch_duration, durations[row.film_id])
+        ]
+        unfinished.sort(key=lambda row: row.watched_at, reverse=True)
+        unfinished = unfinished[: settings.CONTINUE_WATCHING_SIZE]
+
+        async with redis_manager.get_client() as client:
+            pipe = client.pipeline(transaction=True)
+            for row in unfinished:
+                pipe.zadd(
+                    _feed_key(user_id),
+                    {row.film_id: row.watched_at.timestamp()},
+                    gt=True,
+                )
+                pipe.hsetnx(_progress_key(user_id), row.film_id, row.watch_duration)
+            pipe.zremrangebyrank(
+                _feed_key(user_id), 0, -(settings.CONTINUE_WATCHING_SIZE + 1)
+            )
+            pipe.expire(_feed_key(user_id), self._ttl)
+            pipe.expire(_progress_key(user_id), self._ttl)
+            pipe.set(_built_key(user_id), 1, ex=self._ttl)
+            await pipe.execute()
+
+        logger.debug(
+            "Лента просмотра пользователя %s восстановлена: %s фильмов",
+            user_id,
+            len(unfinished),
+        )
+
+
+continue_watching_service = ContinueWatchingService()
@@ -0,0 +1,56 @@
+from typing import Optional
+from datetime import datetime
+
+from sqlalchemy import text
+
+from app.core.database import db_manager
+from app.core.logger_config import get_logger
+from app.crud.film import FilmCRUD
+
+
+logger = get_logger(__name__)
+
+
+# Ключ advisory lock, чтобы несколько воркеров не обновляли view одновременно
+FILM_CARDS_REFRESH_LOCK = 702901
+
+
+class FilmCardService:
+    def __init__(self):
+        self._refreshed_version: Optional[tuple[int, Optional[datetime]]] = None
+
+    async def refresh(self, force: bool = False) -> bool:
+        """
+        REFRESH CONCURRENTLY не блокирует чтение film_cards.
+        Если каталог не менялся с прошлого обновления, view не трогаем
+        """
+        async with db_manager.session_factory() as session:
+            try:
+                version = await FilmCRUD.get_catalog_version(session)
+                if not force and version == self._refreshed_version:
+                    return False
+
+                locked = await session.execute(
+                    text("SELECT pg_try_advisory_xact_lock(:key)"),
+                    {"key": FILM_CARDS_REFRESH_LOCK},
+                )
+                if not locked.scalar_one():
+                    logger.debug("film_cards уже обновляется другим воркером")
+                    return False
+
+                await session.execute(
+                    text("REFRESH MATERIALIZED VIEW CONCURRENTLY film_cards")
+                )
+                await session.commit()
+
+                self._refreshed_version = version
+                logger.info("film_cards обновлен, фильмов: %s", version[0])
+                return True
+
+            except Exception as e:
+                logger.error("Произошла ошибка обновления film_cards: %s", e)
+                await session.rollback()
+                raise
+
+
+film_card_service = FilmCardService()
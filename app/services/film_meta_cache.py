@@ -0,0 +1,117 @@
+"""Кеш неизменных полей фильма в Redis для горячих путей
+
+Прогресс просмотра и ленты не должны ходить в Postgres за длительностью
+или жанрами фильма на каждый запрос: значения лежат в хешах Redis, промахи
+догружаются из БД одним запросом и сразу кладутся в хеш. Импорт каталога
+сбрасывает кеш целиком.
+"""
+
+from sqlalchemy import select
+
+from app.core.database import db_manager, redis_manager
+from app.core.logger_config import get_logger
+from app.core.metrics import record_cache
+from app.models.film import Film
+from app.models.association_tables.film_genre import film_genre
+
+
+logger = get_logger(__name__)
+
+
+DURATIONS_KEY = "film:meta:durations"
+# Значение - id жанров через запятую, пустая строка если жанров нет
+GENRES_KEY = "film:meta:genres"
+
+
+class FilmMetaCache:
+
+    async def get_durations(self, film_ids: list[int]) -> dict[int, int]:
+        if not film_ids:
+            return {}
+
+        async with redis_manager.get_client() as client:
+            cached = await client.hmget(DURATIONS_KEY, film_ids)
+
+        durations = {
+            film_id: int(value)
+            for film_id, value in zip(film_ids, cached)
+            if value is not None
+        }
+        missing = [film_id for film_id in film_ids if film_id not in durations]
+        record_cache("film_durations", hits=len(durations), misses=len(missing))
+
+        if missing:
+            loaded = await self._load_durations(missing)
+            if loaded:
+                async with redis_manager.get_client() as client:
+                    await client.hset(DURATIONS_KEY, mapping=loaded)
+            durations.update(loaded)
+
+        return durations
+
+    @staticmethod
+    async def _load_durations(film_ids: list[int]) -> dict[int, int]:
+        async with db_manager.session_factory() as session:
+            try:
+                result = await session.execute(
+                    select(Film.id, Film.duration).where(Film.id.in_(film_ids))
+                )
+                return {row.id: row.duration for row in result}
+
+            except Exception as e:
+                logger.error("Произошла ошибка загрузки длительности фильмов: %s", e)
+                raise
+
+    async def get_genre_ids(self, film_ids: list[int]) -> dict[int, list[int]]:
+        if not film_ids:
+            return {}
+
+        async with redis_manager.get_client() as client:
+            cached = await client.hmget(GENRES_KEY, film_ids)
+
+        genres = {
+            film_id: [int(genre_id) for genre_id in value.split(b",") if genre_id]
+            for film_id, value in zip(film_ids, cached)
+            if value is not None
+        }
+        missing = [film_id for film_id in film_ids if film_id not in genres]
+        record_cache("film_genres", hits=len(genres), misses=len(missing))
+
+        if missing:
+            loaded = await self._load_genre_ids(missing)
+            async with redis_manager.get_client() as client:
+                await client.hset(
+                    GENRES_KEY,
+                    mapping={
+                        film_id: ",".join(map(str, genre_ids))
+                        for film_id, genre_ids in loaded.items()
+                    },
+                )
+            genres.update(loaded)
+
+        return genres
+
+    @staticmethod
+    async def _load_genre_ids(film_ids: list[int]) -> dict[int, list[int]]:
+        async with db_manager.session_factory() as session:
+            try:
+                result = await session.execute(
+                    select(film_genre.c.film_id, film_genre.c.genre_id).where(
+                        film_genre.c.film_id.in_(film_ids)
+                    )
+                )
+                genres = {film_id: [] for film_id in film_ids}
+                for row in result:
+                    genres[row.film_id].append(row.genre_id)
+                return genres
+
+            except Exception as e:
+                logger.error("Произошла ошибка загрузки жанров фильмов: %s", e)
+                raise
+
+    async def clear(self) -> None:
+        async with redis_manager.get_client() as client:
+            await client.delete(DURATIONS_KEY, GENRES_KEY)
+
+
+film_meta_cache = FilmMetaCache()
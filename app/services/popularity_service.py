@@ -0,0 +1,226 @@
+"""Счетчики популярности фильмов
+
+На каждое событие (избранное, просмотр) делается HINCRBY в Redis,
+периодически накопленные дельты одной пачкой прибавляются к колонкам
+films.favorites_count / films.views_count. Сверка пересчитывает точные
+значения по favorites и watch_history.
+
+Перед сбросом хеш атомарно переименовывается в *:flushing и получает id
+сброса (*:flush_id), новые события пишутся уже в чистый хеш. id
+вставляется в counter_flushes в той же транзакции, что и дельты. Если
+процесс упал до удаления *:flushing, следующий сброс возьмет ту же пачку с
+тем же id: до коммита она применится, после коммита - будет пропущена.
+"""
+
+import uuid
+
+from sqlalchemy import text
+
+from app.core.database import db_manager, redis_manager
+from app.core.logger_config import get_logger
+
+
+logger = get_logger(__name__)
+
+
+COUNTER_COLUMNS = {
+    "film:counters:favorites": "favorites_count",
+    "film:counters:views": "views_count",
+}
+FLUSH_LOCK_KEY = "film:counters:flush_lock"
+FLUSH_LOCK_TTL = 120
+# Записи о сбросах нужны только до удаления *:flushing, старые чистим
+FLUSH_RETENTION = "1 day"
+
+# KEYS: counters, flushing, flush_id. ARGV: новый id сброса.
+# Возвращает id пачки или nil, если сбрасывать нечего
+TAKE_BATCH_SCRIPT = """
+if redis.call('EXISTS', KEYS[2]) == 0 then
+    if redis.call('EXISTS', KEYS[1]) == 0 then
+        return nil
+    end
+    redis.call('RENAME', KEYS[1], KEYS[2])
+    redis.call('SET', KEYS[3], ARGV[1])
+else
+    -- Пачка осталась от упавшего сброса: id прежний, если он уже был
+    redis.call('SET', KEYS[3], ARGV[1], 'NX')
+end
+return redis.call('GET', KEYS[3])
+"""
+
+# Снимаем только свою блокировку: чужую могли взять после истечения TTL
+RELEASE_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class PopularityService:
+
+    async def record_favorite(self, film_id: int, delta: int = 1) -> None:
+        await self._increment("film:counters:favorites", film_id, delta)
+
+    async def record_view(self, film_id: int, delta: int = 1) -> None:
+        await self._increment("film:counters:views", film_id, delta)
+
+    async def record_views(self, counts: dict[int, int]) -> None:
+        # Пачка просмотров после сброса heartbeat-ов, один round-trip в Redis
+        if not counts:
+            return
+        try:
+            async with redis_manager.get_client() as client:
+                pipe = client.pipeline(transaction=False)
+                for film_id, delta in counts.items():
+                    pipe.hincrby("film:counters:views", film_id, delta)
+                await pipe.execute()
+        except Exception as e:
+            logger.warning("Не удалось увеличить счетчики просмотров: %s", e)
+
+    @staticmethod
+    async def _increment(key: str, film_id: int, delta: int) -> None:
+        # Счетчик не должен ронять основной запрос, расхождение поправит сверка
+        try:
+            async with redis_manager.get_client() as client:
+                await client.hincrby(key, film_id, delta)
+        except Exception as e:
+            logger.warning(
+                "Не удалось увеличить счетчик %s фильма %s: %s", key, film_id, e
+            )
+
+    async def flush(self) -> int:
+        token = uuid.uuid4().hex
+        async with redis_manager.get_client() as client:
+            if not await client.set(FLUSH_LOCK_KEY, token, nx=True, ex=FLUSH_LOCK_TTL):
+                logger.debug("Сброс счетчиков уже выполняется другим воркером")
+                return 0
+
+            try:
+                flushed = 0
+                for key, column in COUNTER_COLUMNS.items():
+                    flushed += await self._flush_key(client, key, column)
+                return flushed
+            finally:
+                await client.eval(RELEASE_LOCK_SCRIPT, 1, FLUSH_LOCK_KEY, token)
+
+    @staticmethod
+    async def _flush_key(client, key: str, column: str) -> int:
+        pending_key = f"{key}:flushing"
+        flush_id_key = f"{key}:flush_id"
+
+        flush_id = await client.eval(
+            TAKE_BATCH_SCRIPT, 3, key, pending_key, flush_id_key, uuid.uuid4().hex
+        )
+        if flush_id is None:
+            # Хеша нет, событий с прошлого сброса не было
+            return 0
+
+        deltas = await client.hgetall(pending_key)
+        film_ids = [int(film_id) for film_id in deltas]
+        values = [int(delta) for delta in deltas.values()]
+
+        if film_ids:
+            async with db_manager.session_factory() as session:
+                try:
+                    inserted = await session.execute(
+                        text(
+                            """
+                            INSERT INTO counter_flushes (flush_id) VALUES (:flush_id)
+                            ON CONFLICT DO NOTHING
+                            RETURNING 1
+                            """
+                        ),
+                        {"flush_id": flush_id.decode()},
+                    )
+                    if inserted.scalar_one_or_none() is None:
+                        # Пачка уже в БД, процесс упал до удаления ключей
+                        logger.warning(
+                            "Дельты %s уже применены, повтор пропущен", column
+                        )
+                        await session.rollback()
+                        await client.delete(pending_key, flush_id_key)
+                        return 0
+
+                    await session.execute(
+                        text(
+                            f"""
+                            UPDATE films SET {column} = GREATEST(films.{column} + d.delta, 0)
+                            FROM (
+                                SELECT unnest(CAST(:film_ids AS integer[])) AS film_id,
+                                       unnest(CAST(:deltas AS integer[])) AS delta
+                            ) d
+                            WHERE films.id = d.film_id
+                            """
+                        ),
+                        {"film_ids": film_ids, "deltas": values},
+                    )
+                    await session.execute(
+                        text(
+                            "DELETE FROM counter_flushes "
+                            f"WHERE applied_at < now() - interval '{FLUSH_RETENTION}'"
+                        )
+                    )
+                    await session.commit()
+                except Exception as e:
+                    logger.error("Произошла ошибка сброса счетчиков %s: %s", column, e)
+                    await session.rollback()
+                    raise
+
+        await client.delete(pending_key, flush_id_key)
+        logger.debug("Сброшено дельт %s: %s", column, len(film_ids))
+        return len(film_ids)
+
+    async def reconcile(self) -> None:
+        """
+        Точный пересчет по favorites и watch_history. Сначала сбрасываем
+        накопленные дельты, чтобы они не прибавились к уже точным значениям
+        """
+        await self.flush()
+
+        async with db_manager.session_factory() as session:
+            try:
+                favorites = await session.execute(
+                    text(
+                        """
+                        UPDATE films SET favorites_count = c.cnt
+                        FROM (
+                            SELECT f.id, count(fv.id) AS cnt
+                            FROM films f
+                            LEFT JOIN favorites fv ON fv.film_id = f.id
+                            GROUP BY f.id
+                        ) c
+                        WHERE films.id = c.id AND films.favorites_count <> c.cnt
+                        """
+                    )
+                )
+                views = await session.execute(
+                    text(
+                        """
+                        UPDATE films SET views_count = c.cnt
+                        FROM (
+                            -- Строки удаленных партиций лежат в views_archived
+                            SELECT f.id, f.views_archived + count(wh.id) AS cnt
+                            FROM films f
+                            LEFT JOIN watch_history wh ON wh.film_id = f.id
+                            GROUP BY f.id
+                        ) c
+                        WHERE films.id = c.id AND films.views_count <> c.cnt
+                        """
+                    )
+                )
+                await session.commit()
+
+                logger.info(
+                    "Сверка счетчиков: исправлено favorites %s, views %s",
+                    favorites.rowcount,
+                    views.rowcount,
+                )
+
+            except Exception as e:
+                logger.error("Произошла ошибка сверки счетчиков популярности: %s", e)
+                await session.rollback()
+                raise
+
+
+popularity_service = PopularityService()
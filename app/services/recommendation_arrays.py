@@ -0,0 +1,149 @@
+"""Операции над разреженными матрицами для рекомендаций
+
+Матрицы - scipy CSR, строки и столбцы индексируются id фильма или
+пользователя напрямую. Расчеты векторные, без цикла Python по строкам,
+цикл есть только при выгрузке готового результата в списки.
+"""
+
+from typing import Optional
+
+import numpy as np
+from scipy import sparse
+
+
+def interactions_matrix(
+    row_ids: np.ndarray, col_ids: np.ndarray, weights: np.ndarray, shape: tuple[int, int]
+) -> sparse.csr_matrix:
+    matrix = sparse.csr_matrix(
+        (weights.astype(np.float32), (row_ids, col_ids)), shape=shape
+    )
+    matrix.sum_duplicates()
+    return matrix
+
+
+def top_k_per_row(matrix: sparse.csr_matrix, k: int) -> sparse.csr_matrix:
+    """
+    Оставляет в каждой строке k наибольших значений. В результате внутри
+    строки значения идут по убыванию (индексы столбцов не отсортированы)
+    """
+    matrix = matrix.tocsr()
+    counts = np.diff(matrix.indptr)
+    rows = np.repeat(np.arange(matrix.shape[0]), counts)
+
+    # Сортировка по строке, внутри строки по убыванию значения
+    order = np.lexsort((-matrix.data, rows))
+    rank = np.arange(len(order)) - matrix.indptr[rows[order]]
+    keep = order[rank < k]
+
+    indptr = np.zeros(matrix.shape[0] + 1, dtype=np.int64)
+    np.cumsum(np.minimum(counts, k), out=indptr[1:])
+
+    return sparse.csr_matrix(
+        (matrix.data[keep], matrix.indices[keep], indptr), shape=matrix.shape
+    )
+
+
+def cosine_from_cooccurrence(
+    cooccurrence: sparse.csr_matrix, shrinkage: float = 0.0
+) -> sparse.csr_matrix:
+    """
+    Косинусная близость столбцов X по накопленной X^T X. Диагональ - нормы.
+    shrinkage штрафует пары с малым пересечением: sim * c / (c + shrinkage)
+    """
+    norms = np.sqrt(cooccurrence.diagonal())
+
+    pairs = cooccurrence.tocoo()
+    off_diagonal = pairs.row != pairs.col
+    rows, cols = pairs.row[off_diagonal], pairs.col[off_diagonal]
+    values = pairs.data[off_diagonal]
+
+    similarity = values / (norms[rows] * norms[cols])
+    if shrinkage:
+        similarity *= values / (values + shrinkage)
+
+    return sparse.csr_matrix(
+        (similarity.astype(np.float32), (rows, cols)), shape=cooccurrence.shape
+    )
+
+
+def jaccard_rows(
+    features: sparse.csr_matrix, rows: np.ndarray
+) -> sparse.csr_matrix:
+    """
+    Жаккар |A & B| / |A | B| между строками rows и всеми строками бинарной
+    матрицы признаков. Результат len(rows) x число строк, без диагонали
+    """
+    features = features.tocsr()
+    sizes = np.diff(features.indptr).astype(np.float32)
+
+    # Пересечения всех пар - одно произведение разреженных матриц
+    intersections = (features[rows] @ features.T).tocoo()
+    not_self = rows[intersections.row] != intersections.col
+
+    local_rows = intersections.row[not_self]
+    cols = intersections.col[not_self]
+    common = intersections.data[not_self]
+    similarity = common / (sizes[rows][local_rows] + sizes[cols] - common)
+
+    return sparse.csr_matrix(
+        (similarity.astype(np.float32), (local_rows, cols)),
+        shape=(len(rows), features.shape[0]),
+    )
+
+
+def exclude_seen(
+    scores: sparse.csr_matrix, seen: sparse.csr_matrix
+) -> sparse.csr_matrix:
+    scores = scores.tocsr()
+    mask = seen.astype(bool).astype(np.float32)
+    scores = scores - scores.multiply(mask)
+    scores.eliminate_zeros()
+    return scores.tocsr()
+
+
+def rows_to_lists(
+    matrix: sparse.csr_matrix, row_ids: Optional[np.ndarray] = None
+) -> list[tuple[int, list[int], list[float]]]:
+    """
+    (id строки, id столбцов, значения) для непустых строк, внутри строки
+    по убыванию значения
+    """
+    result = []
+    indptr = matrix.indptr
+    for row in np.flatnonzero(np.diff(indptr)):
+        start, stop = indptr[row], indptr[row + 1]
+        order = np.argsort(-matrix.data[start:stop], kind="stable")
+        result.append(
+            (
+                int(row if row_ids is None else row_ids[row]),
+                matrix.indices[start:stop][order].tolist(),
+                [round(float(value), 6) for value in matrix.data[start:stop][order]],
+            )
+        )
+    return result
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    np.divide(matrix, norms, out=matrix, where=norms > 0)
+    return matrix
+
+
+def rerank(
+    user_vector: np.ndarray,
+    film_vectors: np.ndarray,
+    film_ids: np.ndarray,
+    base_scores: np.ndarray,
+    weight: float,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Переранжирование кандидатов одним проходом: gather строк фильмов,
+    matvec с вектором пользователя и argsort. Возвращает (порядок, оценки)
+    """
+    # Фильмы новее снимка векторов получают нулевую близость
+    known = film_ids < len(film_vectors)
+    affinity = np.zeros(len(film_ids), dtype=np.float32)
+    affinity[known] = film_vectors[film_ids[known]] @ user_vector
+    scores = (1 - weight) * base_scores + weight * affinity
+    order = np.argsort(-scores, kind="stable")
+    return order, scores[order]
@@ -0,0 +1,292 @@
+"""Item-to-item коллаборативная фильтрация
+
+Пакетная задача: взаимодействия (избранное с весом CF_FAVORITE_WEIGHT,
+просмотры за CF_HISTORY_DAYS с весом CF_WATCH_WEIGHT) читаются пачками
+по диапазонам user_id. Из пачки строится CSR пользователи x фильмы и
+прибавляется к X^T X. В памяти одновременно только одна пачка
+пользователей и матрица совместной встречаемости, а ее размер ограничен
+числом фильмов в квадрате и от числа взаимодействий не зависит.
+Пользователи с очень длинной историей обрезаются до
+CF_MAX_ITEMS_PER_USER самых весомых фильмов, иначе один такой
+пользователь дает квадратичное число пар.
+
+Из X^T X получается косинусная близость со штрафом за малое пересечение,
+по каждому фильму остается RECOMMENDATIONS_NEIGHBORS соседей, они целиком
+заменяют строки film_similar с source = cf. Вторым проходом по тем же
+пачкам считаются персональные рекомендации X @ S без уже просмотренного
+и пишутся в user_recommendations.
+
+Запуск: python -m app.services.recommendation_service или периодически,
+если RECOMMENDATIONS_REFRESH_SECONDS > 0.
+"""
+
+import asyncio
+import itertools
+import time
+from datetime import datetime, timedelta, UTC
+
+import numpy as np
+from scipy import sparse
+from sqlalchemy import text, func, delete, insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.core.config import settings
+from app.core.database import db_manager
+from app.core.logger_config import get_logger
+from app.models.recommendation import FilmSimilar, UserRecommendation, SOURCE_CF
+from app.services import recommendation_arrays
+
+
+logger = get_logger(__name__)
+
+
+FETCH_SIZE = 10_000
+INSERT_BATCH_SIZE = 1_000
+
+# Ключ advisory lock, чтобы задачу не запустили два воркера сразу
+RECOMMENDATIONS_LOCK = 703303
+
+
+# film_id < :films_shape: пачки читаются в разных транзакциях, фильм, созданный
+# во время пересчета, не должен выйти за размер матрицы, взятый в _bounds
+INTERACTIONS_SQL = text(
+    """
+    SELECT user_id, film_id, max(weight) AS weight
+    FROM (
+        SELECT user_id, film_id, CAST(:favorite_weight AS real) AS weight
+        FROM favorites
+        WHERE user_id >= :user_from AND user_id < :user_to
+            AND film_id < :films_shape
+        UNION ALL
+        SELECT user_id, film_id, CAST(:watch_weight AS real)
+        FROM watch_history
+        WHERE user_id >= :user_from AND user_id < :user_to AND watched_at >= :since
+            AND film_id < :films_shape
+    ) interactions
+    GROUP BY user_id, film_id
+    """
+)
+
+
+class CollaborativeFilteringService:
+
+    async def build(self) -> int:
+        """
+        Полный пересчет. Возвращает число фильмов, для которых найдены соседи
+        """
+        started = time.perf_counter()
+
+        async with db_manager.engine.connect() as conn:
+            locked = await conn.execute(
+                text("SELECT pg_try_advisory_lock(:key)"), {"key": RECOMMENDATIONS_LOCK}
+            )
+            if not locked.scalar_one():
+                logger.info("Рекомендации уже пересчитывает другой процесс")
+                return 0
+            await conn.commit()
+
+            try:
+                films_shape, max_user_id = await self._bounds(conn)
+                since = datetime.now(UTC) - timedelta(days=settings.CF_HISTORY_DAYS)
+
+                cooccurrence = sparse.csr_matrix(
+                    (films_shape, films_shape), dtype=np.float32
+                )
+                async for user_from, interactions in self._iter_chunks(
+                    conn, films_shape, max_user_id, since
+                ):
+                    cooccurrence = await asyncio.to_thread(
+                        self._accumulate, cooccurrence, interactions
+                    )
+
+                similarity = await asyncio.to_thread(self._similarity, cooccurrence)
+                del cooccurrence
+                films = await self._save_similar(conn, similarity)
+
+                users = await self._save_user_recommendations(
+                    conn, similarity, films_shape, max_user_id, since
+                )
+
+                logger.info(
+                    "Рекомендации пересчитаны за %.1f сек: фильмов %s, пользователей %s",
+                    time.perf_counter() - started,
+                    films,
+                    users,
+                )
+                return films
+
+            except Exception as e:
+                logger.error("Произошла ошибка пересчета рекомендаций: %s", e)
+                await conn.rollback()
+                raise
+
+            finally:
+                await conn.execute(
+                    text("SELECT pg_advisory_unlock(:key)"), {"key": RECOMMENDATIONS_LOCK}
+                )
+                await conn.commit()
+
+    @staticmethod
+    async def _bounds(conn: AsyncConnection) -> tuple[int, int]:
+        result = await conn.execute(
+            text(
+                "SELECT (SELECT coalesce(max(id), 0) FROM films), "
+                "(SELECT coalesce(max(id), 0) FROM users)"
+            )
+        )
+        max_film_id, max_user_id = result.one()
+        return max_film_id + 1, max_user_id
+
+    @staticmethod
+    async def _iter_chunks(
+        conn: AsyncConnection, films_shape: int, max_user_id: int, since: datetime
+    ):
+        """
+        (первый user_id пачки, CSR пачки пользователи x фильмы)
+        """
+        chunk = settings.CF_USER_CHUNK
+
+        for user_from in range(0, max_user_id + 1, chunk):
+            user_to = user_from + chunk
+            result = await conn.stream(
+                INTERACTIONS_SQL,
+                {
+                    "favorite_weight": settings.CF_FAVORITE_WEIGHT,
+                    "watch_weight": settings.CF_WATCH_WEIGHT,
+                    "user_from": user_from,
+                    "user_to": user_to,
+                    "since": since,
+                    "films_shape": films_shape,
+                },
+            )
+
+            parts = []
+            async for rows in result.partitions(FETCH_SIZE):
+                parts.append(
+                    np.fromiter(
+                        itertools.chain.from_iterable(rows),
+                        dtype=np.float64,
+                        count=len(rows) * 3,
+                    ).reshape(-1, 3)
+                )
+            if not parts:
+                continue
+
+            data = np.concatenate(parts)
+            interactions = recommendation_arrays.interactions_matrix(
+                data[:, 0].astype(np.int64) - user_from,
+                data[:, 1].astype(np.int64),
+                data[:, 2],
+                shape=(chunk, films_shape),
+            )
+            yield user_from, recommendation_arrays.top_k_per_row(
+                interactions, settings.CF_MAX_ITEMS_PER_USER
+            )
+
+    @staticmethod
+    def _accumulate(
+        cooccurrence: sparse.csr_matrix, interactions: sparse.csr_matrix
+    ) -> sparse.csr_matrix:
+        return (cooccurrence + (interactions.T @ interactions)).tocsr()
+
+    @staticmethod
+    def _similarity(cooccurrence: sparse.csr_matrix) -> sparse.csr_matrix:
+        similarity = recommendation_arrays.cosine_from_cooccurrence(
+            cooccurrence, shrinkage=settings.CF_SHRINKAGE
+        )
+        return recommendation_arrays.top_k_per_row(
+            similarity, settings.RECOMMENDATIONS_NEIGHBORS
+        )
+
+    @staticmethod
+    async def _save_similar(conn: AsyncConnection, similarity: sparse.csr_matrix) -> int:
+        rows = [
+            {"film_id": film_id, "source": SOURCE_CF, "neighbor_ids": ids, "scores": scores}
+            for film_id, ids, scores in recommendation_arrays.rows_to_lists(similarity)
+        ]
+
+        # Старые соседи видны читателям до commit, пустого окна нет
+        await conn.execute(delete(FilmSimilar).where(FilmSimilar.source == SOURCE_CF))
+        for start in range(0, len(rows), INSERT_BATCH_SIZE):
+            await conn.execute(
+                insert(FilmSimilar), rows[start : start + INSERT_BATCH_SIZE]
+            )
+        await conn.commit()
+        return len(rows)
+
+    async def _save_user_recommendations(
+        self,
+        conn: AsyncConnection,
+        similarity: sparse.csr_matrix,
+        films_shape: int,
+        max_user_id: int,
+        since: datetime,
+    ) -> int:
+        # Время БД, а не приложения: с ним потом сравнивается updated_at
+        run_started = (await conn.execute(text("SELECT now()"))).scalar_one()
+        saved = 0
+
+        async for user_from, interactions in self._iter_chunks(
+            conn, films_shape, max_user_id, since
+        ):
+            recommendations = await asyncio.to_thread(
+                self._recommend, interactions, similarity
+            )
+            rows = [
+                {"user_id": user_id, "film_ids": ids, "scores": scores}
+                for user_id, ids, scores in recommendation_arrays.rows_to_lists(
+                    recommendations,
+                    row_ids=user_from + np.arange(recommendations.shape[0]),
+                )
+            ]
+
+            for start in range(0, len(rows), INSERT_BATCH_SIZE):
+                statement = pg_insert(UserRecommendation).values(
+                    rows[start : start + INSERT_BATCH_SIZE]
+                )
+                await conn.execute(
+                    statement.on_conflict_do_update(
+                        index_elements=[UserRecommendation.user_id],
+                        set_={
+                            "film_ids": statement.excluded.film_ids,
+                            "scores": statement.excluded.scores,
+                            "updated_at": func.now(),
+                        },
+                    )
+                )
+            await conn.commit()
+            saved += len(rows)
+
+        # Пользователи без взаимодействий за окно больше не получают старый список
+        await conn.execute(
+            delete(UserRecommendation).where(UserRecommendation.updated_at < run_started)
+        )
+        await conn.commit()
+        return saved
+
+    @staticmethod
+    def _recommend(
+        interactions: sparse.csr_matrix, similarity: sparse.csr_matrix
+    ) -> sparse.csr_matrix:
+        scores = recommendation_arrays.exclude_seen(interactions @ similarity, interactions)
+        return recommendation_arrays.top_k_per_row(
+            scores, settings.RECOMMENDATIONS_PER_USER
+        )
+
+
+collaborative_filtering_service = CollaborativeFilteringService()
+
+
+async def _run_build() -> None:
+    db_manager.init_db(db_url=settings.DATABASE_URL)
+    try:
+        await collaborative_filtering_service.build()
+    finally:
+        await db_manager.close()
+
+
+# python -m app.services.recommendation_service
+
+if __name__ == "__main__":
+    asyncio.run(_run_build())
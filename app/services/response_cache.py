@@ -0,0 +1,126 @@
+"""Кеш готовых сжатых ответов в Redis
+
+Тело ответа сжимается один раз при промахе во все поддерживаемые
+кодирования (gzip и br, если есть brotli) и кладется в хеш
+resp:{key} с полями по кодированию на RESPONSE_CACHE_TTL_SECONDS. При
+попадании клиенту уходит готовый вариант с Content-Encoding, middleware
+сжатия его второй раз не трогает. Клиенту без сжатия тело
+распаковывается, таких единицы. Исходный размер хранится в поле size и
+передается middleware для статистики сжатия.
+
+Ключ должен включать версию данных (например ETag страницы), тогда
+инвалидация не нужна: новые данные - новый ключ, старый истечет по TTL.
+"""
+
+import logging
+import time
+from typing import Awaitable, Callable, Optional
+
+from fastapi import Response
+
+from app.core.config import settings
+from app.core.compression import (
+    ENCODINGS,
+    UNCOMPRESSED_LENGTH_HEADER,
+    choose_encoding,
+    compress,
+    decompress,
+)
+from app.core.database import redis_manager
+from app.core.logger_config import get_logger
+from app.core.metrics import record_cache
+
+
+logger = get_logger(__name__)
+
+
+class ResponseCache:
+
+    async def get_or_build(
+        self,
+        key: str,
+        accept_encoding: Optional[str],
+        build: Callable[[], Awaitable[bytes]],
+        media_type: str = "application/json",
+        headers: Optional[dict[str, str]] = None,
+    ) -> Response:
+        encoding = choose_encoding(accept_encoding)
+        cache_key = f"resp:{key}"
+
+        size, variants = await self._get(cache_key)
+        record_cache("response", hits=int(bool(variants)), misses=int(not variants))
+        if variants:
+            body, body_encoding = self._pick(variants, encoding)
+        else:
+            body = await build()
+            size, body_encoding = len(body), None
+            if size >= settings.COMPRESSION_MIN_SIZE:
+                variants = self._compress_all(body)
+                await self._set(cache_key, size, variants)
+                if encoding is not None:
+                    body, body_encoding = variants[encoding], encoding
+
+        response = Response(content=body, media_type=media_type, headers=headers)
+        response.headers["Vary"] = "Accept-Encoding"
+        if body_encoding is not None:
+            response.headers["Content-Encoding"] = body_encoding
+            response.headers[UNCOMPRESSED_LENGTH_HEADER] = str(size)
+        return response
+
+    @staticmethod
+    def _pick(variants: dict[str, bytes], encoding: Optional[str]) -> tuple[bytes, Optional[str]]:
+        if encoding in variants:
+            return variants[encoding], encoding
+        stored = next(iter(variants))
+        return decompress(variants[stored], stored), None
+
+    @staticmethod
+    def _compress_all(body: bytes) -> dict[str, bytes]:
+        started = time.perf_counter()
+        variants = {
+            encoding: compress(
+                body,
+                encoding,
+                settings.COMPRESSION_GZIP_LEVEL,
+                settings.COMPRESSION_BROTLI_QUALITY,
+            )
+            for encoding in ENCODINGS
+        }
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "Ответ %s байт сжат в %s за %.1f мс",
+                len(body),
+                ", ".join(f"{name} {len(data)}" for name, data in variants.items()),
+                (time.perf_counter() - started) * 1000,
+            )
+        return variants
+
+    @staticmethod
+    async def _get(cache_key: str) -> tuple[int, dict[str, bytes]]:
+        # Кеш не должен ронять запрос: без Redis ответ просто собирается заново
+        try:
+            async with redis_manager.get_client() as client:
+                stored = await client.hgetall(cache_key)
+            variants = {
+                encoding.decode(): body
+                for encoding, body in stored.items()
+                if encoding.decode() in ENCODINGS
+            }
+            return int(stored.get(b"size", 0)), variants
+        except Exception as e:
+            logger.warning("Не удалось прочитать кеш ответа %s: %s", cache_key, e)
+            return 0, {}
+
+    @staticmethod
+    async def _set(cache_key: str, size: int, variants: dict[str, bytes]) -> None:
+        try:
+            async with redis_manager.get_client() as client:
+                pipe = client.pipeline(transaction=True)
+                pipe.hset(cache_key, mapping={"size": size, **variants})
+                pipe.expire(cache_key, settings.RESPONSE_CACHE_TTL_SECONDS)
+                await pipe.execute()
+        except Exception as e:
+            logger.warning("Не удалось сохранить кеш ответа %s: %s", cache_key, e)
+
+
+response_cache = ResponseCache()
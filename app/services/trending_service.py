@@ -0,0 +1,177 @@
+"""Трендовые фильмы с экспоненциальным затуханием
+
+Вклад события весом w в момент t через время dt равен w * exp(-rate * dt),
+rate = ln 2 / TRENDING_HALF_LIFE_HOURS. Чтобы не пересчитывать все оценки
+со временем, используется forward decay: к оценке прибавляется
+w * exp(rate * (t - epoch)), где epoch - точка отсчета ключа. Порядок в
+sorted set от этого не меняется, текущее значение - score * exp(-rate * (now - epoch)).
+
+Множитель растет со временем, поэтому раз в TRENDING_RENORMALIZE_SECONDS
+оценки ключа умножаются на exp(-rate * (now - epoch)) и epoch сдвигается
+на now. Заодно set обрезается до TRENDING_MAX_SIZE и из него уходят
+затухшие фильмы. Инкремент и перенормировка - Lua-скрипты, читающие
+epoch внутри Redis, поэтому друг с другом не гоняются.
+
+Ключи: trending:global и trending:genre:{genre_id}, epoch каждого - поле
+хеша trending:epochs, список ключей для перенормировки - trending:keys.
+"""
+
+import math
+import time
+from typing import Optional
+
+from app.core.config import settings
+from app.core.database import redis_manager
+from app.core.logger_config import get_logger
+from app.services.film_meta_cache import film_meta_cache
+
+
+logger = get_logger(__name__)
+
+
+GLOBAL_KEY = "trending:global"
+EPOCHS_KEY = "trending:epochs"
+INDEX_KEY = "trending:keys"
+
+
+# KEYS: index, epochs, zset... ARGV: now, rate, затем тройки (номер ключа в KEYS, film_id, вес)
+INCREMENT_SCRIPT = """
+local now = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local boost = {}
+for i = 3, #KEYS do
+    local epoch = tonumber(redis.call('HGET', KEYS[2], KEYS[i]))
+    if not epoch then
+        epoch = now
+        redis.call('HSET', KEYS[2], KEYS[i], ARGV[1])
+        redis.call('SADD', KEYS[1], KEYS[i])
+    end
+    boost[i] = math.exp((now - epoch) * rate)
+end
+for j = 3, #ARGV, 3 do
+    local i = tonumber(ARGV[j])
+    redis.call('ZINCRBY', KEYS[i], tonumber(ARGV[j + 2]) * boost[i], ARGV[j + 1])
+end
+return 1
+"""
+
+# KEYS: zset, epochs, index. ARGV: now, rate, min_score, max_size
+RENORMALIZE_SCRIPT = """
+local epoch = tonumber(redis.call('HGET', KEYS[2], KEYS[1]))
+if not epoch then
+    return 0
+end
+local factor = math.exp((epoch - tonumber(ARGV[1])) * tonumber(ARGV[2]))
+redis.call('ZREMRANGEBYRANK', KEYS[1], 0, -(tonumber(ARGV[4]) + 1))
+local members = redis.call('ZRANGE', KEYS[1], 0, -1, 'WITHSCORES')
+for i = 1, #members, 2 do
+    redis.call('ZADD', KEYS[1], tonumber(members[i + 1]) * factor, members[i])
+end
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', '(' .. ARGV[3])
+if redis.call('ZCARD', KEYS[1]) == 0 then
+    redis.call('HDEL', KEYS[2], KEYS[1])
+    redis.call('SREM', KEYS[3], KEYS[1])
+else
+    redis.call('HSET', KEYS[2], KEYS[1], ARGV[1])
+end
+return #members / 2
+"""
+
+
+def genre_key(genre_id: int) -> str:
+    return f"trending:genre:{genre_id}"
+
+
+class TrendingService:
+
+    @property
+    def _rate(self) -> float:
+        return math.log(2) / (settings.TRENDING_HALF_LIFE_HOURS * 60 * 60)
+
+    async def record_favorite(self, film_id: int) -> None:
+        await self._record({film_id: settings.TRENDING_FAVORITE_WEIGHT})
+
+    async def record_views(self, counts: dict[int, int]) -> None:
+        await self._record(
+            {
+                film_id: views * settings.TRENDING_VIEW_WEIGHT
+                for film_id, views in counts.items()
+            }
+        )
+
+    async def _record(self, weights: dict[int, float]) -> None:
+        # Тренды не должны ронять основной запрос или сброс просмотров
+        if not weights:
+            return
+        try:
+            genres = await film_meta_cache.get_genre_ids(list(weights))
+
+            keys = [INDEX_KEY, EPOCHS_KEY, GLOBAL_KEY]
+            positions = {GLOBAL_KEY: 3}
+            args = []
+            for film_id, weight in weights.items():
+                for key in [GLOBAL_KEY] + [
+                    genre_key(genre_id) for genre_id in genres.get(film_id, [])
+                ]:
+                    if key not in positions:
+                        keys.append(key)
+                        positions[key] = len(keys)
+                    args += [positions[key], film_id, weight]
+
+            async with redis_manager.get_client() as client:
+                await client.eval(
+                    INCREMENT_SCRIPT, len(keys), *keys, time.time(), self._rate, *args
+                )
+
+        except Exception as e:
+            logger.warning(
+                "Не удалось обновить тренды для %s фильмов: %s", len(weights), e
+            )
+
+    async def renormalize(self) -> int:
+        now = time.time()
+        renormalized = 0
+
+        async with redis_manager.get_client() as client:
+            keys = await client.smembers(INDEX_KEY)
+            # По ключу за вызов: один скрипт не держит Redis на всех жанрах сразу
+            for key in keys:
+                renormalized += await client.eval(
+                    RENORMALIZE_SCRIPT,
+                    3,
+                    key,
+                    EPOCHS_KEY,
+                    INDEX_KEY,
+                    now,
+                    self._rate,
+                    settings.TRENDING_MIN_SCORE,
+                    settings.TRENDING_MAX_SIZE,
+                )
+
+        logger.debug(
+            "Тренды перенормированы: ключей %s, фильмов %s", len(keys), renormalized
+        )
+        return renormalized
+
+    async def get_top(
+        self, limit: int, genre_id: Optional[int] = None
+    ) -> list[tuple[int, float]]:
+        """
+        Топ-k за O(log n + k): ZREVRANGE по готовому sorted set
+        """
+        key = genre_key(genre_id) if genre_id is not None else GLOBAL_KEY
+
+        async with redis_manager.get_client() as client:
+            pipe = client.pipeline(transaction=True)
+            pipe.zrevrange(key, 0, limit - 1, withscores=True)
+            pipe.hget(EPOCHS_KEY, key)
+            entries, epoch = await pipe.execute()
+
+        if not entries:
+            return []
+
+        decay = math.exp(-self._rate * (time.time() - float(epoch))) if epoch else 1.0
+        return [(int(member), score * decay) for member, score in entries]
+
+
+trending_service = TrendingService()
@@ -0,0 +1,158 @@
+"""Обслуживание месячных партиций watch_history
+
+Партиция watch_history_yYYYYmMM хранит [1 число месяца, 1 число следующего)
+в UTC. Заранее создаются партиции на WATCH_HISTORY_PARTITIONS_AHEAD месяцев
+вперед, партиции старше WATCH_HISTORY_RETENTION_MONTHS отсоединяются и
+удаляются целиком вместо DELETE по строкам. Retention 0 - хранить все.
+
+Перед удалением число строк партиции по фильмам прибавляется к
+films.views_archived в той же транзакции: views_count остается счетчиком
+за все время, сверка PopularityService складывает его из архива и
+оставшихся строк.
+"""
+
+import re
+from datetime import date, datetime, UTC
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import db_manager
+from app.core.logger_config import get_logger
+
+
+logger = get_logger(__name__)
+
+
+PARTITION_NAME_RE = re.compile(r"^watch_history_y(\d{4})m(\d{2})$")
+
+# Ключ advisory lock, чтобы DDL не выполнялся из нескольких воркеров сразу
+PARTITION_MAINTENANCE_LOCK = 703301
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"watch_history_y{month.year:04d}m{month.month:02d}"
+
+
+class WatchHistoryPartitionService:
+
+    async def maintain(self) -> None:
+        async with db_manager.session_factory() as session:
+            try:
+                locked = await session.execute(
+                    text("SELECT pg_try_advisory_xact_lock(:key)"),
+                    {"key": PARTITION_MAINTENANCE_LOCK},
+                )
+                if not locked.scalar_one():
+                    logger.debug("Партиции watch_history обслуживает другой воркер")
+                    return
+
+                created = await self.ensure_partitions(session)
+                dropped = await self.drop_expired(session)
+                await session.commit()
+
+                if created or dropped:
+                    logger.info(
+                        "Партиции watch_history: создано %s, удалено %s",
+                        created,
+                        dropped,
+                    )
+
+            except Exception as e:
+                logger.error(
+                    "Произошла ошибка обслуживания партиций watch_history: %s", e
+                )
+                await session.rollback()
+                raise
+
+    @staticmethod
+    async def _existing_partitions(session: AsyncSession) -> list[str]:
+        result = await session.execute(
+            text(
+                """
+                SELECT child.relname
+                FROM pg_inherits
+                JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+                JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+                WHERE parent.relname = 'watch_history'
+                """
+            )
+        )
+        return list(result.scalars().all())
+
+    async def ensure_partitions(
+        self, session: AsyncSession, months_ahead: Optional[int] = None
+    ) -> list[str]:
+        if months_ahead is None:
+            months_ahead = settings.WATCH_HISTORY_PARTITIONS_AHEAD
+
+        existing = set(await self._existing_partitions(session))
+        current = datetime.now(UTC).date().replace(day=1)
+        created = []
+
+        for offset in range(months_ahead + 1):
+            month = add_months(current, offset)
+            name = partition_name(month)
+            if name in existing:
+                continue
+
+            await session.execute(
+                text(
+                    f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF watch_history "
+                    f"FOR VALUES FROM ('{month.isoformat()} 00:00:00+00') "
+                    f"TO ('{add_months(month, 1).isoformat()} 00:00:00+00')"
+                )
+            )
+            created.append(name)
+
+        return created
+
+    async def drop_expired(
+        self, session: AsyncSession, retention_months: Optional[int] = None
+    ) -> list[str]:
+        if retention_months is None:
+            retention_months = settings.WATCH_HISTORY_RETENTION_MONTHS
+        if retention_months <= 0:
+            return []
+
+        # Партиция удаляется, когда весь ее месяц старше окна хранения
+        cutoff = add_months(datetime.now(UTC).date().replace(day=1), -retention_months)
+        dropped = []
+
+        for name in await self._existing_partitions(session):
+            match = PARTITION_NAME_RE.match(name)
+            if not match:
+                continue
+
+            month = date(int(match.group(1)), int(match.group(2)), 1)
+            if add_months(month, 1) > cutoff:
+                continue
+
+            await session.execute(
+                text(
+                    f"""
+                    UPDATE films SET views_archived = films.views_archived + c.views
+                    FROM (
+                        SELECT film_id, count(*) AS views FROM {name} GROUP BY film_id
+                    ) c
+                    WHERE films.id = c.film_id
+                    """
+                )
+            )
+            await session.execute(
+                text(f"ALTER TABLE watch_history DETACH PARTITION {name}")
+            )
+            await session.execute(text(f"DROP TABLE {name}"))
+            dropped.append(name)
+
+        return dropped
+
+
+watch_history_partition_service = WatchHistoryPartitionService()
@@ -0,0 +1,230 @@
+"""Прием heartbeat-ов прогресса просмотра
+
+Плеер шлет позицию каждые несколько секунд. В Redis хранится только
+последнее значение на пару пользователь/фильм (HSET перезаписывает поле),
+раз в WATCH_FLUSH_SECONDS или по накоплении WATCH_FLUSH_MAX_EVENTS пар
+все разом пишется в watch_history одним запросом.
+
+Одна строка watch_history - один сеанс просмотра: если у пары есть строка
+не старше WATCH_SESSION_GAP_MIN, она обновляется, иначе вставляется новая.
+
+Crash-safety: данные живут в Redis, перед сбросом хеш переименовывается
+в *:flushing и удаляется только после commit. Повторная обработка того же
+хеша идемпотентна: строки, вставленные первым проходом, будут обновлены.
+"""
+
+import asyncio
+import time
+import uuid
+from datetime import datetime, UTC
+from typing import Optional
+
+from redis.exceptions import ResponseError
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.core.database import db_manager, redis_manager
+from app.core.logger_config import get_logger
+from app.services.popularity_service import RELEASE_LOCK_SCRIPT, popularity_service
+from app.services.trending_service import trending_service
+from app.services.continue_watching_service import continue_watching_service
+from app.services.unique_viewers_service import unique_viewers_service
+
+
+logger = get_logger(__name__)
+
+
+PENDING_KEY = "watch:progress:pending"
+PENDING_SINCE_KEY = "watch:progress:pending:since"
+FLUSHING_KEY = "watch:progress:flushing"
+FLUSHING_SINCE_KEY = "watch:progress:flushing:since"
+FLUSH_LOCK_KEY = "watch:progress:flush_lock"
+LAST_FLUSH_KEY = "watch:progress:last_flush"
+FLUSH_LOCK_TTL = 60
+
+
+FLUSH_SQL = text(
+    """
+    WITH data AS (
+        SELECT *
+        FROM unnest(
+            CAST(:user_ids AS integer[]),
+            CAST(:film_ids AS integer[]),
+            CAST(:durations AS integer[]),
+            CAST(:timestamps AS double precision[])
+        ) AS d(user_id, film_id, watch_duration, ts)
+    ),
+    updated AS (
+        UPDATE watch_history w
+        SET watch_duration = d.watch_duration, watched_at = to_timestamp(d.ts)
+        FROM data d
+        WHERE w.user_id = d.user_id
+          AND w.film_id = d.film_id
+          AND w.watched_at >= to_timestamp(d.ts) - make_interval(mins => :session_gap)
+          AND w.watched_at >= to_timestamp(:min_ts) - make_interval(mins => :session_gap)
+        RETURNING w.user_id, w.film_id
+    ),
+    inserted AS (
+        INSERT INTO watch_history (user_id, film_id, watch_duration, watched_at)
+        SELECT d.user_id, d.film_id, d.watch_duration, to_timestamp(d.ts)
+        FROM data d
+        JOIN films f ON f.id = d.film_id
+        JOIN users u ON u.id = d.user_id
+        WHERE NOT EXISTS (
+            SELECT 1 FROM updated x
+            WHERE x.user_id = d.user_id AND x.film_id = d.film_id
+        )
+        RETURNING film_id
+    )
+    SELECT film_id, count(*) AS views FROM inserted GROUP BY film_id
+    """
+)
+
+
+class WatchIngestService:
+    def __init__(self):
+        self._flush_task: Optional[asyncio.Task] = None
+
+    async def record(self, user_id: int, film_id: int, watch_duration: int) -> None:
+        now = time.time()
+
+        async with redis_manager.get_client() as client:
+            pipe = client.pipeline(transaction=False)
+            pipe.hset(PENDING_KEY, f"{user_id}:{film_id}", f"{watch_duration}:{now}")
+            pipe.set(PENDING_SINCE_KEY, now, nx=True)
+            pipe.hlen(PENDING_KEY)
+            is_new, _, pending = await pipe.execute()
+
+        await continue_watching_service.record(user_id, film_id, watch_duration, now)
+
+        # PFADD нужен один раз на пару в окне сброса, а не на каждый heartbeat
+        if is_new:
+            await unique_viewers_service.record(user_id, film_id, now)
+
+        if pending >= settings.WATCH_FLUSH_MAX_EVENTS:
+            self._schedule_flush()
+
+    def _schedule_flush(self) -> None:
+        # Не плодим параллельные сбросы из одного воркера
+        if self._flush_task and not self._flush_task.done():
+            return
+        self._flush_task = asyncio.create_task(self.flush())
+        self._flush_task.add_done_callback(self._on_flush_done)
+
+    @staticmethod
+    def _on_flush_done(task: asyncio.Task) -> None:
+        # Забираем исключение, иначе asyncio пишет "Task exception was never retrieved"
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(
+                "Фоновый сброс прогресса просмотра завершился ошибкой: %s",
+                task.exception(),
+            )
+
+    async def flush(self) -> int:
+        token = uuid.uuid4().hex
+        async with redis_manager.get_client() as client:
+            if not await client.set(FLUSH_LOCK_KEY, token, nx=True, ex=FLUSH_LOCK_TTL):
+                return 0
+
+            try:
+                return await self._flush(client)
+            except Exception as e:
+                logger.error("Произошла ошибка сброса прогресса просмотра: %s", e)
+                raise
+            finally:
+                # Блокировку мог уже взять другой воркер, если сброс шел дольше TTL
+                await client.eval(RELEASE_LOCK_SCRIPT, 1, FLUSH_LOCK_KEY, token)
+
+    async def _flush(self, client) -> int:
+        # Остаток от упавшего сброса обрабатывается раньше новых событий
+        if not await client.exists(FLUSHING_KEY):
+            try:
+                await client.rename(PENDING_KEY, FLUSHING_KEY)
+            except ResponseError:
+                return 0
+            try:
+                await client.rename(PENDING_SINCE_KEY, FLUSHING_SINCE_KEY)
+            except ResponseError:
+                pass
+
+        entries = await client.hgetall(FLUSHING_KEY)
+        since = await client.get(FLUSHING_SINCE_KEY)
+
+        user_ids, film_ids, durations, timestamps = [], [], [], []
+        for key, value in entries.items():
+            user_id, film_id = key.split(b":")
+            duration, ts = value.split(b":")
+            user_ids.append(int(user_id))
+            film_ids.append(int(film_id))
+            durations.append(int(duration))
+            timestamps.append(float(ts))
+
+        views: dict[int, int] = {}
+        if user_ids:
+            async with db_manager.session_factory() as session:
+                try:
+                    result = await session.execute(
+                        FLUSH_SQL,
+                        {
+                            "user_ids": user_ids,
+                            "film_ids": film_ids,
+                            "durations": durations,
+                            "timestamps": timestamps,
+                            "session_gap": settings.WATCH_SESSION_GAP_MIN,
+                            # Константная граница дает отсечение партиций
+                            "min_ts": min(timestamps),
+                        },
+                    )
+                    views = {row.film_id: row.views for row in result}
+                    await session.commit()
+                except Exception:
+                    await session.rollback()
+                    raise
+
+        await client.delete(FLUSHING_KEY, FLUSHING_SINCE_KEY)
+
+        now = time.time()
+        lag = now - float(since) if since else 0.0
+        await client.hset(
+            LAST_FLUSH_KEY,
+            mapping={"at": now, "rows": len(user_ids), "lag": lag},
+        )
+
+        await popularity_service.record_views(views)
+        await trending_service.record_views(views)
+
+        logger.info(
+            "Сброшен прогресс просмотра: %s пар, новых сеансов %s, задержка %.1f сек",
+            len(user_ids),
+            sum(views.values()),
+            lag,
+        )
+        return len(user_ids)
+
+    async def stats(self) -> dict:
+        async with redis_manager.get_client() as client:
+            pipe = client.pipeline(transaction=False)
+            pipe.hlen(PENDING_KEY)
+            pipe.hlen(FLUSHING_KEY)
+            pipe.get(FLUSHING_SINCE_KEY)
+            pipe.get(PENDING_SINCE_KEY)
+            pipe.hgetall(LAST_FLUSH_KEY)
+            pending, flushing, flushing_since, pending_since, last_flush = (
+                await pipe.execute()
+            )
+
+        oldest = flushing_since or pending_since
+        return {
+            "pending_events": pending + flushing,
+            "pending_lag_seconds": time.time() - float(oldest) if oldest else 0.0,
+            "last_flush_at": (
+                datetime.fromtimestamp(float(last_flush[b"at"]), tz=UTC)
+                if last_flush
+                else None
+            ),
+            "last_flush_rows": int(last_flush.get(b"rows", 0)),
+            "last_flush_lag_seconds": float(last_flush.get(b"lag", 0)),
+        }
+
+
+watch_ingest_service = WatchIngestService()
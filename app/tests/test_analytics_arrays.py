@@ -0,0 +1,149 @@
+from collections import Counter, defaultdict
+
+import numpy as np
+
+from app.services import analytics_arrays
+from app.services.analytics_arrays import WatchArrays, WatchArraysBuilder
+
+
+# Векторные отчеты сверяются с прямолинейными реализациями на Python
+# на небольших синтетических данных
+
+WEEK = 7 * 24 * 60 * 60
+
+
+def _arrays(rows: int = 5_000, films: int = 40, users: int = 300) -> WatchArrays:
+    rng = np.random.default_rng(36)
+    return WatchArrays(
+        user_ids=rng.integers(1, users + 1, rows, dtype=np.int32),
+        film_ids=rng.integers(1, films + 1, rows, dtype=np.int32),
+        watch_duration=rng.integers(0, 7_200, rows, dtype=np.int32),
+        watched_at=1_735_689_600 + rng.integers(0, 120 * 24 * 60 * 60, rows),
+    )
+
+
+def _rows(arrays: WatchArrays) -> list[tuple[int, int, int, int]]:
+    return list(
+        zip(
+            arrays.user_ids.tolist(),
+            arrays.film_ids.tolist(),
+            arrays.watch_duration.tolist(),
+            arrays.watched_at.tolist(),
+        )
+    )
+
+
+def test_builder_collects_rows_into_columns():
+    arrays = _arrays(rows=10)
+    rows = _rows(arrays)
+
+    builder = WatchArraysBuilder()
+    builder.append_rows(rows[:4])
+    builder.append_rows([])
+    builder.append_rows(rows[4:])
+    built = builder.build()
+
+    assert _rows(built) == rows
+    assert built.film_ids.dtype == np.int32
+    assert len(builder.build()) == 0
+
+
+def test_top_films_matches_counter():
+    arrays = _arrays()
+    views, seconds = Counter(), Counter()
+    for _, film_id, duration, _ in _rows(arrays):
+        views[film_id] += 1
+        seconds[film_id] += duration
+    expected = [
+        {"film_id": film_id, "views": count, "watch_seconds": seconds[film_id]}
+        for film_id, count in sorted(views.items(), key=lambda item: (-item[1], item[0]))[:10]
+    ]
+
+    assert analytics_arrays.top_films(arrays, 10) == expected
+
+
+def test_duration_percentiles_by_film_match_np_percentile():
+    arrays = _arrays()
+    per_film = defaultdict(list)
+    for _, film_id, duration, _ in _rows(arrays):
+        per_film[film_id].append(duration)
+
+    film_ids, values = analytics_arrays.duration_percentiles_by_film(
+        arrays, q=(0, 50, 90, 100), min_views=120
+    )
+
+    expected_ids = sorted(film_id for film_id, items in per_film.items() if len(items) >= 120)
+    assert film_ids.tolist() == expected_ids
+    for film_id, row in zip(film_ids, values):
+        np.testing.assert_allclose(row, np.percentile(per_film[film_id], (0, 50, 90, 100)))
+
+
+def test_duration_percentiles_match_np_percentile():
+    arrays = _arrays()
+    result = analytics_arrays.duration_percentiles(arrays, q=(50, 99))
+    expected = np.percentile(arrays.watch_duration, (50, 99))
+
+    assert result == {"p50": float(expected[0]), "p99": float(expected[1])}
+
+
+def test_completion_rates_match_plain_python():
+    arrays = _arrays()
+    film_durations = np.zeros(31, dtype=np.int32)
+    film_durations[1:] = np.arange(1, 31) * 200
+    # Фильмы 31-40 вне массива длительностей: длительность 0, не досмотрены
+
+    views, done = Counter(), Counter()
+    for _, film_id, duration, _ in _rows(arrays):
+        views[film_id] += 1
+        film_duration = film_durations[film_id] if film_id < len(film_durations) else 0
+        if film_duration and duration >= film_duration * 0.9:
+            done[film_id] += 1
+    rates = {film_id: done[film_id] / count for film_id, count in views.items()}
+    expected = [
+        {"film_id": film_id, "views": views[film_id], "completion_rate": round(rate, 4)}
+        for film_id, rate in sorted(rates.items(), key=lambda item: (-item[1], item[0]))[:5]
+    ]
+
+    result = analytics_arrays.completion_rates(arrays, film_durations, ratio=0.9, n=5)
+
+    assert result["films"] == expected
+    assert result["overall"] == sum(done.values()) / len(arrays)
+
+
+def test_cohort_retention_matches_plain_python():
+    arrays = _arrays()
+    rows = _rows(arrays)
+
+    first = {}
+    for user_id, _, _, watched_at in rows:
+        first[user_id] = min(first.get(user_id, watched_at // WEEK), watched_at // WEEK)
+    active = {
+        (user_id, watched_at // WEEK - first[user_id])
+        for user_id, _, _, watched_at in rows
+        if watched_at // WEEK - first[user_id] < 6
+    }
+    sizes = Counter(first.values())
+    counts = Counter((first[user_id], offset) for user_id, offset in active)
+    expected = [
+        {
+            "cohort_start": period * WEEK,
+            "users": size,
+            "retention": [round(counts[(period, k)] / size, 4) for k in range(6)],
+        }
+        for period, size in sorted(sizes.items())
+    ]
+
+    assert analytics_arrays.cohort_retention(arrays, WEEK, max_periods=6) == expected
+
+
+def test_empty_arrays():
+    arrays = WatchArraysBuilder().build()
+
+    assert analytics_arrays.top_films(arrays) == []
+    assert analytics_arrays.cohort_retention(arrays) == []
+    assert analytics_arrays.completion_rates(arrays, np.zeros(1)) == {
+        "overall": 0.0,
+        "films": [],
+    }
+    film_ids, values = analytics_arrays.duration_percentiles_by_film(arrays)
+    assert len(film_ids) == 0 and values.shape == (0, 2)
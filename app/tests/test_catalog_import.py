@@ -0,0 +1,66 @@
+import asyncio
+
+import pytest
+
+from app.services.catalog_import_service import ImportFormat, iter_lines, iter_records
+
+
+# Разбор потока импорта без БД: байты -> строки -> записи
+
+
+async def _chunks(*parts: bytes):
+    for part in parts:
+        yield part
+
+
+def _records(*parts: bytes, fmt: ImportFormat = ImportFormat.csv) -> list:
+
+    async def collect():
+        return [record async for record in iter_records(iter_lines(_chunks(*parts)), fmt)]
+
+    return asyncio.run(collect())
+
+
+def test_csv_quoted_newlines_and_escaped_quotes():
+    records = _records(
+        b'id,title,description\r\n'
+        b'1,Alien,"Line one\r\nline ""two""\n\nline four"\r\n'
+        b'2,Heat,plain\r\n'
+    )
+
+    assert records == [
+        {"id": "1", "title": "Alien", "description": 'Line one\nline "two"\n\nline four'},
+        {"id": "2", "title": "Heat", "description": "plain"},
+    ]
+
+
+def test_csv_record_split_across_chunks_and_utf8_boundary():
+    data = 'id,title\n1,"Сталкер,\nреж. Тарковский"\n'.encode()
+    # Разрез посреди двухбайтового символа
+    records = _records(data[:20], data[20:])
+
+    assert records == [{"id": "1", "title": "Сталкер,\nреж. Тарковский"}]
+
+
+def test_csv_trailing_record_without_newline():
+    records = _records(b"id,title\n1,Alien\n\n2,Heat")
+
+    assert records == [{"id": "1", "title": "Alien"}, {"id": "2", "title": "Heat"}]
+
+
+def test_csv_bad_column_count_raises():
+    with pytest.raises(ValueError, match="запись CSV 2"):
+        _records(b"id,title\n1,Alien\n2,Heat,extra\n")
+
+
+def test_csv_unclosed_quote_at_end_raises():
+    with pytest.raises(ValueError, match="кавычек"):
+        _records(b'id,title\n1,"Alien\n')
+
+
+def test_jsonl_invalid_lines_become_none():
+    records = _records(
+        b'{"id": 1}\n\nnot json\n[1, 2]\n{"id": 2}', fmt=ImportFormat.jsonl
+    )
+
+    assert records == [{"id": 1}, None, None, {"id": 2}]
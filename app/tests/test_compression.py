@@ -0,0 +1,14 @@
+from app.core.compression import choose_encoding
+
+
+def test_choose_encoding_respects_q_zero():
+    assert choose_encoding("gzip;q=0", supported=("gzip",)) is None
+    assert choose_encoding("*;q=0, identity", supported=("gzip",)) is None
+
+
+def test_choose_encoding_limited_to_supported():
+    # Клиент предпочитает br, но маршрут умеет только gzip
+    assert choose_encoding("br, gzip;q=0.5", supported=("gzip",)) == "gzip"
+    assert choose_encoding("br", supported=("gzip",)) is None
+    assert choose_encoding("*", supported=("gzip",)) == "gzip"
+    assert choose_encoding(None) is None
@@ -0,0 +1,86 @@
+import numpy as np
+from scipy import sparse
+
+from app.core.config import settings
+from app.services.content_similarity_service import ContentSimilarityService
+from app.services.recommendation_arrays import rows_to_lists
+
+
+# Инкрементальное обновление (_dirty_scores + _merge + пересчет выпавших)
+# должно давать те же списки, что полный пересчет. Без БД: сохраненные
+# списки film_similar - словарь в памяти.
+
+FILMS = 300
+
+
+def _features(rng, shape: int, per_film: int) -> sparse.csr_matrix:
+    rows = np.repeat(np.arange(FILMS), per_film)
+    cols = rng.integers(0, shape, FILMS * per_film)
+    matrix = sparse.csr_matrix(
+        (np.ones(len(rows), dtype=np.float32), (rows, cols)), shape=(FILMS, shape)
+    )
+    matrix.data[:] = 1
+    return matrix
+
+
+def _full(service, genres, actors) -> dict:
+    lists = service._similarity_lists(genres, actors, np.arange(FILMS))
+    return {film_id: (ids, scores) for film_id, ids, scores in lists}
+
+
+def _incremental(service, stored, genres, actors, dirty, k) -> dict:
+    thresholds = np.zeros(FILMS, dtype=np.float32)
+    for film_id, (_, scores) in stored.items():
+        if len(scores) >= k:
+            thresholds[film_id] = scores[k - 1]
+
+    dirty_top, columns = service._dirty_scores(genres, actors, dirty, thresholds)
+    dirty_ids = set(dirty.tolist())
+    listed = np.array(
+        [film_id for film_id, (ids, _) in stored.items() if dirty_ids & set(ids)],
+        dtype=np.int64,
+    )
+    candidates = np.setdiff1d(np.union1d(columns[0], listed), dirty)
+    merged, recompute = service._merge(candidates, stored, dirty, columns, k)
+
+    result = dict(stored)
+    for film_id in np.concatenate([dirty, candidates]).tolist():
+        result.pop(film_id, None)
+    for film_id, ids, scores in (
+        rows_to_lists(dirty_top, row_ids=dirty)
+        + merged
+        + service._similarity_lists(genres, actors, recompute)
+    ):
+        result[film_id] = (ids, scores)
+    return result
+
+
+def test_incremental_refresh_matches_full_rebuild(monkeypatch):
+    # Маленький предел ненулевых: проверяются и границы блоков
+    monkeypatch.setattr(settings, "CONTENT_BLOCK_MAX_NNZ", 2_000)
+    k = settings.RECOMMENDATIONS_NEIGHBORS
+    rng = np.random.default_rng(40)
+    service = ContentSimilarityService()
+
+    genres = _features(rng, 12, 2)
+    actors = _features(rng, 200, 3)
+    stored = _full(service, genres, actors)
+
+    for _ in range(3):
+        dirty = np.sort(rng.choice(FILMS, 6, replace=False))
+        genres, actors = genres.tolil(), actors.tolil()
+        for film_id in dirty:
+            genres[film_id, :] = 0
+            actors[film_id, :] = 0
+            genres[film_id, rng.integers(0, 12, 2)] = 1
+            actors[film_id, rng.integers(0, 200, 3)] = 1
+        genres, actors = genres.tocsr(), actors.tocsr()
+
+        stored = _incremental(service, stored, genres, actors, dirty, k)
+        expected = _full(service, genres, actors)
+
+        # Порядок равных оценок не определен, сравниваются оценки по местам
+        for film_id in range(FILMS):
+            got = np.round(stored.get(film_id, ([], []))[1], 5)
+            want = np.round(expected.get(film_id, ([], []))[1], 5)
+            assert np.array_equal(got, want), film_id
@@ -0,0 +1,124 @@
+import numpy as np
+from scipy import sparse
+
+from app.services import recommendation_arrays
+
+
+# Чистые функции над CSR: маленькие матрицы, значения считаются вручную
+
+
+def _dense(matrix) -> np.ndarray:
+    return np.asarray(matrix.todense())
+
+
+def test_interactions_matrix_sums_duplicates():
+    matrix = recommendation_arrays.interactions_matrix(
+        np.array([0, 0, 1]), np.array([2, 2, 0]), np.array([1.0, 0.5, 2.0]), shape=(2, 3)
+    )
+
+    assert matrix.dtype == np.float32
+    assert matrix.nnz == 2
+    np.testing.assert_array_equal(_dense(matrix), [[0, 0, 1.5], [2, 0, 0]])
+
+
+def test_cosine_from_cooccurrence_without_diagonal():
+    # Пользователи x фильмы: фильмы 0 и 1 у двух пользователей вместе
+    interactions = sparse.csr_matrix(
+        np.array([[1, 1, 0], [1, 1, 1], [0, 0, 1]], dtype=np.float32)
+    )
+    cooccurrence = (interactions.T @ interactions).tocsr()
+
+    similarity = _dense(recommendation_arrays.cosine_from_cooccurrence(cooccurrence))
+
+    assert np.all(np.diag(similarity) == 0)
+    np.testing.assert_allclose(similarity[0, 1], 2 / (np.sqrt(2) * np.sqrt(2)), rtol=1e-6)
+    np.testing.assert_allclose(similarity[0, 2], 1 / (np.sqrt(2) * np.sqrt(2)), rtol=1e-6)
+    np.testing.assert_allclose(similarity, similarity.T)
+
+
+def test_cosine_shrinkage_penalizes_small_overlap():
+    cooccurrence = sparse.csr_matrix(
+        np.array([[4, 1, 4], [1, 1, 0], [4, 0, 4]], dtype=np.float32)
+    )
+
+    plain = _dense(recommendation_arrays.cosine_from_cooccurrence(cooccurrence))
+    shrunk = _dense(recommendation_arrays.cosine_from_cooccurrence(cooccurrence, 2.0))
+
+    # sim * c / (c + shrinkage)
+    np.testing.assert_allclose(shrunk[0, 1], plain[0, 1] * 1 / 3, rtol=1e-6)
+    np.testing.assert_allclose(shrunk[0, 2], plain[0, 2] * 4 / 6, rtol=1e-6)
+
+
+def test_jaccard_rows_values_and_no_self_pairs():
+    features = sparse.csr_matrix(
+        np.array([[1, 1, 0, 0], [1, 1, 1, 0], [0, 0, 0, 1], [1, 0, 0, 0]], dtype=np.float32)
+    )
+
+    similarity = recommendation_arrays.jaccard_rows(features, np.array([0, 1]))
+
+    assert similarity.shape == (2, 4)
+    np.testing.assert_allclose(
+        _dense(similarity),
+        [
+            [0, 2 / 3, 0, 1 / 2],
+            [2 / 3, 0, 0, 1 / 3],
+        ],
+        rtol=1e-6,
+    )
+    # Без признаков общих нет - нет и записи
+    assert similarity[0, 2] == 0 and similarity.nnz == 4
+
+
+def test_top_k_per_row_keeps_largest_in_descending_order():
+    matrix = sparse.csr_matrix(
+        np.array([[0.1, 0.9, 0.5, 0.7], [0.0, 0.0, 0.3, 0.0], [0, 0, 0, 0]], dtype=np.float32)
+    )
+
+    top = recommendation_arrays.top_k_per_row(matrix, 2)
+
+    assert top.indptr.tolist() == [0, 2, 3, 3]
+    assert top.indices[:2].tolist() == [1, 3]
+    np.testing.assert_allclose(top.data[:2], [0.9, 0.7])
+    assert top.indices[2] == 2
+
+
+def test_top_k_per_row_ties_keep_column_order():
+    matrix = sparse.csr_matrix(np.array([[0.5, 0.5, 0.5, 0.2]], dtype=np.float32))
+
+    top = recommendation_arrays.top_k_per_row(matrix, 2)
+
+    assert top.indices.tolist() == [0, 1]
+
+
+def test_exclude_seen_removes_seen_items():
+    scores = sparse.csr_matrix(np.array([[0.4, 0.8, 0.1], [0.3, 0.0, 0.6]], dtype=np.float32))
+    seen = sparse.csr_matrix(np.array([[0, 2, 0], [1, 0, 0]], dtype=np.float32))
+
+    result = recommendation_arrays.exclude_seen(scores, seen)
+
+    np.testing.assert_allclose(_dense(result), [[0.4, 0, 0.1], [0, 0, 0.6]])
+    assert result.nnz == 3
+
+
+def test_rows_to_lists_skips_empty_rows_and_maps_ids():
+    matrix = sparse.csr_matrix(np.array([[0.2, 0.7], [0, 0], [0.4, 0]], dtype=np.float32))
+
+    lists = recommendation_arrays.rows_to_lists(matrix, row_ids=np.array([10, 11, 12]))
+
+    assert [(row_id, ids) for row_id, ids, _ in lists] == [(10, [1, 0]), (12, [0])]
+    assert lists[0][2] == [0.7, 0.2]
+
+
+def test_rerank_blends_affinity_and_ignores_unknown_films():
+    film_vectors = np.array([[1, 0], [0, 1], [0.6, 0.8]], dtype=np.float32)
+    user_vector = np.array([0, 1], dtype=np.float32)
+    film_ids = np.array([0, 1, 2, 7])
+    base_scores = np.array([1.0, 0.0, 0.5, 0.9], dtype=np.float32)
+
+    order, scores = recommendation_arrays.rerank(
+        user_vector, film_vectors, film_ids, base_scores, weight=0.5
+    )
+
+    # 0: 0.5, 1: 0.5, 2: 0.65, 7 (нет в снимке): 0.45
+    assert order.tolist() == [2, 0, 1, 3]
+    np.testing.assert_allclose(scores, [0.65, 0.5, 0.5, 0.45], rtol=1e-6)
@@ -0,0 +1,115 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.dialects import postgresql
+
+from app.core.dependencies import get_sparse_fields
+from app.core.sparse_fields import parse_fields, sparse_adapter
+from app.crud.actor import ActorCRUD
+from app.crud.film import FilmCRUD
+from app.schemas.actor import ActorResponse
+from app.schemas.film import FilmCardResponse, FilmDetailResponse
+
+
+# Разбор ?fields= и колонки в SELECT. Запросы не выполняются: сессия
+# запоминает выражения, они компилируются под диалект PostgreSQL
+
+
+class _Result:
+
+    def all(self):
+        return []
+
+    def first(self):
+        return None
+
+    def scalars(self):
+        return self
+
+
+class _RecordingSession:
+
+    def __init__(self):
+        self.statements = []
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+        return _Result()
+
+    async def scalar(self, statement):
+        self.statements.append(statement)
+        return 0
+
+
+def _select_list(statement) -> str:
+    sql = str(statement.compile(dialect=postgresql.dialect()))
+    return sql.split(" FROM ", 1)[0]
+
+
+def test_parse_fields_none_means_all_fields():
+    assert parse_fields(None, FilmCardResponse) is None
+
+
+def test_parse_fields_adds_id_and_keeps_schema_order():
+    # Порядок и повторы в запросе не влияют на кортеж: от него зависят ETag и ключ кеша
+    assert parse_fields("year, title,,year", FilmCardResponse) == ("id", "title", "year")
+    assert parse_fields("title,year", FilmCardResponse) == parse_fields(
+        "year,title,id", FilmCardResponse
+    )
+
+
+def test_parse_fields_rejects_unknown_names():
+    with pytest.raises(ValueError, match="description, secret"):
+        parse_fields("title,secret,description", FilmCardResponse)
+
+
+def test_sparse_fields_dependency_returns_400():
+    dependency = get_sparse_fields(FilmCardResponse)
+
+    assert dependency("title") == ("id", "title")
+    with pytest.raises(HTTPException) as error:
+        dependency("bogus")
+    assert error.value.status_code == 400
+
+
+def test_sparse_adapter_serializes_only_requested_fields():
+    fields = parse_fields("name", ActorResponse)
+    adapter = sparse_adapter(ActorResponse, fields)
+
+    body = adapter.dump_json(
+        adapter.validate_python({"id": 1, "name": "Ann", "surname": "Lee", "age": 30})
+    )
+
+    assert body == b'{"name":"Ann","id":1}'
+
+
+def test_film_cards_select_only_requested_columns():
+    session = _RecordingSession()
+    asyncio.run(FilmCRUD.get_cards(session, fields=("id", "title")))
+
+    select_list = _select_list(session.statements[0])
+    assert "film_cards.id" in select_list and "film_cards.title" in select_list
+    for column in ("year", "duration", "genres", "top_actors"):
+        assert column not in select_list
+
+
+def test_film_detail_skips_description_and_genres():
+    session = _RecordingSession()
+    fields = parse_fields("title", FilmDetailResponse)
+    asyncio.run(FilmCRUD.get_detail(session, 1, fields=fields))
+
+    select_list = _select_list(session.statements[0])
+    assert "films.title" in select_list
+    assert "description" not in select_list
+    # Фильм не найден, а жанры и без того не запрошены
+    assert len(session.statements) == 1
+
+
+def test_actor_list_loads_only_requested_columns():
+    session = _RecordingSession()
+    asyncio.run(ActorCRUD.get_list(session, fields=("id", "name")))
+
+    select_list = _select_list(session.statements[0])
+    assert "actors.name" in select_list
+    assert "surname" not in select_list and "age" not in select_list
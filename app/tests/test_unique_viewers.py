@@ -0,0 +1,117 @@
+import asyncio
+import random
+from datetime import date, timedelta
+
+import pytest
+import redis.asyncio as redis
+
+from app.core.config import settings
+from app.core.database import redis_manager
+from app.services.film_meta_cache import GENRES_KEY
+from app.services.unique_viewers_service import (
+    STANDARD_ERROR,
+    _key,
+    unique_viewers_service,
+)
+
+
+# Оценки HyperLogLog сверяются с точным числом уникальных id на настоящем
+# Redis (settings.REDIS_URL). Без Redis тесты пропускаются.
+
+FILM_ID = 990_000_001
+GENRE_ID = 990_000_002
+DAY = date(2026, 1, 1)
+BATCH = 5_000
+
+
+def _within_bounds(estimate: int, exact: int) -> bool:
+    # 3 сигмы от стандартной ошибки Redis, около 2.4%
+    return abs(estimate - exact) <= 3 * STANDARD_ERROR * exact
+
+
+async def _connect() -> None:
+    client = redis.from_url(settings.REDIS_URL, decode_responses=False)
+    try:
+        await client.ping()
+    except Exception:
+        await client.aclose()
+        pytest.skip("Redis недоступен")
+    await client.aclose()
+    await redis_manager.init_redis(settings.REDIS_URL)
+
+
+async def _cleanup() -> None:
+    async with redis_manager.get_client() as client:
+        keys = [key async for key in client.scan_iter(f"hll:*:{FILM_ID}:*")]
+        keys += [key async for key in client.scan_iter(f"hll:*:{GENRE_ID}:*")]
+        if keys:
+            await client.delete(*keys)
+        await client.hdel(GENRES_KEY, FILM_ID)
+    await redis_manager.close()
+
+
+async def _pfadd(key: str, user_ids: list[int]) -> None:
+    async with redis_manager.get_client() as client:
+        pipe = client.pipeline(transaction=False)
+        for start in range(0, len(user_ids), BATCH):
+            pipe.pfadd(key, *user_ids[start : start + BATCH])
+        await pipe.execute()
+
+
+def test_daily_and_range_counts_match_exact():
+
+    async def scenario():
+        await _connect()
+        try:
+            rng = random.Random(37)
+            population = rng.sample(range(1, 10_000_000), 150_000)
+            # Дни пересекаются по зрителям: объединение меньше суммы
+            viewers = {
+                DAY: population[:60_000],
+                DAY + timedelta(days=1): population[40_000:100_000],
+                DAY + timedelta(days=2): population[90_000:150_000],
+            }
+            for day, user_ids in viewers.items():
+                await _pfadd(_key("film", FILM_ID, day), user_ids)
+
+            day_to = DAY + timedelta(days=2)
+            daily = await unique_viewers_service.daily("film", FILM_ID, DAY, day_to)
+            for item in daily:
+                exact = len(set(viewers[item["day"]]))
+                assert _within_bounds(item["unique_viewers"], exact), item
+
+            # PFCOUNT одного дня и PFMERGE диапазона
+            single = await unique_viewers_service.count("film", FILM_ID, DAY, DAY)
+            assert _within_bounds(single, len(set(viewers[DAY])))
+
+            exact_range = len(set().union(*viewers.values()))
+            estimate = await unique_viewers_service.count("film", FILM_ID, DAY, day_to)
+            assert _within_bounds(estimate, exact_range), (estimate, exact_range)
+        finally:
+            await _cleanup()
+
+    asyncio.run(scenario())
+
+
+def test_record_counts_repeated_viewers_once():
+
+    async def scenario():
+        await _connect()
+        try:
+            # Жанры фильма из кеша, без похода в БД
+            async with redis_manager.get_client() as client:
+                await client.hset(GENRES_KEY, FILM_ID, str(GENRE_ID))
+
+            watched_at = 1_767_268_800.0  # 2026-01-01 12:00 UTC
+            user_ids = list(range(1, 301))
+            for user_id in user_ids + user_ids[:100]:
+                await unique_viewers_service.record(user_id, FILM_ID, watched_at)
+
+            for kind, entity_id in (("film", FILM_ID), ("genre", GENRE_ID)):
+                estimate = await unique_viewers_service.count(kind, entity_id, DAY, DAY)
+                # Разреженное представление на малых числах почти точное
+                assert abs(estimate - len(user_ids)) <= 2, (kind, estimate)
+        finally:
+            await _cleanup()
+
+    asyncio.run(scenario())
@@ -0,0 +1,73 @@
+"""Бенчмарк переранжирования кандидатов по жанровым векторам
+
+Пишет синтетические users.npy / films.npy во временный каталог, открывает
+users.npy через memmap, как воркер, и замеряет на случайных пользователях
+чтение строки пользователя и rerank кандидатов.
+
+    python -m benchmarks.affinity_rerank --users 5000000 --candidates 500
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from app.services import recommendation_arrays
+
+
+def generate(directory: Path, users: int, films: int, genres: int, seed: int) -> None:
+    rng = np.random.default_rng(seed)
+
+    film_vectors = (rng.random((films, genres)) < 3 / genres).astype(np.float32)
+    np.save(directory / "films.npy", recommendation_arrays.normalize_rows(film_vectors))
+
+    user_vectors = np.lib.format.open_memmap(
+        directory / "users.npy", mode="w+", dtype=np.float32, shape=(users, genres)
+    )
+    chunk = 500_000
+    for start in range(0, users, chunk):
+        stop = min(start + chunk, users)
+        block = rng.random((stop - start, genres), dtype=np.float32)
+        block[block < 0.7] = 0
+        user_vectors[start:stop] = recommendation_arrays.normalize_rows(block)
+    user_vectors.flush()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=5_000_000)
+    parser.add_argument("--films", type=int, default=20_000)
+    parser.add_argument("--genres", type=int, default=40)
+    parser.add_argument("--candidates", type=int, default=500)
+    parser.add_argument("--iterations", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    with tempfile.TemporaryDirectory() as directory:
+        directory = Path(directory)
+        started = time.perf_counter()
+        generate(directory, args.users, args.films, args.genres, args.seed)
+        print(f"Снимок {args.users} x {args.genres} записан за {time.perf_counter() - started:.1f} сек")
+
+        users = np.load(directory / "users.npy", mmap_mode="r")
+        films = np.load(directory / "films.npy")
+        base_scores = 1 - np.arange(args.candidates, dtype=np.float32) / args.candidates
+
+        timings = np.empty(args.iterations)
+        for i in range(args.iterations):
+            user_id = int(rng.integers(args.users))
+            film_ids = rng.choice(args.films, args.candidates, replace=False)
+
+            started = time.perf_counter()
+            recommendation_arrays.rerank(users[user_id], films, film_ids, base_scores, 0.5)
+            timings[i] = time.perf_counter() - started
+
+    p50, p99 = np.percentile(timings, [50, 99]) * 1e6
+    print(f"rerank {args.candidates} кандидатов: p50 {p50:.0f} мкс, p99 {p99:.0f} мкс")
+
+
+if __name__ == "__main__":
+    main()
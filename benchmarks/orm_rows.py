@@ -0,0 +1,113 @@
+"""Бенчмарк чтения: сущности ORM против строк Core
+
+Загружает N фильмов и пользователей из SQLite в памяти двумя способами:
+select(Film) / select(User) через Session (identity map, состояние для
+отслеживания изменений) и select(*DETAIL_COLUMNS) / select(*PROFILE_COLUMNS),
+как FilmCRUD.get_detail и UserCRUD.get_profile. Драйвер и разбор строк
+одинаковые, разница - только цена материализации на стороне SQLAlchemy.
+
+    python -m benchmarks.orm_rows --rows 20000
+"""
+
+import argparse
+import time
+import tracemalloc
+from datetime import datetime, UTC
+
+from sqlalchemy import create_engine, select, insert
+from sqlalchemy.orm import Session
+from sqlalchemy.schema import CreateTable
+
+from app.crud.film import DETAIL_COLUMNS
+from app.crud.user import PROFILE_COLUMNS
+from app.models import Film, User
+
+
+def prepare(rows: int):
+    engine = create_engine("sqlite://")
+
+    now = datetime.now(UTC)
+    with engine.begin() as conn:
+        # Без индексов: часть из них только для PostgreSQL
+        conn.execute(CreateTable(Film.__table__))
+        conn.execute(CreateTable(User.__table__))
+        conn.execute(
+            insert(Film),
+            [
+                {
+                    "id": i,
+                    "title": f"Фильм {i}",
+                    "description": "Описание " * 20,
+                    "duration": 5400,
+                    "year": 2000 + i % 25,
+                    "rating": 7.5,
+                    "updated_at": now,
+                }
+                for i in range(1, rows + 1)
+            ],
+        )
+        conn.execute(
+            insert(User),
+            [
+                {
+                    "id": i,
+                    "username": f"user{i}",
+                    "email": f"user{i}@example.com",
+                    "hashed_password": b"x" * 60,
+                    "is_active": True,
+                    "is_admin": False,
+                    "created_at": now,
+                    "updated_at": now,
+                }
+                for i in range(1, rows + 1)
+            ],
+        )
+    return engine
+
+
+def measure(engine, statement, scalars: bool, repeat: int) -> tuple[float, int]:
+    best = float("inf")
+    for _ in range(repeat):
+        with Session(engine) as session:
+            started = time.perf_counter()
+            result = session.execute(statement)
+            loaded = result.scalars().all() if scalars else result.all()
+            best = min(best, time.perf_counter() - started)
+            del loaded
+
+    with Session(engine) as session:
+        tracemalloc.start()
+        result = session.execute(statement)
+        loaded = result.scalars().all() if scalars else result.all()
+        allocated, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del loaded
+
+    return best, allocated
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    engine = prepare(args.rows)
+    variants = {
+        "Film ORM": (select(Film), True),
+        "Film Core": (select(*DETAIL_COLUMNS), False),
+        "User ORM": (select(User), True),
+        "User Core": (select(*PROFILE_COLUMNS), False),
+    }
+
+    print(f"{'вариант':<12}{'мкс/строка':>12}{'байт/строка':>13}")
+    for name, (statement, scalars) in variants.items():
+        seconds, allocated = measure(engine, statement, scalars, args.repeat)
+        print(
+            f"{name:<12}{seconds / args.rows * 1e6:>12.2f}"
+            f"{allocated / args.rows:>13.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Бенчмарк сериализации страницы каталога (100 карточек фильмов)
+
+Строки - настоящие sqlalchemy Row, как из FilmCRUD.get_cards. Сравнивается
+стандартный путь FastAPI (serialize_response по response_model и
+JSONResponse), он же с ORJSONResponse, typed_json_response по Row и по
+rows_as_dicts и trusted_json_response на dict, уже имеющих форму схемы.
+
+    python -m benchmarks.serialization --page 100 --iterations 5000
+"""
+
+import argparse
+import asyncio
+import time
+from datetime import datetime, UTC
+
+import numpy as np
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+from sqlalchemy.engine.result import IteratorResult, SimpleResultMetaData
+
+from app.core.responses import typed_json_response, trusted_json_response, rows_as_dicts
+from app.schemas.film import FilmCardListResponse, film_card_list_adapter
+
+
+COLUMNS = ["id", "title", "year", "duration", "rating", "updated_at", "genres", "top_actors"]
+
+
+def generate_rows(page: int) -> list:
+    rows = [
+        (
+            film_id,
+            f"Фильм номер {film_id}",
+            1990 + film_id % 35,
+            5400 + film_id,
+            round(5 + (film_id % 50) / 10, 1),
+            datetime(2026, 1, 1, tzinfo=UTC),
+            ["Драма", "Комедия", "Триллер"][: 1 + film_id % 3],
+            [f"Актер {film_id} {i}" for i in range(5)],
+        )
+        for film_id in range(1, page + 1)
+    ]
+    return IteratorResult(SimpleResultMetaData(COLUMNS), iter(rows)).all()
+
+
+def measure(func, iterations: int) -> tuple[float, float, int]:
+    timings = np.empty(iterations)
+    size = 0
+    for i in range(iterations):
+        started = time.perf_counter()
+        size = len(func())
+        timings[i] = time.perf_counter() - started
+    p50, p99 = np.percentile(timings, [50, 99]) * 1e6
+    return p50, p99, size
+
+
+async def serialize_default(field, content, response_class) -> bytes:
+    return response_class(
+        await serialize_response(field=field, response_content=content)
+    ).body
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--page", type=int, default=100)
+    parser.add_argument("--iterations", type=int, default=5_000)
+    args = parser.parse_args()
+
+    rows = generate_rows(args.page)
+    content = {"items": rows, "total": 100_000}
+    trusted = {
+        "items": [
+            {key: value for key, value in row._mapping.items() if key != "updated_at"}
+            for row in rows
+        ],
+        "total": 100_000,
+    }
+    field = create_model_field(
+        name="Response", type_=FilmCardListResponse, mode="serialization"
+    )
+    loop = asyncio.new_event_loop()
+
+    variants = {
+        "fastapi JSONResponse": lambda: loop.run_until_complete(
+            serialize_default(field, content, JSONResponse)
+        ),
+        "fastapi ORJSONResponse": lambda: loop.run_until_complete(
+            serialize_default(field, content, ORJSONResponse)
+        ),
+        "typed_json_response Row": lambda: typed_json_response(
+            film_card_list_adapter, content
+        ).body,
+        "typed_json_response dict": lambda: typed_json_response(
+            film_card_list_adapter, {"items": rows_as_dicts(rows), "total": 100_000}
+        ).body,
+        "trusted_json_response": lambda: trusted_json_response(trusted).body,
+    }
+
+    print(f"{'вариант':<26}{'p50, мкс':>10}{'p99, мкс':>10}{'байт':>9}")
+    for name, func in variants.items():
+        p50, p99, size = measure(func, args.iterations)
+        print(f"{name:<26}{p50:>10.0f}{p99:>10.0f}{size:>9}")
+    loop.close()
+
+
+if __name__ == "__main__":
+    main()